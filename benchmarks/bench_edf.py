@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Rough timings for loading EDF files on a synthetic 50k-line file, made of
+the sections of many instruments one after the other.
+
+Run from the repository root with ``python benchmarks/bench_edf.py``.
+"""
+from __future__ import print_function
+import os
+import shutil
+import tempfile
+import timeit
+
+from pyops.edf import EDF
+
+HEADER = """# Comment: synthetic experiment description
+#
+Experiment: SYNTHETIC "Synthetic instruments"
+#
+"""
+
+INSTRUMENT = """
+# Instrument {n}
+Data_store: EXP{n}_LOW [EXP{n}] 200 [Gbits] 4112 [bytes] 10 {n} # PID {n}
+Data_store: EXP{n}_HIGH [EXP{n}] 1 [Gbits] 4112 [bytes] 4 {n} # PID {n}
+PID: {n} ENABLE {n} # EXP{n}_LOW
+FTS: {n} ENABLE 100 [Mbytes] # EXP{n}_LOW
+Module: EXP{n}_DET "Detector {n}"
+Module_level: 1
+Module_state: OFF
+    MS_power: 0 [Watts]
+    MS_data_rate: 0 [Kbits/sec]
+Module_state: ON
+    MS_power: {n}.5 [Watts]
+    MS_data_rate: 12 [Kbits/sec]
+Mode: EXP{n}_OFF
+    Module_states: EXP{n}_DET OFF
+    Nominal_power: 0 [Watts]
+Mode: EXP{n}_SCIENCE
+    Module_states: EXP{n}_DET ON
+    Nominal_power: {n} [Watts]
+    Nominal_data_rate: 10 [Kbits/sec]
+Parameter: EXP{n}_RATE
+    Eng_type: REAL
+    Default_value: 10
+    Unit: Kbits/sec
+Parameter_value: 1 LOW
+Parameter_value: 2 HIGH
+Action: EXP{n}_SWITCH_ON
+    Action_level: NORMAL
+    Action_parameters: EXP{n}_RATE \\
+        EXP{n}_MODE
+    Duration: 00:05:00
+    Power_increase: 2 [Watts]
+Action: EXP{n}_SWITCH_OFF
+    Duration: 00:01:00
+Constraint: EXP{n}_POWER
+    Constraint_type: RESOURCE
+    Severity: ERROR
+    Resource_constraint: POWER 100 [Watts]
+"""
+
+
+def synthetic_edf(directory, lines=50000):
+    """
+    Writes an EDF of about the given number of lines, with the data
+    stores, modules, modes, parameters, actions and constraints of as many
+    instruments as needed.
+    """
+    block = INSTRUMENT.count('\n')
+    fname = os.path.join(directory, 'synthetic.edf')
+    with open(fname, 'w') as f:
+        f.write(HEADER)
+        for n in range(lines // block + 1):
+            f.write(INSTRUMENT.format(n=n))
+    return fname
+
+
+def bench_edf_load(lines=50000, repeat=3):
+    directory = tempfile.mkdtemp()
+    try:
+        timings = list()
+        # Parse time should double with the size of the file
+        for size in (lines // 2, lines):
+            fname = synthetic_edf(directory, size)
+            timings.append(min(timeit.repeat(lambda: EDF(fname), number=1,
+                                             repeat=repeat)))
+        edf = EDF(fname)
+    finally:
+        shutil.rmtree(directory)
+    print('EDF, {} lines, {} actions'.format(lines, len(edf.ACTIONS.Table)))
+    print('  EDF(fname), {} lines: {:8.3f} s'.format(lines // 2, timings[0]))
+    print('  EDF(fname), {} lines: {:8.3f} s  ({:.1f}x)'.format(
+        lines, timings[1], timings[1] / timings[0]))
+
+
+def bench_edf_lazy(lines=50000, repeat=3):
+    directory = tempfile.mkdtemp()
+    try:
+        fname = synthetic_edf(directory, lines)
+
+        def power():
+            edf = EDF(fname, lazy=True)
+            return edf.MODES.Table, edf.MODULES.Module_states_Table
+        eager = min(timeit.repeat(lambda: EDF(fname), number=1,
+                                  repeat=repeat))
+        scan = min(timeit.repeat(lambda: EDF(fname, lazy=True), number=1,
+                                 repeat=repeat))
+        lazy = min(timeit.repeat(power, number=1, repeat=repeat))
+    finally:
+        shutil.rmtree(directory)
+    print('Lazy EDF, {} lines'.format(lines))
+    print('  every section:           {:8.3f} s'.format(eager))
+    print('  lazy scan:               {:8.3f} s'.format(scan))
+    print('  lazy MODES and MODULES:  {:8.3f} s'.format(lazy))
+
+
+if __name__ == '__main__':
+    bench_edf_load()
+    bench_edf_lazy()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Rough timings for loading EVF event files on a synthetic 100k-event file,
+the size of the pericentre/eclipse event products.
+
+Run from the repository root with ``python benchmarks/bench_evf.py``.
+"""
+from __future__ import print_function
+import os
+import shutil
+import tempfile
+import timeit
+
+import pandas as pd
+
+from pyops.evf import EVF, EVENT_COLUMNS, _read_events, _read_event_tokens
+
+HEADER = """# Comment: synthetic events
+#
+Ref_date: 01-Jan-2024
+Start_time: 01-Jan-2024_00:00:00
+End_time: 31-Dec-2026_00:00:00
+#
+"""
+
+
+def synthetic_evf(directory, events=100000):
+    """
+    Writes an EVF with the given number of events, a mix of plain events,
+    counted events, experiment items and comments.
+    """
+    names = ['PERICENTRE', 'APOCENTRE', 'ECLIPSE_START', 'ECLIPSE_END',
+             'AOS_MLG', 'LOS_MLG']
+    fname = os.path.join(directory, 'synthetic.evf')
+    with open(fname, 'w') as f:
+        f.write(HEADER)
+        for i in range(events):
+            s = i * 300
+            line = '{:03d}_{:02d}:{:02d}:{:02d}   {}'.format(
+                s // 86400, s % 86400 // 3600, s % 3600 // 60, s % 60,
+                names[i % len(names)])
+            if i % 4 == 0:
+                line += '  (EXP = MERTIS ITEM = OBS_{})'.format(i % 10)
+            if i % 2 == 0:
+                line += ' (COUNT = {})'.format(i // len(names) + 1)
+            if i % 5 == 0:
+                line += ' # event {}'.format(i)
+            f.write(line + '\n')
+    return fname
+
+
+def bench_evf_load(events=100000, repeat=3):
+    directory = tempfile.mkdtemp()
+    try:
+        fname = synthetic_evf(directory, events)
+        with open(fname) as f:
+            lines = f.readlines()[6:]
+        tokens = min(timeit.repeat(
+            lambda: pd.DataFrame([_read_event_tokens(l) for l in lines],
+                                 columns=EVENT_COLUMNS),
+            number=1, repeat=repeat))
+        regex = min(timeit.repeat(
+            lambda: _read_events(lines), number=1,
+            repeat=repeat))
+        load = min(timeit.repeat(lambda: EVF(fname), number=1,
+                                 repeat=repeat))
+    finally:
+        shutil.rmtree(directory)
+    print('EVF, {} events'.format(events))
+    print('  token by token: {:8.3f} s'.format(tokens))
+    print('  one regex:      {:8.3f} s  ({:.1f}x)'.format(regex,
+                                                          tokens / regex))
+    print('  EVF(fname):     {:8.3f} s'.format(load))
+
+
+if __name__ == '__main__':
+    bench_evf_load()
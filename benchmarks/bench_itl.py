@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+Rough timings for loading ITL timelines on a synthetic 1M-event file.
+
+Run from the repository root with ``python benchmarks/bench_itl.py``.
+"""
+from __future__ import print_function
+import os
+import shutil
+import tempfile
+import timeit
+
+from pyops.itl import ITL, tokenize_itl, clear_itl_cache
+from pyops.tree import IncludeTree
+from pyops.utils import same_timeline
+
+HEADER = """# Comment: synthetic timeline
+#
+Ref_date: 01-Jan-2024
+Start_time: 01-Jan-2024_00:00:00
+End_time: 31-Dec-2026_00:00:00
+#
+"""
+
+
+def synthetic_itl(directory, events=1000000):
+    """
+    Writes an ITL with the given number of events, a mix of plain events,
+    events with parameters, continuation lines and comments.
+    """
+    experiments = ['MERTIS', 'BELA', 'ISA', 'MGNS', 'PHEBUS', 'SERENA']
+    fname = os.path.join(directory, 'synthetic.itl')
+    with open(fname, 'w') as f:
+        f.write(HEADER)
+        for i in range(events):
+            s = i * 60
+            elapsed = '{:03d}_{:02d}:{:02d}:{:02d}'.format(
+                s // 86400, s % 86400 // 3600, s % 3600 // 60, s % 60)
+            exp = experiments[i % len(experiments)]
+            if i % 10 == 0:
+                f.write('{} {} {}_MODE_{} ACTION_{} (PARAM_1 = {} [W] \\\n'
+                        '    PARAM_2 = ON) # event {}\n'.format(
+                            elapsed, exp, exp, i % 3, i % 7, i % 100, i))
+            elif i % 3 == 0:
+                f.write('{} {} {}_MODE_{} ACTION_{} (PARAM_1 = {}) '
+                        '# event {}\n'.format(elapsed, exp, exp, i % 3,
+                                              i % 7, i % 100, i))
+            else:
+                f.write('{} {} {}_MODE_{} ACTION_{}\n'.format(
+                    elapsed, exp, exp, i % 3, i % 7))
+    return fname
+
+
+def count_events(fname):
+    with open(fname) as f:
+        return sum(1 for kind, _ in tokenize_itl(f) if kind == 'event')
+
+
+def bench_itl_load(events=1000000, repeat=1):
+    directory = tempfile.mkdtemp()
+    try:
+        fname = synthetic_itl(directory, events)
+        tokenize = min(timeit.repeat(lambda: count_events(fname),
+                                     number=1, repeat=repeat))
+        load = min(timeit.repeat(lambda: ITL(fname), number=1,
+                                 repeat=repeat))
+    finally:
+        shutil.rmtree(directory)
+    print('ITL, {} events'.format(events))
+    print('  tokenize_itl: {:8.3f} s'.format(tokenize))
+    print('  ITL(fname):   {:8.3f} s'.format(load))
+
+
+def bench_mode_table(events=1000000, repeat=1):
+    directory = tempfile.mkdtemp()
+    try:
+        itl = ITL(synthetic_itl(directory, events))
+        itl.merge_includes()
+        convert = min(timeit.repeat(
+            lambda: itl._convert_df_to_mode_plot_table_format(
+                itl.merged_events, 'mode'), number=1, repeat=repeat))
+    finally:
+        shutil.rmtree(directory)
+    print('Mode plot table, {} events'.format(events))
+    print('  pivot:        {:8.3f} s'.format(convert))
+
+
+def bench_itl_roundtrip(events=1000000):
+    directory = tempfile.mkdtemp()
+    try:
+        itl = ITL(synthetic_itl(directory, events))
+        written = os.path.join(directory, 'written.itl')
+        write = min(timeit.repeat(lambda: itl.to_file(written), number=1,
+                                  repeat=1))
+        differ = same_timeline(itl, ITL(written))
+    finally:
+        shutil.rmtree(directory)
+    print('ITL round trip, {} events'.format(events))
+    print('  to_file:      {:8.3f} s'.format(write))
+    print('  differences:  {}'.format(', '.join(differ) or 'none'))
+
+
+def bench_include_refresh(includes=20, events=50000):
+    directory = tempfile.mkdtemp()
+    try:
+        names = list()
+        for n in range(includes):
+            names.append('include_{}.itl'.format(n))
+            os.rename(synthetic_itl(directory, events),
+                      os.path.join(directory, names[-1]))
+        master = os.path.join(directory, 'master.itl')
+        with open(master, 'w') as f:
+            f.write(HEADER)
+            for n, name in enumerate(names):
+                f.write('{:03d}_00:00:00 INCLUDE "{}"\n'.format(n, name))
+
+        def full():
+            clear_itl_cache()
+            ITL(master).merge_includes(check=False)
+        reload = min(timeit.repeat(full, number=1, repeat=1))
+        tree = IncludeTree(master)
+        # Editing one of the includes
+        with open(os.path.join(directory, names[0]), 'a') as f:
+            f.write('000_00:00:30 MERTIS MERTIS_MODE_0 ACTION_0\n')
+        refresh = min(timeit.repeat(tree.refresh, number=1, repeat=1))
+    finally:
+        shutil.rmtree(directory)
+    print('Include tree, {} includes of {} events'.format(includes, events))
+    print('  ITL + merge_includes: {:8.3f} s'.format(reload))
+    print('  refresh after an edit: {:7.3f} s'.format(refresh))
+
+
+if __name__ == '__main__':
+    bench_itl_load()
+    bench_mode_table()
+    bench_itl_roundtrip()
+    bench_include_refresh()
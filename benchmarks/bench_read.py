@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+"""
+Rough timings for the pyops.read loading path on synthetic EPS output.
+
+Run from the repository root with ``python benchmarks/bench_read.py``.
+"""
+from __future__ import print_function
+import os
+import shutil
+import tempfile
+import timeit
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from pyops.read import parse_header, read, read_table_fast, merge_dataframes
+from pyops.timeindex import index_paths
+from pyops.utils import parse_time, parse_elapsed_times
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+data_dir = os.path.join(this_dir, os.pardir, 'test', 'data')
+
+
+def elapsed_column(days=365, step=30):
+    """
+    Builds a year-long ddd_hh:mm:ss column at the given resolution (seconds).
+    """
+    seconds = np.arange(0, days * 86400, step)
+    return np.array(['{:03d}_{:02d}:{:02d}:{:02d}'.format(
+        s // 86400, s % 86400 // 3600, s % 3600 // 60, s % 60)
+        for s in seconds], dtype=object)
+
+
+def bench_elapsed_times(repeat=3):
+    ref_date = datetime(2024, 5, 7)
+    column = elapsed_column()
+    loop = min(timeit.repeat(
+        lambda: [parse_time(x, ref_date) for x in column],
+        number=1, repeat=repeat))
+    bulk = min(timeit.repeat(
+        lambda: parse_elapsed_times(column, ref_date),
+        number=1, repeat=repeat))
+    print('elapsed time index, {} rows'.format(len(column)))
+    print('  parse_time per row:  {:8.3f} s'.format(loop))
+    print('  parse_elapsed_times: {:8.3f} s ({:.0f}x)'.format(
+        bulk, loop / bulk))
+
+
+
+def scaled_copy(fname, rows, directory):
+    """
+    Writes a copy of an EPS output file whose data block is repeated until
+    it holds the requested number of rows.
+    """
+    header = parse_header(fname)
+    with open(fname) as f:
+        lines = f.readlines()
+    head, body = lines[:header['len']], lines[header['len']:]
+    out = os.path.join(directory, os.path.basename(fname))
+    with open(out, 'w') as f:
+        f.writelines(head)
+        for i in range(rows):
+            f.write(body[i % len(body)])
+    return out
+
+
+def bench_whitespace_tokenizer(rows=1000000, repeat=1):
+    directory = tempfile.mkdtemp()
+    try:
+        fname = scaled_copy(os.path.join(data_dir, 'data_rate_avg_old.out'),
+                            rows, directory)
+        header = parse_header(fname)
+        python = min(timeit.repeat(
+            lambda: pd.read_table(fname, skiprows=header['len'], header=None,
+                                  names=header['headings'], sep=r"\s+",
+                                  engine='python'),
+            number=1, repeat=repeat))
+        fast = min(timeit.repeat(lambda: read_table_fast(fname, header),
+                                 number=1, repeat=repeat))
+    finally:
+        shutil.rmtree(directory)
+    print('data_rate_avg.out tokenizer, {} rows x {} columns'.format(
+        rows, len(header['headings'])))
+    print('  python engine:   {:8.3f} s'.format(python))
+    print('  read_table_fast: {:8.3f} s ({:.0f}x)'.format(fast, python / fast))
+
+
+
+def bench_budget_merge(budgets=5, repeat=3):
+    index = pd.date_range('2024-05-07', periods=365 * 2880, freq='30s')
+    power = pd.DataFrame(np.random.rand(len(index), 15), index=index)
+    days = pd.date_range('2024-05-07', periods=365, freq='D')
+    from_dfs = [pd.DataFrame(np.random.rand(len(days), 2), index=days,
+                             columns=['budget{}_a'.format(i),
+                                      'budget{}_b'.format(i)])
+                for i in range(budgets)]
+    merge = min(timeit.repeat(lambda: merge_dataframes(power, *from_dfs),
+                              number=1, repeat=repeat))
+    print('merge_dataframes, {} budgets into {} rows'.format(
+        budgets, len(index)))
+    print('  merge_dataframes: {:8.3f} s'.format(merge))
+
+
+def year_long_power(directory, days=365, step=60):
+    """
+    Writes a power_avg.out covering the given number of days, with the
+    header of the test data file and random power values.
+    """
+    fname = os.path.join(data_dir, 'power_avg_old.out')
+    header = parse_header(fname)
+    with open(fname) as f:
+        head = f.readlines()[:header['len']]
+    column = elapsed_column(days, step)
+    values = np.random.rand(len(column), len(header['headings']) - 1) * 100
+    out = os.path.join(directory, 'power_avg.out')
+    with open(out, 'w') as f:
+        f.writelines(head)
+        for elapsed, row in zip(column, values):
+            f.write(elapsed + ''.join('{:16.3f}'.format(v) for v in row) +
+                    '\n')
+    return out
+
+
+def bench_time_window(days=7, repeat=3):
+    directory = tempfile.mkdtemp()
+    try:
+        fname = year_long_power(directory)
+        header = parse_header(fname)
+        start = header['Reference Date'] + pd.Timedelta(days=180)
+        end = start + pd.Timedelta(days=days)
+        full = min(timeit.repeat(lambda: read(fname, compaction=None),
+                                 number=1, repeat=repeat))
+        build = timeit.timeit(lambda: read(fname, compaction=None,
+                                           start=start, end=end), number=1)
+        window = min(timeit.repeat(
+            lambda: read(fname, compaction=None, start=start, end=end),
+            number=1, repeat=repeat))
+    finally:
+        shutil.rmtree(directory)
+        for path in index_paths(fname)[1:]:
+            if os.path.exists(path):
+                os.remove(path)
+    print('power_avg.out, {}-day window out of 365 days'.format(days))
+    print('  whole file:           {:8.3f} s'.format(full))
+    print('  window, first load:   {:8.3f} s'.format(build))
+    print('  window, index cached: {:8.3f} s ({:.0f}x)'.format(
+        window, full / window))
+
+
+if __name__ == '__main__':
+    bench_elapsed_times()
+    bench_whitespace_tokenizer()
+    bench_budget_merge()
+    bench_time_window()
@@ -20,7 +20,9 @@ __url__ = 'https://github.com/johnnycakes79/pyops'
 from pyops.read import epstable, datatable, powertable, read, Modes
 from pyops.dashboard import Dashboard
 from pyops.evf import EVF
-from pyops.itl import ITL, shift_time
+from pyops.itl import ITL, shift_time, shifted_time
 from pyops.edf import EDF
+from pyops.tree import IncludeTree
+from pyops.registry import EDFRegistry
 from pyops.utils import plotly_prep, background_colors
 import pyops.time
@@ -0,0 +1,330 @@
+"""
+This module provides an opt-in on-disk cache for parsed EPS/MAPPS output
+tables. A parsed table (pandas dataframe plus header dictionary) is stored
+in a binary columnar format, Feather when pyarrow is available and plain
+.npy blocks otherwise, and memory-mapped back on the next load as long as
+the source file hasn't changed.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from pyops.utils import get_unique_from_list
+
+try:
+    from pyarrow import feather
+except ImportError:
+    feather = None
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'pyops')
+DEFAULT_MAX_SIZE = 2 * 1024 ** 3
+
+
+class TableCache:
+    """
+    This class manages a directory of cached tables. Every entry is keyed on
+    the source file's path, size, modification time and content hash, plus
+    a variant string describing how the file was parsed. The directory is
+    kept under max_size bytes by evicting the least recently used entries.
+    """
+
+    def __init__(self, directory=None, max_size=DEFAULT_MAX_SIZE, fmt=None):
+        """
+        This constructor method initialises the TableCache object.
+
+        :param directory: cache directory (default: $PYOPS_CACHE_DIR or
+                          ~/.cache/pyops)
+        :type directory: str
+        :param max_size: maximum size of the cache directory in bytes
+        :type max_size: int
+        :param fmt: storage format, 'feather' or 'npy' (default: feather if
+                    pyarrow is installed)
+        :type fmt: str
+        :returns: TableCache object
+        """
+        if directory is None:
+            directory = os.environ.get('PYOPS_CACHE_DIR', DEFAULT_CACHE_DIR)
+        if fmt is None:
+            fmt = 'npy' if feather is None else 'feather'
+        if fmt not in ('feather', 'npy'):
+            raise ValueError('Unknown cache format: {}'.format(fmt))
+        if fmt == 'feather' and feather is None:
+            raise ValueError('The feather cache format needs pyarrow')
+        self.directory = directory
+        self.max_size = max_size
+        self.fmt = fmt
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def key(self, fname, variant=''):
+        """
+        This method builds the cache key of a file: a hash of its absolute
+        path, size, modification time and content, and the parse variant.
+        The content digest of every file is recorded with its size and
+        modification time, and the file is only read and hashed again when
+        one of them changed.
+
+        :param fname: source file name
+        :type fname: str
+        :param variant: description of how the file is parsed
+        :type variant: str
+        :returns: hex digest
+        """
+        stat = os.stat(fname)
+        path = os.path.abspath(fname)
+        stamp = [stat.st_size, repr(stat.st_mtime)]
+        record = os.path.join(self.directory, '.stamps', hashlib.sha1(
+            path.encode('utf-8')).hexdigest() + '.json')
+        digest = None
+        try:
+            with open(record) as f:
+                recorded = json.load(f)
+            if recorded['path'] == path and recorded['stamp'] == stamp:
+                digest = recorded['digest']
+        except (IOError, OSError, ValueError, KeyError):
+            pass
+        if digest is None:
+            content = hashlib.sha1()
+            with open(fname, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    content.update(chunk)
+            digest = content.hexdigest()
+            self._write_stamp(record, {'path': path, 'stamp': stamp,
+                                       'digest': digest})
+        key = '|'.join([path, str(stat.st_size), repr(stat.st_mtime), digest,
+                        variant])
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def load(self, fname, parse, variant=''):
+        """
+        This method returns the cached table for fname, calling parse and
+        storing its result on a miss.
+
+        :param fname: source file name
+        :type fname: str
+        :param parse: function with no arguments returning (data, header)
+        :type parse: callable
+        :param variant: description of how the file is parsed
+        :type variant: str
+        :returns: pandas dataframe and header dictionary
+        """
+        key = self.key(fname, variant)
+        entry = os.path.join(self.directory, key)
+        if os.path.isdir(entry):
+            try:
+                result = self._read_entry(entry)
+                # Touching the entry is what makes the eviction LRU
+                os.utime(entry, None)
+                return result
+            except (IOError, OSError, ValueError, KeyError):
+                # Unreadable entry (e.g. half evicted): parse again
+                shutil.rmtree(entry, ignore_errors=True)
+        data, header = parse()
+        self._write_entry(entry, data, header)
+        self.evict()
+        return data, header
+
+    def evict(self):
+        """
+        This method removes the least recently used entries until the cache
+        directory is no bigger than max_size.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if os.path.isdir(path) and not name.startswith('.'):
+                size = sum(os.path.getsize(os.path.join(path, f))
+                           for f in os.listdir(path))
+                entries.append((os.path.getmtime(path), size, path))
+        total = sum(e[1] for e in entries)
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """
+        This method empties the cache directory.
+        """
+        for name in os.listdir(self.directory):
+            shutil.rmtree(os.path.join(self.directory, name),
+                          ignore_errors=True)
+
+    def _write_stamp(self, record, stamp):
+        # Same as the entries, written aside and renamed into place
+        directory = os.path.dirname(record)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        fd, tmp = tempfile.mkstemp(prefix='.', dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(stamp, f)
+            if os.path.isfile(record):
+                os.remove(record)
+            os.rename(tmp, record)
+        except Exception:
+            if os.path.isfile(tmp):
+                os.remove(tmp)
+            raise
+
+    def _write_entry(self, entry, data, header):
+        # Written to a temporary directory first so that a concurrent reader
+        # never sees a half written entry
+        tmp = tempfile.mkdtemp(prefix='.', dir=self.directory)
+        try:
+            meta = {'format': self.fmt, 'header': header,
+                    'columns': [list(c) if isinstance(c, tuple) else c
+                                for c in data.columns],
+                    'multiindex': isinstance(data.columns, pd.MultiIndex),
+                    'index_name': data.index.name}
+            names = [str(i) for i in range(data.shape[1])]
+            if self.fmt == 'feather':
+                frame = data.copy()
+                frame.columns = names
+                frame['__index__'] = data.index
+                feather.write_feather(frame.reset_index(drop=True),
+                                      os.path.join(tmp, 'data.feather'),
+                                      compression='uncompressed')
+            else:
+                meta['blocks'] = self._write_blocks(tmp, data)
+            with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+                json.dump(meta, f, default=_encode)
+            if os.path.isdir(entry):
+                shutil.rmtree(entry, ignore_errors=True)
+            os.rename(tmp, entry)
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    def _write_blocks(self, directory, data):
+        # One 2-D array per dtype so that an all-float table comes back as
+        # a single memory-mapped block
+        blocks = []
+        np.save(os.path.join(directory, 'index.npy'), np.asarray(data.index))
+        dtypes = [data.dtypes.iloc[i] for i in range(data.shape[1])]
+        for n, dtype in enumerate(get_unique_from_list(dtypes)):
+            positions = [i for i, d in enumerate(dtypes) if d == dtype]
+            values = data.iloc[:, positions].values
+            block = {'file': 'block{}.npy'.format(n), 'positions': positions}
+            block['strings'] = bool(values.dtype == object)
+            if block['strings']:
+                nulls = pd.isnull(values)
+                block['nulls'] = bool(nulls.any())
+                if block['nulls']:
+                    np.save(os.path.join(directory, 'nulls{}.npy'.format(n)),
+                            nulls)
+                values = values.astype(np.str_)
+            np.save(os.path.join(directory, block['file']), values)
+            blocks.append(block)
+        return blocks
+
+    def _read_entry(self, entry):
+        with open(os.path.join(entry, 'meta.json')) as f:
+            meta = json.load(f, object_hook=_decode)
+        if meta['format'] == 'feather':
+            if feather is None:
+                raise ValueError('Cached entry needs pyarrow')
+            table = feather.read_table(os.path.join(entry, 'data.feather'),
+                                       memory_map=True)
+            frame = table.to_pandas()
+            index = pd.Index(frame.pop('__index__'))
+        else:
+            index, frame = self._read_blocks(entry, meta['blocks'])
+        frame.index = index
+        frame.index.name = meta['index_name']
+        if meta['multiindex']:
+            frame.columns = pd.MultiIndex.from_tuples(
+                [tuple(c) for c in meta['columns']])
+        else:
+            frame.columns = meta['columns']
+        return frame, meta['header']
+
+    def _read_blocks(self, entry, blocks):
+        index = np.load(os.path.join(entry, 'index.npy'), mmap_mode='r')
+        index = pd.Index(np.array(index))
+        frames = []
+        for n, block in enumerate(blocks):
+            path = os.path.join(entry, block['file'])
+            if block['strings']:
+                values = np.load(path).astype(object)
+                if block['nulls']:
+                    nulls = np.load(os.path.join(entry,
+                                                 'nulls{}.npy'.format(n)))
+                    values[nulls] = None
+            else:
+                # copy-on-write mapping: pages are only read when touched
+                # and only copied when modified
+                values = np.load(path, mmap_mode='c')
+            frames.append(pd.DataFrame(values, columns=block['positions'],
+                                       copy=False))
+        if len(frames) == 1:
+            frame = frames[0]
+        else:
+            frame = pd.concat(frames, axis=1)
+            frame = frame[sorted(frame.columns)]
+        return index, frame
+
+
+def get_cache(cache):
+    """
+    This function turns the cache argument of the table classes into a
+    TableCache (or None when caching is off).
+
+    :param cache: None/False (off), True (default directory), a directory
+                  name or a TableCache
+    :type cache: bool, str or TableCache
+    :returns: TableCache or None
+    """
+    if cache is None or cache is False:
+        return None
+    if cache is True:
+        return TableCache()
+    if isinstance(cache, TableCache):
+        return cache
+    return TableCache(cache)
+
+
+def cached(cache, fname, parse, variant=''):
+    """
+    This function loads a table through the cache if there is one, or just
+    parses it otherwise.
+
+    :param cache: see get_cache
+    :type cache: bool, str or TableCache
+    :param fname: source file name
+    :type fname: str
+    :param parse: function with no arguments returning (data, header)
+    :type parse: callable
+    :param variant: description of how the file is parsed
+    :type variant: str
+    :returns: pandas dataframe and header dictionary
+    """
+    cache = get_cache(cache)
+    if cache is None:
+        return parse()
+    return cache.load(fname, parse, variant)
+
+
+def _encode(obj):
+    # The header dictionaries hold datetimes (e.g. 'Reference Date')
+    if isinstance(obj, datetime.datetime):
+        return {'__datetime__': obj.isoformat()}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError('{!r} is not JSON serializable'.format(obj))
+
+
+def _decode(obj):
+    if '__datetime__' in obj:
+        value = obj['__datetime__']
+        fmt = '%Y-%m-%dT%H:%M:%S.%f' if '.' in value else '%Y-%m-%dT%H:%M:%S'
+        return datetime.datetime.strptime(value, fmt)
+    return obj
@@ -1,4 +1,6 @@
 import os
+import time
+import multiprocessing
 from pyops.read import Modes, powertable, datatable
 from bokeh.plotting import show, output_notebook, vplot, gridplot
 from bokeh.io import vform
@@ -6,24 +8,59 @@ from bokeh.models.widgets import Panel, Tabs
 from bokeh.models.widgets import CheckboxButtonGroup
 
 
-class Dashboard():
+# (file name, loader method) of the files a Dashboard loads
+_TABLES = [("power_avg.out", "load_power_avg_file"),
+           ("data_rate_avg.out", "load_data_rate_avg_file"),
+           ("modes.out", "load_modes_file"),
+           ("module_states.out", "load_module_states_file")]
 
-    def __init__(self, directory, instruments=None, parameters=None):
+
+def _read_table(task):
+    """
+    This function loads one of the Dashboard files with its loader method
+    and times it. It lives at module level so that it can run in a process
+    pool.
+
+    :param task: loader method name (see _TABLES) and file path
+    :type task: tuple
+    :returns: the attributes set by the loader and the time it took to load
+              in seconds
+    """
+    loader, file_name = task
+    # A bare Dashboard, without the notebook output __init__ sets up
+    dashboard = Dashboard.__new__(Dashboard)
+    start = time.time()
+    getattr(dashboard, loader)(file_name)
+    return dashboard.__dict__, time.time() - start
+
+
+class Dashboard(object):
+
+    def __init__(self, directory, instruments=None, parameters=None,
+                 parallel=False):
 
         # Hidding anoying warnings on the top of the plot
         output_notebook(hide_banner=True)
 
-        self.load_directory(directory)
+        self.load_directory(directory, parallel)
 
         self.launch(instruments, parameters)
 
-    def load_directory(self, directory):
+    def load_directory(self, directory, parallel=False, processes=None):
         """
         This function loads power, data rate, modes and module states
-        files from the given directory.
+        files from the given directory. The files are independent so with
+        parallel they are parsed in a process pool, and loading takes as long
+        as the slowest file rather than the sum of all of them. The time each
+        file took is printed and kept in self.load_times.
 
         :param directory: Directory to inspect
         :type directory: string
+        :param parallel: Flag to parse the files in a process pool
+        :type parallel: boolean
+        :param processes: size of the pool (default: one per file, up to
+                          the number of CPUs)
+        :type processes: int
         :returns: nothing
         """
         if os.path.isdir(directory):
@@ -36,15 +73,30 @@ class Dashboard():
         files = [os.path.join(directory, f) for f in os.listdir(directory)
                  if os.path.isfile(os.path.join(directory, f))]
 
-        for f in files:
-            if "power_avg.out" in f:
-                self.load_power_avg_file(f)
-            if "modes.out" in f:
-                self.load_modes_file(f)
-            if "module_states.out" in f:
-                self.load_module_states_file(f)
-            if "data_rate_avg.out" in f:
-                self.load_data_rate_avg_file(f)
+        # Exact names only: other files such as backups merely contain them
+        tasks = [(loader, f) for f in files
+                 for name, loader in _TABLES if os.path.basename(f) == name]
+
+        start = time.time()
+        if parallel and len(tasks) > 1:
+            if processes is None:
+                processes = min(len(tasks), multiprocessing.cpu_count())
+            pool = multiprocessing.Pool(processes)
+            try:
+                results = pool.map(_read_table, tasks)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            results = [_read_table(task) for task in tasks]
+
+        self.load_times = {}
+        for (loader, f), (attributes, seconds) in zip(tasks, results):
+            self.__dict__.update(attributes)
+            self.load_times[f] = seconds
+            print('{}: {:.2f} s'.format(os.path.basename(f), seconds))
+        print('Loaded {} files in {:.2f} s'.format(len(tasks),
+                                                  time.time() - start))
 
     def load_power_avg_file(self, file_name):
         """
@@ -2,6 +2,41 @@ import pandas as pd
 import os
 # from prettytable import PrettyTable
 
+# Factors from the units found in EDFs to W, bit/s and bit. EPS prefixes
+# are binary (1 Kbits = 1024 bits)
+SI_FACTORS = {'watts': 1., 'watt': 1., 'w': 1., 'milliwatts': 1e-3,
+              'mw': 1e-3, 'kw': 1e3}
+for _n, _prefix in enumerate(['', 'k', 'm', 'g', 't']):
+    for _unit, _bits in [('bits', 1), ('bit', 1), ('bytes', 8), ('byte', 8)]:
+        SI_FACTORS[_prefix + _unit] = float(_bits * 1024 ** _n)
+        for _rate in ['/sec', '/s']:
+            SI_FACTORS[_prefix + _unit + _rate] = float(_bits * 1024 ** _n)
+    SI_FACTORS[_prefix + 'bps'] = float(1024 ** _n)
+del _n, _prefix, _unit, _bits, _rate
+
+# A number and an optional [unit], e.g. '8.5 [Watts]'
+_QUANTITY = r'^\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)' \
+    r'\s*(?:\[\s*([^\]]*?)\s*\])?'
+
+
+def to_si(values, unit=None):
+    """Converts EDF quantities, such as '8.5 [Watts]' or '1 [Gbits]', to
+    floats in W, bit/s or bit.
+
+    Args:
+        values (iterable): Raw strings of an EDF table column
+        unit (str, optional): Unit of the values written without one
+
+    Returns:
+        ndarray: Values in SI units, NaN where not a number in a known unit
+        (e.g. a parameter name)
+    """
+    values = pd.Series(list(values), dtype=object).fillna('').astype(str)
+    parts = values.str.extract(_QUANTITY)
+    numbers = parts[0].astype(float)
+    units = parts[1].fillna(unit or '').str.lower().str.replace(' ', '')
+    return (numbers * units.map(SI_FACTORS).astype(float)).values
+
 
 class EDF:
     """Experiment Description File Parser
@@ -19,8 +54,8 @@ class EDF:
         GLOBAL_PROPERTIES (dict): Contains all the possible global properties
         header (list): Contains all the header information in the file
         include_files (list): Contains all the include files in the file
-        keywords (list): Contains the keywords that indicate that a new Object
-        has to be created.
+        keywords (dict): Contains the keywords that indicate that a new Object
+        has to be created, linked to the attribute of its section.
         meta (dict): Contains all the metadata information contained in header
         MODES (Object): Contains all the modes data from the file
         MODULES (Object): Contains all the modules data from the file
@@ -31,11 +66,13 @@ class EDF:
         WTF (list): Things found in the file that don't belong to anyother
         field of this class
     """
-    def __init__(self, fname=None):
+    def __init__(self, fname=None, lazy=False):
         """Constructor
 
         Args:
             fname (str, optional): Path name of the EDF file
+            lazy (bool, optional): Read every section only when it is first
+            accessed, e.g. only MODES and MODULES for power budgets
         """
         # Variable initialization
         self.WTF = list()
@@ -66,37 +103,65 @@ class EDF:
         self.ACTIONS = Actions()
         self.CONSTRAINTS = Constraints()
 
-        # Keywords to detect in the file linked to their reading functions
-        self.keywords = {'DATA_BUS': self.DATA_BUSES._read,
-                         'DATA_STORE': self.DATA_STORES._read,
-                         'PID': self.PIDS._read,
-                         'FTS': self.FTS._read,
-                         'AREA': self.AREAS._read,
-                         'FOV': self.FOVS._read,
-                         'MODULE': self.MODULES._read,
-                         'MODE': self.MODES._read,
-                         'PARAMETER': self.PARAMETERS._read,
-                         'ACTION': self.ACTIONS._read,
-                         'CONSTRAINT': self.CONSTRAINTS._read}
+        # Keywords to detect in the file linked to the attribute of their
+        # section (names rather than bound methods, so that EDF objects can
+        # be pickled)
+        self.keywords = {'DATA_BUS': 'DATA_BUSES',
+                         'DATA_STORE': 'DATA_STORES',
+                         'PID': 'PIDS',
+                         'FTS': 'FTS',
+                         'AREA': 'AREAS',
+                         'FOV': 'FOVS',
+                         'MODULE': 'MODULES',
+                         'MODE': 'MODES',
+                         'PARAMETER': 'PARAMETERS',
+                         'ACTION': 'ACTIONS',
+                         'CONSTRAINT': 'CONSTRAINTS'}
 
         # Loading the given file
         if fname is not None:
-            self._load(fname)
+            self._load(fname, lazy)
+
+    def __getattr__(self, name):
+        """Reads a section of a lazy EDF the first time it is accessed
+
+        Args:
+            name (str): Attribute not found in the object
 
-    def _load(self, fname):
+        Returns:
+            Object: The section, with its tables created
+        """
+        # Looked up in __dict__ so that unpickling doesn't recurse
+        pending = self.__dict__.get('_pending')
+        if pending is None or name not in pending:
+            raise AttributeError(name)
+        section, blocks = pending.pop(name)
+        for pos in blocks:
+            section._read(self._content, pos)
+        section._create_pandas()
+        setattr(self, name, section)
+        if len(pending) == 0:
+            self._content = None
+        return section
+
+    def _load(self, fname, lazy=False):
         """ Reading the file and extracting the data.
 
         Args:
             fname (str): Path name of the file
+            lazy (bool, optional): Only record where the blocks of every
+            section are, to read them on first access
         """
         # Storing the name of the file for editting purposes
         self.fname = fname
 
         with open(fname) as f:
-            content = f.readlines()
-            content = self._concatenate_lines(content)
+            content = self._concatenate_lines(f)
+
+        # Lines where the blocks of every section start
+        blocks = dict((section, []) for section in self.keywords.values())
 
-        lines_to_remove = 0
+        pos = 0
         # Read Header
         for line in content:
             if len(line) > 1:
@@ -107,11 +172,9 @@ class EDF:
                     self._read_metada(line)
                 else:
                     break
-            # Removing the line from content
-            lines_to_remove += 1
-        content = content[lines_to_remove:]
+            # Skipping the line in what follows
+            pos += 1
 
-        pos = 0
         while pos < len(content):
             l = content[pos].split()
             if len(l) > 0:
@@ -129,8 +192,14 @@ class EDF:
                         elif l[0][:-1].upper() not in self.keywords:
                             pos += self._read_variables(l)
                         elif len(l) > 1 and l[0][:-1].upper() in self.keywords:
-                            pos += self.keywords[l[0][:-1].upper()](
-                                content[pos:])
+                            section = self.keywords[l[0][:-1].upper()]
+                            if lazy:
+                                blocks[section].append(pos)
+                                pos += getattr(self, section)._span(
+                                    content, pos)
+                            else:
+                                pos += getattr(self, section)._read(
+                                    content, pos)
                         else:
                             pos += 1
                     # We have found a comment
@@ -140,6 +209,14 @@ class EDF:
             else:
                 pos += 1
 
+        if lazy:
+            # Sections are taken out of the object until first accessed
+            self._content = content
+            self._pending = dict(
+                (section, (self.__dict__.pop(section), blocks[section]))
+                for section in blocks)
+            return
+
         # Removing the content from memory
         content = None
         # Creating the pandas tables
@@ -180,7 +257,7 @@ class EDF:
         """Concatenate all the lines that have a '\\' element.
 
         Args:
-            content (list): list of lines to concatenate
+            content (iterable): lines to concatenate, e.g. an open file
 
         Returns:
             list: list of lines already concatenated
@@ -212,6 +289,59 @@ class EDF:
             line = ""
         return out
 
+    def _lines(self, content, pos):
+        """Iterates over the split lines of content from a given position
+        on, without copying the remaining lines.
+
+        Args:
+            content (list): Lines of the file
+            pos (int): Position of the first line
+
+        Yields:
+            list: words of every line
+        """
+        while pos < len(content):
+            yield content[pos].split()
+            pos += 1
+
+    def _span(self, content, pos):
+        """Counts the lines of the block of this section starting at a
+        given position, without reading them.
+
+        Args:
+            content (list): Lines of the file
+            pos (int): Line where an object of this type was detected
+
+        Returns:
+            int: number of lines the block takes from the content
+        """
+        counter = 0
+        for line in self._lines(content, pos):
+            if len(line) > 1 and not self._is_field(line[0]) and \
+                    '#' not in line[0][0]:
+                break
+            counter += 1
+        return counter
+
+    def _typed_table(self, table, key, units):
+        """Builds and caches the typed view of a table of this section
+
+        Args:
+            table (DataFrame): Raw table of the section
+            key (str): Column naming the rows, kept as it is
+            units (list): (column, unit of the values without one) pairs of
+            the columns converted to SI units
+
+        Returns:
+            DataFrame: The key column and a float column per quantity
+        """
+        if self.__dict__.get('_typed') is None:
+            typed = pd.DataFrame({key: table[key].values}, columns=[key])
+            for column, unit in units:
+                typed[column] = to_si(table[column], unit)
+            self._typed = typed
+        return self._typed
+
     def _read_metada(self, line):
         """Function to read the metadata of the file
 
@@ -258,23 +388,6 @@ class EDF:
                 break
         return count
 
-    def _add_none_to_empty_fields(self, dictionary):
-        """Adds None to the list which length is one unit less than the others.
-
-        Args:
-            dictionary (dict): Dictionary containing lists for every key
-
-        Returns:
-            dict: Dictionary modified
-        """
-        # Adding None value to the empty fields
-        maximum = max(
-            [len(dictionary[x]) for x in dictionary])
-        for x in dictionary:
-            if len(dictionary[x]) < maximum:
-                dictionary[x].append(None)
-        return dictionary
-
     def _convert_dictionaries_into_dataframes(self):
         """Convert the created dictionaries into pandas DataFrames
         """
@@ -291,6 +404,76 @@ class EDF:
         self.CONSTRAINTS._create_pandas()
 
 
+class _Records(object):
+    """Rows of an EDF table, one dictionary per object, turned into the
+    columns of a pandas DataFrame only once the whole file has been read.
+
+    Attributes:
+        columns (list): Columns of the table, in order
+        rows (list): One dictionary per object, holding the fields found
+    """
+
+    def __init__(self, columns):
+        """Constructor
+
+        Args:
+            columns (list): Columns of the table, in order
+        """
+        self.columns = columns
+        self.rows = list()
+        self._fields = set(columns)
+
+    def __contains__(self, field):
+        return field in self._fields
+
+    def __len__(self):
+        return len(self.rows)
+
+    def new(self):
+        """Starts the row of a new object"""
+        self.rows.append(dict())
+
+    def add(self, field, value):
+        """Sets a field of the current object
+
+        Args:
+            field (str): Column of the field
+            value (str): Value of the field
+        """
+        # Fields found before the first object start a row of their own
+        if len(self.rows) == 0:
+            self.new()
+        self.rows[-1][field] = value
+
+    def last(self, field):
+        """Value of a field of the current object
+
+        Args:
+            field (str): Column of the field
+
+        Returns:
+            str: Value of the field, None if not found
+        """
+        return self.rows[-1].get(field)
+
+    def to_dataframe(self):
+        """Builds the table, with None for the fields an object lacks
+
+        Returns:
+            DataFrame: Pandas DataFrame with a row per object
+        """
+        found = set()
+        for row in self.rows:
+            found.update(row)
+        table = dict()
+        for column in self.columns:
+            if column in found:
+                table[column] = [row.get(column) for row in self.rows]
+            else:
+                table[column] = [None] * len(self.rows)
+        return pd.DataFrame(table, columns=self.columns)
+
+
 class DataBuses(EDF):
     """Data Buses class
 
@@ -300,45 +483,49 @@ class DataBuses(EDF):
     def __init__(self):
         """Constructor"""
         self.Table = None
-        self._data_buses = {"Data_bus": [], "Data_bus_rate_warning": [],
-                            "Data_bus_rate_limit": []}
+        self._data_buses = _Records(["Data_bus", "Data_bus_rate_warning",
+                                     "Data_bus_rate_limit"])
 
-    def _read(self, content):
-        """Function that converts the input content into a dictionary
+    def _read(self, content, pos=0):
+        """Function that converts the input content into records
 
         Args:
-            content (list): Lines where a object of this type was detected at
-            the beginning.
+            content (list): Lines of the file
+            pos (int): Line where an object of this type was detected
 
         Returns:
             int: number of lines used from the content
         """
         counter = 0
-        for line in content:
-            line = line.split()
+        for line in self._lines(content, pos):
             if len(line) > 1:
                 if line[0][:-1] in self._data_buses:
-                    # If another Data Bus detected we ensure to keep same
-                    # length of all the elements in the dictionary
+                    # Only the Data_bus field is read for the moment
                     if line[0] == 'Data_bus:':
-                        self._data_buses = \
-                            self._add_none_to_empty_fields(self._data_buses)
-                        self._data_buses[line[0][:-1]].append(
-                            ' '.join(line[1:]))
+                        self._data_buses.new()
+                        self._data_buses.add(line[0][:-1], ' '.join(line[1:]))
                 elif '#' in line[0][0]:
                     pass
                 else:
-                    self._data_buses = \
-                        self._add_none_to_empty_fields(self._data_buses)
                     break
             counter += 1
-        self._data_buses = \
-            self._add_none_to_empty_fields(self._data_buses)
         return counter
 
+    def _is_field(self, word):
+        """Whether a line starting with word belongs to a block of this
+        section
+
+        Args:
+            word (str): First word of the line
+
+        Returns:
+            bool: True if the line is part of the block
+        """
+        return word[:-1] in self._data_buses
+
     def _create_pandas(self):
-        """Transforms the dictionary into a pandas DataFrame"""
-        self.Table = pd.DataFrame(self._data_buses)
+        """Transforms the records into a pandas DataFrame"""
+        self.Table = self._data_buses.to_dataframe()
 
 
 class DataStores(EDF):
@@ -350,77 +537,79 @@ class DataStores(EDF):
 
     def __init__(self):
         self.Table = None
-        self._data_stores = {"Label": [], "Memory size": [],
-                             "Packet size": [], "Priority": [],
-                             "Identifier": [], "Comment": []}
+        self._data_stores = _Records(['Label', 'Memory size', 'Packet size',
+                                      'Priority', 'Identifier', 'Comment'])
 
-    def _read(self, content):
-        """Function that converts the input content into a dictionary
+    def _read(self, content, pos=0):
+        """Function that converts the input content into records
 
         Args:
-            content (list): Lines where a object of this type was detected at
-            the beginning.
+            content (list): Lines of the file
+            pos (int): Line where an object of this type was detected
 
         Returns:
             int: number of lines used from the content
         """
         counter = 0
-        for line in content:
-            line = line.split()
+        for line in self._lines(content, pos):
             if len(line) > 1:
                 if line[0] == 'Data_store:':
-                    # If another Data Store detected we ensure to keep same
-                    # length of all the elements in the dictionary
-                    self._data_stores = \
-                        self._add_none_to_empty_fields(self._data_stores)
+                    # Every Data Store is a new row of the table
+                    self._data_stores.new()
                     pos = self._how_many_brackets_following(line[2:]) + 2
                     if line[pos].upper() == 'SELECTIVE':
                         pos += 1
-                    self._data_stores['Label'].append(' '.join(line[1:pos]))
+                    self._data_stores.add('Label', ' '.join(line[1:pos]))
                     prev_pos, pos = pos, \
                         self._how_many_brackets_following(
                             line[pos + 1:]) + pos + 1
-                    self._data_stores['Memory size'].append(
-                        ' '.join(line[prev_pos:pos]))
+                    self._data_stores.add('Memory size',
+                                          ' '.join(line[prev_pos:pos]))
                     prev_pos, pos = pos, \
                         self._how_many_brackets_following(
                             line[pos + 1:]) + pos + 1
-                    self._data_stores['Packet size'].append(
-                        ' '.join(line[prev_pos:pos]))
+                    self._data_stores.add('Packet size',
+                                          ' '.join(line[prev_pos:pos]))
+                    # Optional priority and identifier, then the comment
+                    for field in ['Priority', 'Identifier']:
+                        if len(line) <= pos or '#' in line[pos]:
+                            break
+                        self._data_stores.add(field, line[pos])
+                        pos += 1
                     if len(line) > pos:
-                        if '#' in line[pos]:
-                            self._data_stores['Comment'].append(
-                                ' '.join(line[pos:]))
-                            continue
-                        else:
-                            self._data_stores['Priority'].append(line[pos])
-                    if len(line) > pos + 1:
-                        if '#' in line[pos + 1]:
-                            self._data_stores['Comment'].append(
-                                ' '.join(line[pos + 1:]))
-                            continue
-                        else:
-                            self._data_stores['Identifier'].append(
-                                line[pos + 1])
-                    if len(line) > pos + 2:
-                        self._data_stores['Comment'].append(
-                            ' '.join(line[pos + 2:]))
+                        self._data_stores.add('Comment', ' '.join(line[pos:]))
                 elif '#' in line[0][0]:
                     pass
                 else:
-                    self._data_stores = \
-                        self._add_none_to_empty_fields(self._data_stores)
                     break
             counter += 1
-        self._data_stores = \
-            self._add_none_to_empty_fields(self._data_stores)
         return counter
 
+    def _is_field(self, word):
+        """Whether a line starting with word belongs to a block of this
+        section
+
+        Args:
+            word (str): First word of the line
+
+        Returns:
+            bool: True if the line is part of the block
+        """
+        return word == 'Data_store:'
+
     def _create_pandas(self):
-        """Transforms the dictionary into a pandas DataFrame"""
-        cols = ['Label', 'Memory size', 'Packet size', 'Priority',
-                'Identifier', 'Comment']
-        self.Table = pd.DataFrame(self._data_stores, columns=cols)
+        """Transforms the records into a pandas DataFrame"""
+        self.Table = self._data_stores.to_dataframe()
+
+    def typed_table(self):
+        """Sizes of the data stores as floats in SI units, computed once
+
+        Returns:
+            DataFrame: Label, and Memory size and Packet size in bit
+        """
+        return self._typed_table(
+            self.Table, 'Label',
+            [('Memory size', 'Mbytes'), ('Packet size', 'bytes')])
 
 
 class PIDs(EDF):
@@ -432,48 +621,52 @@ class PIDs(EDF):
 
     def __init__(self):
         self.Table = None
-        self._pids = {"PID number": [], "Status": [], "Data Store ID": [],
-                      "Comment": []}
+        self._pids = _Records(["PID number", "Status", "Data Store ID",
+                               "Comment"])
 
-    def _read(self, content):
-        """Function that converts the input content into a dictionary
+    def _read(self, content, pos=0):
+        """Function that converts the input content into records
 
         Args:
-            content (list): Lines where a object of this type was detected at
-            the beginning.
+            content (list): Lines of the file
+            pos (int): Line where an object of this type was detected
 
         Returns:
             int: number of lines used from the content
         """
         counter = 0
-        for line in content:
-            line = line.split()
+        for line in self._lines(content, pos):
             if len(line) > 1:
                 if line[0] == 'PID:':
-                    # If another PID detected we ensure to keep same length
-                    # of all the elements in the dictionary
-                    self._pids = \
-                        self._add_none_to_empty_fields(self._pids)
-                    self._pids['PID number'].append(line[1])
-                    self._pids['Status'].append(line[2])
-                    self._pids['Data Store ID'].append(line[3])
+                    # Every PID is a new row of the table
+                    self._pids.new()
+                    self._pids.add('PID number', line[1])
+                    self._pids.add('Status', line[2])
+                    self._pids.add('Data Store ID', line[3])
                     if len(line) > 4:
-                        self._pids['Comment'].append(' '.join(line[4:]))
+                        self._pids.add('Comment', ' '.join(line[4:]))
                 elif '#' in line[0][0]:
                     pass
                 else:
-                    self._pids = \
-                        self._add_none_to_empty_fields(self._pids)
                     break
             counter += 1
-        self._pids = \
-            self._add_none_to_empty_fields(self._pids)
         return counter
 
+    def _is_field(self, word):
+        """Whether a line starting with word belongs to a block of this
+        section
+
+        Args:
+            word (str): First word of the line
+
+        Returns:
+            bool: True if the line is part of the block
+        """
+        return word == 'PID:'
+
     def _create_pandas(self):
-        """Transforms the dictionary into a pandas DataFrame"""
-        cols = ['PID number', 'Status', 'Data Store ID', 'Comment']
-        self.Table = pd.DataFrame(self._pids, columns=cols)
+        """Transforms the records into a pandas DataFrame"""
+        self.Table = self._pids.to_dataframe()
 
 
 class FTS(EDF):
@@ -485,115 +678,136 @@ class FTS(EDF):
 
     def __init__(self):
         self.Table = None
-        self._fts = {"Data Store ID": [], "Status": [], "Data Volume": [],
-                     "Comment": []}
+        self._fts = _Records(["Data Store ID", "Status", "Data Volume",
+                              "Comment"])
 
-    def _read(self, content):
-        """Function that converts the input content into a dictionary
+    def _read(self, content, pos=0):
+        """Function that converts the input content into records
 
         Args:
-            content (list): Lines where a object of this type was detected at
-            the beginning.
+            content (list): Lines of the file
+            pos (int): Line where an object of this type was detected
 
         Returns:
             int: number of lines used from the content
         """
         counter = 0
-        for line in content:
-            line = line.split()
+        for line in self._lines(content, pos):
             if len(line) > 1:
                 if line[0] == 'FTS:':
-                    # If another FTS detected we ensure to keep same length
-                    # of all the elements in the dictionary
-                    self._fts = \
-                        self._add_none_to_empty_fields(self._fts)
-                    self._fts['Data Store ID'].append(line[1])
-                    self._fts['Status'].append(line[2])
+                    # Every FTS is a new row of the table
+                    self._fts.new()
+                    self._fts.add('Data Store ID', line[1])
+                    self._fts.add('Status', line[2])
                     if len(line) > 4:
-                        self._fts['Data Volume'].append(' '.join(line[3:4]))
+                        self._fts.add('Data Volume', ' '.join(line[3:4]))
                     else:
-                        self._fts['Data Volume'].append(line[3])
+                        self._fts.add('Data Volume', line[3])
                     if len(line) > 5:
-                        self._fts['Comment'].append(' '.join(line[5:]))
+                        self._fts.add('Comment', ' '.join(line[5:]))
                 elif '#' in line[0][0]:
                     pass
                 else:
-                    self._fts = \
-                        self._add_none_to_empty_fields(self._fts)
                     break
             counter += 1
-        self._fts = \
-            self._add_none_to_empty_fields(self._fts)
         return counter
 
+    def _is_field(self, word):
+        """Whether a line starting with word belongs to a block of this
+        section
 
-    def _create_pandas(self):
-        """Transforms the dictionary into a pandas DataFrame"""
-        cols = ['Data Store ID', 'Status', 'Data Volume', 'Comment']
-        self.Table = pd.DataFrame(self._fts, columns=cols)
+        Args:
+            word (str): First word of the line
+
+        Returns:
+            bool: True if the line is part of the block
+        """
+        return word == 'FTS:'
 
+    def _create_pandas(self):
+        """Transforms the records into a pandas DataFrame"""
+        self.Table = self._fts.to_dataframe()
 
-class FOVs(EDF):
-    """Field of Views class
 
-    Attributes:
-        Table (DataFrame): Pandas DataFrame containing the information
+class _ObjectsReader(EDF):
+    """Base class of the sections made of objects, every one of them
+    starting with a keyword line and followed by a line per field.
     """
 
-    def __init__(self):
-        self.Table = None
-        self._fov = {"FOV": [], "FOV_lookat": [], "FOV_upvector": [],
-                     "FOV_type": [], "FOV_algorithm": [],
-                     "FOV_geometric_angles": [], "FOV_geometric_pixels": [],
-                     "FOV_sub_view": [], "FOV_straylight_angles": [],
-                     "FOV_straylight_duration": [], "FOV_active": [],
-                     "FOV_image_timing": [], "FOV_imaging": [],
-                     "FOV_pitch": [], "FOV_yaw": []}
-
-    def _read(self, content):
-        """Function that converts the input content into a dictionary
+    def _read_objects(self, content, pos, records, keyword):
+        """Function that converts the input content into records
 
         Args:
-            content (list): Lines where a object of this type was detected at
-            the beginning.
+            content (list): Lines of the file
+            pos (int): Line where an object of this type was detected
+            records (_Records): Records the objects are added to
+            keyword (str): Field starting a new object
 
         Returns:
             int: number of lines used from the content
         """
         counter = 0
-        for line in content:
-            line = line.split()
+        for line in self._lines(content, pos):
             if len(line) > 1:
-                if line[0][:-1] in self._fov:
-                    # If another FOV detected we ensure to keep same length
-                    # of all the elements in the dictionary
-                    if line[0] == 'FOV:':
-                        self._fov = \
-                            self._add_none_to_empty_fields(self._fov)
-                    self._fov[line[0][:-1]].append(' '.join(line[1:]))
+                if line[0][:-1] in records:
+                    # If another object is detected a new row is started
+                    if line[0][:-1].upper() == keyword:
+                        records.new()
+                    records.add(line[0][:-1], ' '.join(line[1:]))
                 elif '#' in line[0][0]:
                     pass
                 else:
-                    self._fov = \
-                        self._add_none_to_empty_fields(self._fov)
                     break
             counter += 1
-        self._fov = \
-            self._add_none_to_empty_fields(self._fov)
         return counter
 
+
+class FOVs(_ObjectsReader):
+    """Field of Views class
+
+    Attributes:
+        Table (DataFrame): Pandas DataFrame containing the information
+    """
+
+    def __init__(self):
+        self.Table = None
+        self._fov = _Records(
+            ["FOV", "FOV_lookat", "FOV_upvector", "FOV_type",
+             "FOV_algorithm", "FOV_geometric_angles", "FOV_geometric_pixels",
+             "FOV_sub_view", "FOV_straylight_angles",
+             "FOV_straylight_duration", "FOV_active", "FOV_image_timing",
+             "FOV_imaging", "FOV_pitch", "FOV_yaw"])
+
+    def _read(self, content, pos=0):
+        """Function that converts the input content into records
+
+        Args:
+            content (list): Lines of the file
+            pos (int): Line where an object of this type was detected
+
+        Returns:
+            int: number of lines used from the content
+        """
+        return self._read_objects(content, pos, self._fov, 'FOV')
+
+    def _is_field(self, word):
+        """Whether a line starting with word belongs to a block of this
+        section
+
+        Args:
+            word (str): First word of the line
+
+        Returns:
+            bool: True if the line is part of the block
+        """
+        return word[:-1] in self._fov
+
     def _create_pandas(self):
-        """Transforms the dictionary into a pandas DataFrame"""
-        cols = ["FOV", "FOV_lookat", "FOV_upvector", "FOV_type",
-                "FOV_algorithm", "FOV_geometric_angles",
-                "FOV_geometric_pixels", "FOV_sub_view",
-                "FOV_straylight_angles", "FOV_straylight_duration",
-                "FOV_active", "FOV_image_timing", "FOV_imaging",
-                "FOV_pitch", "FOV_yaw"]
-        self.Table = pd.DataFrame(self._fov, columns=cols)
+        """Transforms the records into a pandas DataFrame"""
+        self.Table = self._fov.to_dataframe()
 
 
-class Areas(EDF):
+class Areas(_ObjectsReader):
     """Areas class
 
     Attributes:
@@ -602,49 +816,40 @@ class Areas(EDF):
 
     def __init__(self):
         self.Table = None
-        self._areas = {"Area": [], "Area_orientation": [],
-                       "Area_lighting_angle": [], "Area_lighting_duration": []}
+        self._areas = _Records(["Area", "Area_orientation",
+                                "Area_lighting_angle",
+                                "Area_lighting_duration"])
 
-    def _read(self, content):
-        """Function that converts the input content into a dictionary
+    def _read(self, content, pos=0):
+        """Function that converts the input content into records
 
         Args:
-            content (list): Lines where a object of this type was detected at
-            the beginning.
+            content (list): Lines of the file
+            pos (int): Line where an object of this type was detected
 
         Returns:
             int: number of lines used from the content
         """
-        counter = 0
-        for line in content:
-            line = line.split()
-            if len(line) > 1:
-                if line[0][:-1] in self._areas:
-                    # If another AREA detected we ensure to keep same length
-                    # of all the elements in the dictionary
-                    if line[0] == 'Area:':
-                        self._areas = \
-                            self._add_none_to_empty_fields(self._areas)
-                    self._areas[line[0][:-1]].append(' '.join(line[1:]))
-                elif '#' in line[0][0]:
-                    pass
-                else:
-                    self._areas = \
-                        self._add_none_to_empty_fields(self._areas)
-                    break
-            counter += 1
-        self._areas = \
-            self._add_none_to_empty_fields(self._areas)
-        return counter
+        return self._read_objects(content, pos, self._areas, 'AREA')
+
+    def _is_field(self, word):
+        """Whether a line starting with word belongs to a block of this
+        section
+
+        Args:
+            word (str): First word of the line
+
+        Returns:
+            bool: True if the line is part of the block
+        """
+        return word[:-1] in self._areas
 
     def _create_pandas(self):
-        """Transforms the dictionary into a pandas DataFrame"""
-        cols = ["Area", "Area_orientation", "Area_lighting_angle",
-                "Area_lighting_duration"]
-        self.Table = pd.DataFrame(self._areas, columns=cols)
+        """Transforms the records into a pandas DataFrame"""
+        self.Table = self._areas.to_dataframe()
 
 
-class Modes(EDF):
+class Modes(_ObjectsReader):
     """Modes class
 
     Attributes:
@@ -653,55 +858,55 @@ class Modes(EDF):
 
     def __init__(self):
         self.Table = None
-        self._modes = {"Mode": [], "Mode_class": [], "Module_states": [],
-                       "Internal_clock": [], "PID_enable_flags": [],
-                       "Nominal_power": [], "Power_parameter": [],
-                       "Nominal_data_rate": [], "Data_rate_parameter": [],
-                       "Mode_aux_data_rate": [], "Equivalent_power": [],
-                       "Equivalent_data_rate": [], "Mode_transitions": [],
-                       "Mode_actions": [], "Mode_constraints": []}
+        self._modes = _Records(
+            ["Mode", "Mode_class", "Module_states", "Internal_clock",
+             "PID_enable_flags", "Nominal_power", "Power_parameter",
+             "Nominal_data_rate", "Data_rate_parameter",
+             "Mode_aux_data_rate", "Equivalent_power",
+             "Equivalent_data_rate", "Mode_transitions", "Mode_actions",
+             "Mode_constraints"])
 
-    def _read(self, content):
-        """Function that converts the input content into a dictionary
+    def _read(self, content, pos=0):
+        """Function that converts the input content into records
 
         Args:
-            content (list): Lines where a object of this type was detected at
-            the beginning.
+            content (list): Lines of the file
+            pos (int): Line where an object of this type was detected
 
         Returns:
             int: number of lines used from the content
         """
-        counter = 0
-        for line in content:
-            line = line.split()
-            if len(line) > 1:
-                if line[0][:-1] in self._modes:
-                    # If another MODE detected we ensure to keep same
-                    # length of all the elements in the dictionary
-                    if line[0][:-1].upper() == 'MODE':
-                        self._modes = \
-                            self._add_none_to_empty_fields(self._modes)
-                    self._modes[line[0][:-1]].append(' '.join(line[1:]))
-                elif '#' in line[0][0]:
-                    pass
-                else:
-                    self._modes = \
-                        self._add_none_to_empty_fields(self._modes)
-                    break
-            counter += 1
-        self._modes = \
-            self._add_none_to_empty_fields(self._modes)
-        return counter
+        return self._read_objects(content, pos, self._modes, 'MODE')
+
+    def _is_field(self, word):
+        """Whether a line starting with word belongs to a block of this
+        section
+
+        Args:
+            word (str): First word of the line
+
+        Returns:
+            bool: True if the line is part of the block
+        """
+        return word[:-1] in self._modes
 
     def _create_pandas(self):
-        """Transforms the dictionary into a pandas DataFrame"""
-        cols = ["Mode", "Mode_class", "Module_states", "Internal_clock",
-                "PID_enable_flags", "Nominal_power", "Power_parameter",
-                "Nominal_data_rate", "Data_rate_parameter",
-                "Mode_aux_data_rate", "Equivalent_power",
-                "Equivalent_data_rate", "Mode_transitions", "Mode_actions",
-                "Mode_constraints"]
-        self.Table = pd.DataFrame(self._modes, columns=cols)
+        """Transforms the records into a pandas DataFrame"""
+        self.Table = self._modes.to_dataframe()
+
+    def typed_table(self):
+        """Power and data rates of the modes as floats in SI units, computed
+        once
+
+        Returns:
+            DataFrame: Mode, and powers in W and data rates in bit/s
+        """
+        return self._typed_table(
+            self.Table, 'Mode',
+            [('Nominal_power', 'Watts'), ('Nominal_data_rate', 'Kbits/sec'),
+             ('Mode_aux_data_rate', 'Kbits/sec'),
+             ('Equivalent_power', 'Watts'),
+             ('Equivalent_data_rate', 'Kbits/sec')])
 
 
 class Modules(EDF):
@@ -716,82 +921,79 @@ class Modules(EDF):
 
     def __init__(self):
         self.Table = None
-        self._modules = {"Module": [], "Module_level": [],
-                         "Module_dataflow": [], "Module_PID": [],
-                         "Module_aux_PID": [], "Sub_modules": [],
-                         "Nr_of_module_states": []}
+        self._modules = _Records(["Module", "Module_level", "Module_dataflow",
+                                  "Module_PID", "Module_aux_PID",
+                                  "Sub_modules", "Nr_of_module_states"])
         self.Module_states_Table = None
-        self._module_states = {"Module_state": [], "MS_PID": [],
-                               "MS_aux_PID": [], "MS_power": [],
-                               "MS_power_parameter": [], "MS_data_rate": [],
-                               "MS_data_rate_parameter": [],
-                               "MS_aux_data_rate": [], "MS_constraints": [],
-                               "Repeat_action": [], "MS_pitch": [],
-                               "MS_yaw": []}
+        self._module_states = _Records(
+            ["Module_state", "MS_PID", "MS_aux_PID", "MS_power",
+             "MS_power_parameter", "MS_data_rate", "MS_data_rate_parameter",
+             "MS_aux_data_rate", "MS_constraints", "Repeat_action",
+             "MS_pitch", "MS_yaw"])
 
-    def _read(self, content):
-        """Function that converts the input content into a dictionary
+    def _read(self, content, pos=0):
+        """Function that converts the input content into records
 
         Args:
-            content (list): Lines where a object of this type was detected at
-            the beginning.
+            content (list): Lines of the file
+            pos (int): Line where an object of this type was detected
 
         Returns:
             int: number of lines used from the content
         """
         counter = 0
-        for line in content:
-            line = line.split()
+        for line in self._lines(content, pos):
             if len(line) > 1:
                 if line[0][:-1] in self._modules:
-                    # If another MODULE detected we ensure to keep same
-                    # length of all the elements in the dictionary
+                    # If another MODULE detected a new row is started
                     if line[0][:-1].upper() == 'MODULE':
-                        self._modules = \
-                            self._add_none_to_empty_fields(self._modules)
-                    self._modules[line[0][:-1]].append(' '.join(line[1:]))
+                        self._modules.new()
+                    self._modules.add(line[0][:-1], ' '.join(line[1:]))
                 elif line[0][:-1] in self._module_states:
-                    # If another MODULE_STATE detected we ensure to keep
-                    # same length of all the elements in the dictionary
+                    # If another MODULE_STATE detected a new row is started
                     if line[0][:-1].upper() == 'MODULE_STATE':
                         # Adding module name for every module state
-                        if isinstance(self._modules['Module'][-1], list):
-                            line[1] = self._modules['Module'][-1][0] \
-                                + " - " + line[1]
-                        else:
-                            line[1] = self._modules['Module'][-1] \
-                                + " - " + line[1]
-                        self._module_states = \
-                            self._add_none_to_empty_fields(self._module_states)
-                    self._module_states[line[0][:-1]].append(
-                        ' '.join(line[1:]))
+                        line[1] = self._modules.last('Module') \
+                            + " - " + line[1]
+                        self._module_states.new()
+                    self._module_states.add(line[0][:-1], ' '.join(line[1:]))
                 elif '#' in line[0][0]:
                     pass
                 else:
-                    self._modules = \
-                        self._add_none_to_empty_fields(self._modules)
-                    self._module_states = \
-                        self._add_none_to_empty_fields(self._module_states)
                     break
             counter += 1
-
-        self._modules = \
-            self._add_none_to_empty_fields(self._modules)
-        self._module_states = \
-            self._add_none_to_empty_fields(self._module_states)
         return counter
 
+    def _is_field(self, word):
+        """Whether a line starting with word belongs to a block of this
+        section
+
+        Args:
+            word (str): First word of the line
+
+        Returns:
+            bool: True if the line is part of the block
+        """
+        return word[:-1] in self._modules or \
+            word[:-1] in self._module_states
+
     def _create_pandas(self):
-        """Transforms the dictionary into a pandas DataFrame"""
-        cols = ["Module", "Module_level", "Module_dataflow", "Module_PID",
-                "Module_aux_PID", "Sub_modules", "Nr_of_module_states"]
-        self.Table = pd.DataFrame(self._modules, columns=cols)
-        cols = ["Module_state", "MS_PID", "MS_aux_PID", "MS_power",
-                "MS_power_parameter", "MS_data_rate",
-                "MS_data_rate_parameter", "MS_aux_data_rate",
-                "MS_constraints", "Repeat_action", "MS_pitch", "MS_yaw"]
-        self.Module_states_Table = pd.DataFrame(
-            self._module_states, columns=cols)
+        """Transforms the records into a pandas DataFrame"""
+        self.Table = self._modules.to_dataframe()
+        self.Module_states_Table = self._module_states.to_dataframe()
+
+    def typed_table(self):
+        """Power and data rates of the module states as floats in SI units,
+        computed once
+
+        Returns:
+            DataFrame: Module_state, and MS_power in W and data rates in
+            bit/s
+        """
+        return self._typed_table(
+            self.Module_states_Table, 'Module_state',
+            [('MS_power', 'Watts'), ('MS_data_rate', 'Kbits/sec'),
+             ('MS_aux_data_rate', 'Kbits/sec')])
 
 
 class Parameters(EDF):
@@ -806,83 +1008,70 @@ class Parameters(EDF):
 
     def __init__(self):
         self.Table = None
-        self._parameters = {"Parameter": [], "Parameter_alias": [],
-                            "State_parameter": [], "Parameter_action": [],
-                            "Raw_type": [], "Eng_type": [],
-                            "Default_value": [], "Unit": [], "Raw_limits": [],
-                            "Eng_limits": [], "Resource": [],
-                            "Value_alias": [], "Nr_of_parameter_values": []}
+        self._parameters = _Records(
+            ["Parameter", "Parameter_alias", "State_parameter",
+             "Parameter_action", "Raw_type", "Eng_type", "Default_value",
+             "Unit", "Raw_limits", "Eng_limits", "Resource", "Value_alias",
+             "Nr_of_parameter_values"])
         self.Parameter_values_Table = None
-        self._parameter_values = {"Parameter_value": [], "Parameter_uas": [],
-                                  "Parameter_uwr": [], "Parameter_run": []}
+        self._parameter_values = _Records(["Parameter_value", "Parameter_uas",
+                                           "Parameter_uwr", "Parameter_run"])
 
-    def _read(self, content):
-        """Function that converts the input content into a dictionary
+    def _read(self, content, pos=0):
+        """Function that converts the input content into records
 
         Args:
-            content (list): Lines where a object of this type was detected at
-            the beginning.
+            content (list): Lines of the file
+            pos (int): Line where an object of this type was detected
 
         Returns:
             int: number of lines used from the content
         """
         counter = 0
-        for line in content:
-            line = line.split()
+        for line in self._lines(content, pos):
             if len(line) > 1:
                 if line[0][:-1] in self._parameters:
-                    # If another PARAMETER detected we ensure to keep same
-                    # length of all the elements in the dictionary
+                    # If another PARAMETER detected a new row is started
                     if line[0][:-1].upper() == 'PARAMETER':
-                        self._parameters = \
-                            self._add_none_to_empty_fields(self._parameters)
-                    self._parameters[line[0][:-1]].append(' '.join(line[1:]))
+                        self._parameters.new()
+                    self._parameters.add(line[0][:-1], ' '.join(line[1:]))
                 elif line[0][:-1] in self._parameter_values:
-                    # If another PARAMETER VALUE detected we ensure to keep
-                    # same length of all the elements in the dictionary
+                    # If another PARAMETER VALUE detected a new row is
+                    # started
                     if line[0][:-1].upper() == 'PARAMETER_VALUE':
-                        # Adding module name for every module state
-                        if isinstance(self._parameters['Parameter'][-1], list):
-                            line[1] = self._parameters['Parameter'][-1][0] \
-                                + " - " + line[1]
-                        else:
-                            line[1] = self._parameters['Parameter'][-1] \
-                                + " - " + line[1]
-                        self._parameter_values = \
-                            self._add_none_to_empty_fields(
-                                self._parameter_values)
-                    self._parameter_values[line[0][:-1]].append(
-                        ' '.join(line[1:]))
+                        # Adding parameter name for every parameter value
+                        line[1] = self._parameters.last('Parameter') \
+                            + " - " + line[1]
+                        self._parameter_values.new()
+                    self._parameter_values.add(line[0][:-1],
+                                               ' '.join(line[1:]))
                 elif '#' in line[0][0]:
                     pass
                 else:
-                    self._parameters = \
-                        self._add_none_to_empty_fields(self._parameters)
-                    self._parameter_values = \
-                        self._add_none_to_empty_fields(self._parameter_values)
                     break
             counter += 1
-
-        self._parameters = \
-            self._add_none_to_empty_fields(self._parameters)
-        self._parameter_values = \
-            self._add_none_to_empty_fields(self._parameter_values)
         return counter
 
+    def _is_field(self, word):
+        """Whether a line starting with word belongs to a block of this
+        section
+
+        Args:
+            word (str): First word of the line
+
+        Returns:
+            bool: True if the line is part of the block
+        """
+        return word[:-1] in self._parameters or \
+            word[:-1] in self._parameter_values
+
     def _create_pandas(self):
-        """Transforms the dictionary into a pandas DataFrame"""
-        cols = ["Parameter", "Parameter_alias", "State_parameter",
-                "Parameter_action", "Raw_type", "Eng_type", "Default_value",
-                "Unit", "Raw_limits", "Eng_limits", "Resource",
-                "Value_alias", "Nr_of_parameter_values"]
-        self.Table = pd.DataFrame(self._parameters, columns=cols)
-        cols = ["Parameter_value", "Parameter_uas", "Parameter_uwr",
-                "Parameter_run"]
-        self.Parameter_values_Table = pd.DataFrame(
-            self._parameter_values, columns=cols)
-
-
-class Actions(EDF):
+        """Transforms the records into a pandas DataFrame"""
+        self.Table = self._parameters.to_dataframe()
+        self.Parameter_values_Table = self._parameter_values.to_dataframe()
+
+
+class Actions(_ObjectsReader):
     """Actions class
 
     Attributes:
@@ -891,70 +1080,60 @@ class Actions(EDF):
 
     def __init__(self):
         self.Table = None
-        self._actions = {"Action": [], "Action_alias": [], "Action_level": [],
-                         "Action_type": [], "Action_subsystem": [],
-                         "Action_parameters": [], "Internal_variables": [],
-                         "Computed_parameters": [], "Duration": [],
-                         "Minimum_duration": [], "Compression": [],
-                         "Separation": [], "Action_dataflow": [],
-                         "Action_PID": [], "Power_increase": [],
-                         "Data_rate_increase": [], "Data_volume": [],
-                         "Power_profile": [], "Data_rate_profile": [],
-                         "Write_to_Z_record": [], "Action_power_check": [],
-                         "Action_data_rate_check": [], "Obs_ID": [],
-                         "Update_at_start": [], "Update_when_ready": [],
-                         "Action_constraints": [], "Run_type": [],
-                         "Run_start_time": [], "Run_actions": []}
-
-    def _read(self, content):
-        """Function that converts the input content into a dictionary
+        self._actions = _Records(
+            ["Action", "Action_alias", "Action_level", "Action_type",
+             "Action_subsystem", "Action_parameters", "Internal_variables",
+             "Computed_parameters", "Duration", "Minimum_duration",
+             "Compression", "Separation", "Action_dataflow", "Action_PID",
+             "Power_increase", "Data_rate_increase", "Data_volume",
+             "Power_profile", "Data_rate_profile", "Write_to_Z_record",
+             "Action_power_check", "Action_data_rate_check", "Obs_ID",
+             "Update_at_start", "Update_when_ready", "Action_constraints",
+             "Run_type", "Run_start_time", "Run_actions"])
+
+    def _read(self, content, pos=0):
+        """Function that converts the input content into records
 
         Args:
-            content (list): Lines where a object of this type was detected at
-            the beginning.
+            content (list): Lines of the file
+            pos (int): Line where an object of this type was detected
 
         Returns:
             int: number of lines used from the content
         """
-        counter = 0
-        for line in content:
-            line = line.split()
-            if len(line) > 1:
-                if line[0][:-1] in self._actions:
-                    # If another ACTION detected we ensure to keep same
-                    # length of all the elements in the dictionary
-                    if line[0][:-1].upper() == 'ACTION':
-                        self._actions = \
-                            self._add_none_to_empty_fields(self._actions)
-                    self._actions[line[0][:-1]].append(' '.join(line[1:]))
-                elif '#' in line[0][0]:
-                    pass
-                else:
-                    self._actions = \
-                        self._add_none_to_empty_fields(self._actions)
-                    break
-            counter += 1
+        return self._read_objects(content, pos, self._actions, 'ACTION')
 
-        self._actions = \
-            self._add_none_to_empty_fields(self._actions)
+    def _is_field(self, word):
+        """Whether a line starting with word belongs to a block of this
+        section
 
-        return counter
+        Args:
+            word (str): First word of the line
+
+        Returns:
+            bool: True if the line is part of the block
+        """
+        return word[:-1] in self._actions
 
     def _create_pandas(self):
-        """Transforms the dictionary into a pandas DataFrame"""
-        cols = ["Action", "Action_alias", "Action_level", "Action_type",
-                "Action_subsystem", "Action_parameters", "Internal_variables",
-                "Computed_parameters", "Duration", "Minimum_duration",
-                "Compression", "Separation", "Action_dataflow", "Action_PID",
-                "Power_increase", "Data_rate_increase", "Data_volume",
-                "Power_profile", "Data_rate_profile", "Write_to_Z_record",
-                "Action_power_check", "Action_data_rate_check", "Obs_ID",
-                "Update_at_start", "Update_when_ready", "Action_constraints",
-                "Run_type", "Run_start_time", "Run_actions"]
-        self.Table = pd.DataFrame(self._actions, columns=cols)
-
-
-class Constraints(EDF):
+        """Transforms the records into a pandas DataFrame"""
+        self.Table = self._actions.to_dataframe()
+
+    def typed_table(self):
+        """Power, data rate and data volume of the actions as floats in SI
+        units, computed once
+
+        Returns:
+            DataFrame: Action, and Power_increase in W, Data_rate_increase
+            in bit/s and Data_volume in bit
+        """
+        return self._typed_table(
+            self.Table, 'Action',
+            [('Power_increase', 'Watts'), ('Data_rate_increase', 'Kbits/sec'),
+             ('Data_volume', 'Kbits')])
+
+
+class Constraints(_ObjectsReader):
     """Constraints class
 
     Attributes:
@@ -963,49 +1142,36 @@ class Constraints(EDF):
 
     def __init__(self):
         self.Table = None
-        self._constraints = {"Constraint": [], "Constraint_type": [],
-                             "Severity": [], "Constraint_group": [],
-                             "Condition": [], "Resource_constraint": [],
-                             "Resource_mass_memory": [],
-                             "Parameter_constraint": [],
-                             "Condition_experiment": [], "Expression": []}
+        self._constraints = _Records(
+            ["Constraint", "Constraint_type", "Severity", "Constraint_group",
+             "Condition", "Resource_constraint", "Resource_mass_memory",
+             "Parameter_constraint", "Condition_experiment", "Expression"])
 
-    def _read(self, content):
-        """Function that converts the input content into a dictionary
+    def _read(self, content, pos=0):
+        """Function that converts the input content into records
 
         Args:
-            content (list): Lines where a object of this type was detected at
-            the beginning.
+            content (list): Lines of the file
+            pos (int): Line where an object of this type was detected
 
         Returns:
             int: number of lines used from the content
         """
-        counter = 0
-        for line in content:
-            line = line.split()
-            if len(line) > 1:
-                if line[0][:-1] in self._constraints:
-                    # If another CONSTRAINT detected we ensure to keep same
-                    # length of all the elements in the dictionary
-                    if line[0][:-1].upper() == 'CONSTRAINT':
-                        self._constraints = \
-                            self._add_none_to_empty_fields(self._constraints)
-                    self._constraints[line[0][:-1]].append(' '.join(line[1:]))
-                elif '#' in line[0][0]:
-                    pass
-                else:
-                    self._constraints = \
-                        self._add_none_to_empty_fields(self._constraints)
-                    break
-            counter += 1
-        self._constraints = \
-            self._add_none_to_empty_fields(self._constraints)
-        return counter
+        return self._read_objects(content, pos, self._constraints,
+                                  'CONSTRAINT')
+
+    def _is_field(self, word):
+        """Whether a line starting with word belongs to a block of this
+        section
+
+        Args:
+            word (str): First word of the line
+
+        Returns:
+            bool: True if the line is part of the block
+        """
+        return word[:-1] in self._constraints
 
     def _create_pandas(self):
-        """Transforms the dictionary into a pandas DataFrame"""
-        cols = ["Constraint", "Constraint_type", "Severity",
-                "Constraint_group", "Condition", "Resource_constraint",
-                "Resource_mass_memory", "Parameter_constraint",
-                "Condition_experiment", "Expression"]
-        self.Table = pd.DataFrame(self._constraints, columns=cols)
+        """Transforms the records into a pandas DataFrame"""
+        self.Table = self._constraints.to_dataframe()
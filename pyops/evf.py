@@ -1,7 +1,101 @@
-from pyops.utils import is_elapsed_time, parse_time, getMonth
+from pyops.utils import parse_time, getMonth, parse_event_times, \
+    format_timeline_header, EVENT_TIME_PATTERN
 import pandas as pd
 from datetime import datetime
 import os
+import re
+
+# Columns of the events table
+EVENT_COLUMNS = ['raw_time', 'event', 'experiment', 'item', 'count',
+                 'comment']
+
+# <time> <event> [(EXP = <experiment> ITEM = <item>)] [(COUNT = <count>)]
+# [# comment], the parenthesis being optional
+_EVENT_GRAMMAR = (
+    r'[ \t]*(\S+)[ \t]+([^\s#]+)'
+    r'(?:[ \t]+\(?EXP[ \t]+=[ \t]+([^\s()#]+)[ \t]+ITEM[ \t]+=[ \t]+'
+    r'([^\s()#]+)\)?)?'
+    r'(?:[ \t]+\(?COUNT[ \t]+=[ \t]+([^\s()#]+)\)?)?'
+    r'(?:[ \t]+(#[^\n]*))?[ \t]*$')
+_EVENT = re.compile(_EVENT_GRAMMAR, re.IGNORECASE)
+_EVENTS = re.compile('^' + _EVENT_GRAMMAR, re.IGNORECASE | re.MULTILINE)
+
+
+def _read_events(lines):
+    # When every line follows the usual grammar they are all read by a
+    # single regex search, otherwise they are read one by one
+    found = _EVENTS.findall(''.join(lines))
+    if len(found) != len(lines):
+        return pd.DataFrame([_read_event(line) for line in lines],
+                            columns=EVENT_COLUMNS)
+    columns = list(zip(*found)) or [()] * len(EVENT_COLUMNS)
+    # Empty groups are missing values, experiments, items and counts are
+    # upper case as in _read_event_tokens
+    data = dict(raw_time=columns[0], event=columns[1],
+                experiment=[v.upper() or None for v in columns[2]],
+                item=[v.upper() or None for v in columns[3]],
+                count=[v.upper() or None for v in columns[4]],
+                comment=[v or None for v in columns[5]])
+    return pd.DataFrame(data, columns=EVENT_COLUMNS)
+
+
+def _read_event(line):
+    match = _EVENT.match(line.rstrip('\n'))
+    if match is not None:
+        raw_time, event, experiment, item, count, comment = match.groups()
+        if experiment is not None:
+            experiment = experiment.upper()
+            item = item.upper()
+        if count is not None:
+            count = count.upper()
+        return raw_time, event, experiment, item, count, comment
+    return _read_event_tokens(line)
+
+
+def _read_event_tokens(line):
+    # Token by token reading of the lines _EVENT doesn't match
+    # Storing comments
+    if '#' in line:
+        index = line.index('#')
+        comment = line[index:-1]
+    else:
+        comment = None
+    # Consecutive whitespace are regarded as a single separator
+    l = line.split()
+    raw_time = l[0]
+    event = l[1]
+
+    l = [e.upper() for e in l]
+
+    experiment = None
+    item = None
+    if 'ITEM' in l:
+        # In the file it should be: EXP = <experiment> ITEM = <item>
+        experiment = l[l.index('ITEM') - 1]
+
+        # In the file it should be: ITEM = <item>
+        item = l[l.index('ITEM') + 2]
+        # Removing last parenthesis if exist
+        if item[-1] == ')':
+            item = item[:-1]
+        if '#' in item:
+            item = item[:item.index('#') - 1]
+
+    count = None
+    if 'COUNT' in l or '(COUNT' in l:
+        if 'COUNT' in l:
+            # In the file it should be: COUNT = <count>
+            count = l[l.index('COUNT') + 2]
+        else:
+            # In the file it should be: (COUNT = <count>)
+            count = l[l.index('(COUNT') + 2]
+        # Removing useless characters at the end
+        if count[-1] == ')':
+            count = count[:-1]
+        if '#' in count:
+            count = count[:count.index('#') - 1]
+
+    return raw_time, event, experiment, item, count, comment
 
 
 class EVF:
@@ -15,6 +109,7 @@ class EVF:
         self.init_values = list()
         self.include_files = list()
         self.propagation_delay = None
+        self.time_errors = None
 
         # Loading the given file
         self.load(fname)
@@ -22,9 +117,8 @@ class EVF:
     def load(self, fname):
         # Storing the name of the file for editting purposes
         self.fname = fname
-        # Auxiliary dictionary to speed up the data convertion into pandas
-        aux_dict = dict(raw_time=[], time=[], event=[], experiment=[], item=[],
-                        count=[], comment=[])
+        # Event lines, parsed in one go at the end
+        events = list()
 
         # Importing the file
         out_ouf_metadata = False
@@ -41,20 +135,20 @@ class EVF:
                     else:
                         self.WTF.append(line)
                 # Storing events
-                elif is_elapsed_time(line.split()[0]):
-                    aux_dict = self._read_events(line, aux_dict)
+                elif EVENT_TIME_PATTERN.search(line.split(None, 1)[0]):
+                    events.append(line)
                 # Useful data from the header
                 else:
                     # We can say we are out of the metadate here because
                     # start_time and end_time are mandatory in the files
                     out_ouf_metadata = True
                     self._read_header_line(line.split())
-        # Closing the file
-        f.close()
         # Creating the pandas dataframe
-        self.events = pd.DataFrame(aux_dict)
-        # Sorting by the time
-        self.events = self.events.sort(['time'])
+        self.events = _read_events(events)
+        # Converting all the times at once
+        self.events['time'] = self._to_datetimes(self.events['raw_time'])
+        # Sorting by the time, keeping the order of simultaneous events
+        self.events = self.events.sort(['time'], kind='mergesort')
         # Sorting the columns in the dataframe
         cols = ['raw_time', 'time', 'event', 'experiment', 'item', 'count',
                 'comment']
@@ -65,57 +159,6 @@ class EVF:
             self.meta[line[1:line.index(': ')].strip()] = \
                 line[line.index(': ') + 1:-1].strip()
 
-    def _read_events(self, line, aux_dict):
-        # Storing comments
-        if '#' in line:
-            index = line.index('#')
-            aux_dict['comment'].append(line[index:-1])
-        else:
-            aux_dict['comment'].append(None)
-        # Consecutive whitespace are regarded as a single separator
-        l = line.split()
-        aux_dict['raw_time'].append(l[0])
-        aux_dict['time'].append(self._to_datetime(l[0]))
-        aux_dict['event'].append(l[1])
-
-        l = [e.upper() for e in line.split()]
-
-        if 'ITEM' in l:
-            # In the file it should be: EXP = <experiment> ITEM = <item>
-            aux_dict['experiment'].append(l[l.index('ITEM') - 1])
-
-            # In the file it should be: ITEM = <item>
-            aux_dict['item'].append(l[l.index('ITEM') + 2])
-            # Removing last parenthesis if exist
-            if aux_dict['item'][-1][-1] == ')':
-                aux_dict['item'][-1] = aux_dict['item'][-1][:-1]
-            if '#' in aux_dict['item'][-1]:
-                aux_dict['item'][-1] = \
-                    aux_dict['item'][-1][:aux_dict['item'][-1].index('#') - 1]
-        else:
-            # Storing empty values
-            aux_dict['experiment'].append(None)
-            aux_dict['item'].append(None)
-
-        if 'COUNT' in l or '(COUNT' in l:
-            if 'COUNT' in l:
-                # In the file it should be: COUNT = <count>
-                aux_dict['count'].append(l[l.index('COUNT') + 2])
-            else:
-                # In the file it should be: (COUNT = <count>)
-                aux_dict['count'].append(l[l.index('(COUNT') + 2])
-            # Removing useless characters at the end
-            if aux_dict['count'][-1][-1] == ')':
-                aux_dict['count'][-1] = aux_dict['count'][-1][:-1]
-            if '#' in aux_dict['count'][-1]:
-                aux_dict['count'][-1] = \
-                    aux_dict[
-                        'count'][-1][:aux_dict['count'][-1].index('#') - 1]
-        else:
-            aux_dict['count'].append(None)
-
-        return aux_dict
-
     def _read_header_line(self, line):
         if 'Ref_date:' in line:
             # Storing them in "raw" format
@@ -157,65 +200,39 @@ class EVF:
                 return parse_time("000_" + element.split('_')[1], date)
             return parse_time(element, self.ref_date)
 
+    def _to_datetimes(self, raw_times):
+        """
+        Bulk version of _to_datetime for the event times (see
+        parse_event_times). The raw times that can't be converted are kept
+        in self.time_errors and get NaT.
+        """
+        times = parse_event_times(raw_times.values, self.ref_date)
+        times.index = raw_times.index
+        self.time_errors = raw_times[times.isnull()]
+        return times
+
     def to_file(self, fname):
+        """
+        Writes the events to fname so that loading it again gives back the
+        same header and events.
+        """
+        events = self.events
+        lines = events['raw_time'] + '   ' + events['event']
+        experiment = events['experiment'].notnull().values
+        lines[experiment] = lines[experiment] + '  (EXP = ' + \
+            events['experiment'][experiment] + ' ITEM = ' + \
+            events['item'][experiment] + ')'
+        count = events['count'].notnull().values
+        lines[count] = lines[count] + ' (COUNT = ' + \
+            events['count'][count] + ')'
+        # The comments keep their '#'
+        comment = events['comment'].notnull().values
+        lines[comment] = lines[comment] + ' ' + events['comment'][comment]
+
         # Creating file if the file doesn't exist and truncating it if exists
-        with open(fname, 'w') as f:
-            # Copying the header
-            [f.write(line) for line in self.header]
-
-            # Copying the useful data in the header
-            # Reg_date
-            if self.ref_date is not None:
-                f.write("Ref_date: " + self.raw_ref_time + "\n#\n")
-
-            # Start and End time
-            f.write("Start_time: " + self.raw_start_time + "\n")
-            f.write("End_time: " + self.raw_end_time + "\n#\n")
-
-            # Propagation delay
-            if self.propagation_delay is not None:
-                output = ""
-                for element in self.propagation_delay:
-                    output += " " + element
-                f.write("Propagation_delay: " + output + "\n#\n")
-
-            # Init values
-            if len(self.init_values) > 0:
-                for value in self.init_values:
-                    output = ""
-                    for element in value:
-                        output += " " + element
-                    f.write("Init_value: " + output + "\n")
-                f.write("#\n")
-
-            # Include files
-            if len(self.include_files) > 0:
-                for include in self.include_files:
-                    output = ""
-                    for element in include:
-                        output += " " + element
-                    f.write("Include_file: " + output + "\n")
-                f.write("#\n")
-
-            # Copying events
-            f.write("# Events_in_list: " + str(len(self.events.index))
-                    + "\n#\n")
-            f.write("# Time                 Event\n#\n")
-            for index, row in self.events.iterrows():
-                output = row['raw_time'] + "   " + row['event']
-                if row['experiment'] is not None:
-                    output += "  (EXP = " + row['experiment'] + " "
-                    output += "ITEM = " + row['item'] + ")"
-                if row['count'] is not None:
-                    output += " (COUNT = " + row['count'] + ")"
-                if row['comment'] is not None:
-                    output += " # " + row['comment']
-                output += "\n"
-                f.write(output)
-
-            f.write("#\n")
-
-        f.close()
+        with open(fname, 'w', 1 << 20) as f:
+            f.writelines(format_timeline_header(self, self.include_files))
+            f.writelines((lines + '\n').tolist())
 
     def check_consistency(self):
         if self.events['time'].min() < self.start_time:
@@ -248,3 +265,13 @@ class EVF:
                 # Perhaps raising an exception here in the future...
 
         return files_exist
+
+    def get_includes(self):
+        """
+        Returns the file path of every include of the file, in order, with
+        no reference date (see ITL.get_includes).
+        """
+        # Getting the path to load correctly the files
+        path = os.path.dirname(os.path.abspath(self.fname))
+        return [(os.path.join(path, f[0].strip('"')), None)
+                for f in self.include_files]
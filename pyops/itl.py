@@ -1,9 +1,226 @@
-from pyops.utils import is_elapsed_time, parse_time, getMonth
+from pyops.utils import is_elapsed_time, parse_time, getMonth, \
+    parse_event_times, format_timeline_header, EVENT_TIME_PATTERN, \
+    file_digest
+import numpy as np
 import pandas as pd
 from datetime import datetime, time, timedelta
 import os
+import re
+import multiprocessing
 from pyops.plots import modes_schedule
 
+# Parsed ITL (or EVF) files by absolute path, so that an include referenced
+# several times is only read once: the (size, modification time) and content
+# digest of the file, and the file as parsed by each (parser, reference date)
+_itl_cache = dict()
+
+# Columns of the event tuples emitted by tokenize_itl
+EVENT_COLUMNS = ['raw_time', 'experiment', 'mode', 'action', 'parameters',
+                 'comment']
+
+# Times relative to an EVF event: <event> [( COUNT = <n> )] <offset>
+_EVENT_NAME = re.compile(r'[A-Za-z_][A-Za-z0-9_]*$')
+_OFFSET = re.compile(r'[+-]?(?:[0-9]+[_.])?[0-9]{1,2}:[0-9]{2}:[0-9]{2}'
+                     r'(?:\.[0-9]*)?$')
+_RELATIVE_TIME = (r'^([A-Za-z_][A-Za-z0-9_]*)\s*'
+                  r'(?:\(\s*COUNT\s*=\s*([0-9]+)\s*\))?\s*(\S+)$')
+
+
+def tokenize_itl(lines):
+    """
+    Single pass tokenizer of ITL files. Every (logical) line is looked at
+    once: '\\' continuation lines are joined, their trailing comments kept
+    apart, and each line is classified and split a single time.
+
+    Yields (kind, value) tuples:
+      - ('event', (raw_time, experiment, mode, action, parameters, comment)),
+        raw_time being '<event> [( COUNT = <n> )] <offset>' for the times
+        relative to an EVF event (see resolve_event_times)
+      - ('include', [file, time, ...]) for INCLUDE events
+      - ('comment', line) for lines starting with '#'
+      - ('line', tokens) for the rest (header lines like Ref_date:)
+    """
+    line = ""
+    line_comments = list()
+    for l in lines:
+        # Formatting just in case there is no space between parenthesis,
+        # leaving the comments as they are
+        if '(' in l or ')' in l:
+            code, hash, comment = l.partition('#')
+            l = code.replace('(', ' ( ').replace(')', ' ) ') + hash + comment
+        # Concatening lines if '\' found
+        if '\\' in l:
+            index = l.index('\\')
+            if l[0] != '#' and l[index + 1:index + 2] != '\\':
+                line += l[:index]
+                line_comments.append(l[index + 1:-1])
+                # Continues with the next iteration of the loop
+                continue
+        # If there was no concatenation of lines
+        if len(line) == 0:
+            line = l
+        # If we were concatenating, we concatenate the last one
+        else:
+            index = l.index(')')
+            line += l[:index + 1]
+            line_comments.append(l[index:])
+
+        first = line[0]
+        if first == '\n' or 'Comment:' in line:
+            pass
+        elif first == '#':
+            yield 'comment', line
+        else:
+            tokens = line.split()
+            if len(tokens) > 0 and EVENT_TIME_PATTERN.search(tokens[0]):
+                if 'INCLUDE' in tokens[1].upper():
+                    yield 'include', _read_include(tokens)
+                else:
+                    yield 'event', _read_event(line, tokens, line_comments)
+            else:
+                relative = _relative_time_length(tokens)
+                if relative > 0:
+                    # The whole relative time is the raw time of the event
+                    tokens = [' '.join(tokens[:relative])] + \
+                        tokens[relative:]
+                    yield 'event', _read_event(line, tokens, line_comments)
+                else:
+                    yield 'line', tokens
+        # Preparing values for next iteration
+        line = ""
+        line_comments = list()
+
+
+def _relative_time_length(tokens):
+    # Number of tokens of an <event> [( COUNT = <n> )] <offset> time at the
+    # start of an event line, 0 if the line doesn't start with one
+    if len(tokens) < 5 or not _EVENT_NAME.match(tokens[0]):
+        return 0
+    length = 1
+    if tokens[1] == '(' and len(tokens) > 6 and \
+            tokens[2].upper() == 'COUNT' and tokens[3] == '=' and \
+            tokens[5] == ')':
+        length = 6
+    if len(tokens) >= length + 4 and _OFFSET.match(tokens[length]):
+        return length + 1
+    return 0
+
+
+def _read_include(l):
+    # Special case of include:
+    # 000_22:30:00 INCLUDE "SA-SFT_FM__-ORB_LOAD-TC_-GEN01A.itl"
+    if '#' in l:
+        index = l.index('#')
+        return [l[2], l[0]] + l[3:index] + [' '.join(l[index:])]
+    return [l[2], l[0]] + l[3:]
+
+
+def _read_event(line, l, line_comments):
+    # Storing comments
+    if '#' in line:
+        comment = line[line.index('#') + 1:-1]
+    elif len(line_comments) > 0 and len(line_comments[0]) > 0:
+        comment = line_comments[0][line_comments[0].index('#') + 1:]
+    else:
+        comment = None
+
+    # If SOC as experiment and PTR isn't the mode then there is no mode
+    if 'SOC' in l[1].upper() and 'PTR' not in l[2]:
+        mode = None
+    else:
+        mode = l[2]
+
+    # If the next element in the line doesn't contain a hash, then
+    # there is an action
+    action = None
+    parameters = None
+    if '#' not in l[3]:
+        action = l[3]
+        # If there are parameters we store them, leaving out the comment
+        if len(l) > 4 and '(' in l[4]:
+            tokens = l[5:]
+            for n, token in enumerate(tokens):
+                if '#' in token:
+                    tokens = tokens[:n]
+                    break
+            parameters = _read_parameters(tokens, line_comments[1:])
+
+    return l[0], l[1], mode, action, parameters, comment
+
+
+def _read_parameters(parameters, line_comments):
+    output = list()
+    # Selecting the indexes of every '=' in the line which implies a new
+    # parameter exist
+    indexes = [i for i, val in enumerate(parameters) if val == '=']
+    for n, index in enumerate(indexes):
+        # If it is the last element we take all but the last expected ')'
+        if n == len(indexes) - 1:
+            last_index = -1
+        else:
+            last_index = indexes[n + 1] - 1
+
+        # We avoid '=', that's why index + 1
+        param = [parameters[index - 1]] + parameters[index + 1:last_index]
+
+        # Adding comments. line_comments & indexes should have same length
+        if n < len(line_comments):
+            comment = line_comments[n]
+            if '#' in comment:
+                param.append((comment[comment.index('#') + 1:]))
+            else:
+                param.append(comment)
+        else:
+            param.append(None)
+        # Adding new parameter tuple
+        output.append(param)
+
+    return output
+
+
+def _format_parameters(parameters, comment):
+    # Parameters up to the last one with a comment go in continuation lines
+    # of their own, as that's where tokenize_itl takes their comments from.
+    # The rest share the closing line, or the event line if none has one.
+    texts = [' '.join([p[0], '='] + list(p[1:-1])) for p in parameters]
+    commented = [n for n, p in enumerate(parameters) if p[-1] is not None]
+    if len(commented) == 0:
+        text = ' ( ' + ' '.join(texts) + ' )'
+        if comment is not None:
+            text += ' #' + comment
+        return text
+    last = commented[-1]
+    lines = [' ( \\' + ('#' + comment if comment is not None else '')]
+    for text, param in zip(texts[:last], parameters[:last]):
+        lines.append('    ' + text + ' \\' +
+                     ('#' + param[-1] if param[-1] is not None else ''))
+    # The comment of the closing line keeps its end of line
+    lines.append('    ' + ' '.join(texts[last:]) + ' ) #' +
+                 parameters[last][-1].rstrip('\n'))
+    return '\n'.join(lines)
+
+
+def format_itl_events(events):
+    """
+    Formats the events of an ITL dataframe as lines of an ITL file, a
+    column at a time. tokenize_itl reads the lines back as the same events.
+    """
+    # SOC events without a mode need something in its place
+    mode = events['mode'].where(events['mode'].notnull(), '*')
+    lines = events['raw_time'] + ' ' + events['experiment'] + ' ' + mode
+    action = events['action'].notnull().values
+    lines[action] = lines[action] + ' ' + events['action'][action]
+
+    parameters = events['parameters'].notnull().values
+    comment = events['comment'].notnull().values & ~parameters
+    lines[comment] = lines[comment] + ' #' + events['comment'][comment]
+    if parameters.any():
+        lines[parameters] = lines[parameters] + [
+            _format_parameters(p, None if pd.isnull(c) else c)
+            for p, c in zip(events['parameters'][parameters],
+                            events['comment'][parameters])]
+    return (lines + '\n').tolist()
+
 
 class ITL:
 
@@ -18,6 +235,10 @@ class ITL:
         self.init_values = list()
         self.merged_events = None
         self.include_files = list()
+        self.time_errors = None
+        self.propagation_delay = None
+        # EVF the event-relative times are resolved with, if any
+        self.evf = None
 
         # Loading the given file
         self.load(fname)
@@ -26,62 +247,35 @@ class ITL:
         # Storing the name of the file for editting purposes
         self.fname = fname
 
-        # Auxiliary dictionary to speed up the data convertion into pandas
-        aux_dict = dict(raw_time=[], time=[], experiment=[], mode=[],
-                        action=[], parameters=[], comment=[])
+        # Event tuples, converted into pandas in one go at the end
+        events = list()
 
         # Importing the file
         out_ouf_metadata = False
         with open(fname) as f:
-            line = ""
-            line_comments = list()
-            for l in f:
-                # Formatting just in case there is no space between parenthesis
-                l = l.replace('(', ' ( ').replace(')', ' ) ')
-                # Concatening lines if '\' found
-                if '\\' in l and '#' not in l[0] and \
-                   '\\' not in l[l.index('\\') + 1]:
-                    line += l[:l.index('\\')]
-                    line_comments.append(l[l.index('\\') + 1: - 1])
-                    # Continues with the next iteration of the loop
-                    continue
-                # If there was no concatenation of lines
-                if len(line) == 0:
-                    line = l
-                # If we were concatenating, we concatenate the last one
-                else:
-                    line += l[:l.index(')') + 1]
-                    line_comments.append(l[l.index(')'):])
-
-                if '\n' in line[0]:
-                    pass
-                elif 'Comment:' in line:
-                    pass
+            for kind, value in tokenize_itl(f):
+                # Storing events
+                if kind == 'event':
+                    events.append(value)
+                elif kind == 'include':
+                    self.include_files.append(value)
                 # Filtering lines with comments
-                elif '#' in line[0]:
+                elif kind == 'comment':
                     if not out_ouf_metadata:
-                        self.header.append(line)
-                        self._read_metada(line)
+                        self.header.append(value)
+                        self._read_metada(value)
                     else:
-                        self.WTF.append(line)
-                # Storing events
-                elif len(line.split()) > 0 and \
-                        is_elapsed_time(line.split()[0]):
-                    aux_dict = \
-                        self._read_events(line, aux_dict, line_comments)
+                        self.WTF.append(value)
                 # Useful data from the header
                 else:
                     # We can say we are out of the metadate here because
                     # start_time and end_time are mandatory in the files
                     out_ouf_metadata = True
-                    self._read_header_line(line.split())
-                # Preparing values for next iteration
-                line = ""
-                line_comments = list()
-        # Closing the file
-        f.close()
+                    self._read_header_line(value)
         # Creating the pandas dataframe
-        self.events = pd.DataFrame(aux_dict)
+        self.events = pd.DataFrame(events, columns=EVENT_COLUMNS)
+        # Converting all the times at once
+        self.events['time'] = self._to_datetimes(self.events['raw_time'])
         self.events = self.order_colums_in_dataframe(self.events)
 
     def _read_metada(self, line):
@@ -89,91 +283,6 @@ class ITL:
             self.meta[line[1:line.index(': ')].strip()] = \
                 line[line.index(': ') + 1:-1].strip()
 
-    def _read_events(self, line, aux_dict, line_comments):
-        # Consecutive whitespace are regarded as a single separator
-        l = line.split()
-
-        # Special case of include:
-        # 000_22:30:00 INCLUDE "SA-SFT_FM__-ORB_LOAD-TC_-GEN01A.itl"
-        if 'INCLUDE' in l[1].upper():
-            if '#' in l:
-                index = l.index('#')
-                comment = ' '.join(l[index:])
-                self.include_files.append(
-                    [l[2], l[0]] + l[3:index] + [comment])
-            else:
-                self.include_files.append([l[2], l[0]] + l[3:])
-        else:
-            # Storing comments
-            if '#' in line:
-                index = line.index('#')
-                aux_dict['comment'].append(line[index + 1:-1])
-            elif len(line_comments) > 0 and len(line_comments[0]) > 0:
-                index = line_comments[0].index('#')
-                aux_dict['comment'].append(line_comments[0][index + 1:])
-            else:
-                aux_dict['comment'].append(None)
-
-            aux_dict['raw_time'].append(l[0])
-            aux_dict['time'].append(self._to_datetime(l[0]))
-            aux_dict['experiment'].append(l[1])
-            # If SOC as experiment and PTR isn't the mode then there is no mode
-            if 'SOC' in l[1].upper() and 'PTR' not in l[2]:
-                aux_dict['mode'].append(None)
-            else:
-                aux_dict['mode'].append(l[2])
-
-            # If the next element in the line doesn't contain a hash, then
-            # there is an action
-            if '#' not in l[3]:
-                aux_dict['action'].append(l[3])
-                # If there are parameters we store them
-                if len(l) > 4:
-                    if '(' in l[4]:
-                        aux_dict['parameters'].append(
-                            self._read_parameters(l[5:], line_comments[1:]))
-                    else:
-                        aux_dict['parameters'].append(None)
-                else:
-                    aux_dict['parameters'].append(None)
-            else:
-                aux_dict['action'].append(None)
-                aux_dict['parameters'].append(None)
-
-        return aux_dict
-
-    def _read_parameters(self, parameters, line_comments):
-        output = list()
-        # Selecting the indexes of every '=' in the line which implies a new
-        # parameter exist
-        indexes = [i for i, val in enumerate(parameters) if val == '=']
-        for index in indexes:
-            param = list()
-            param.append(parameters[index - 1])
-            # If it is the last element we take all but the last expected ')'
-            if indexes[-1] == index:
-                last_index = -1
-            else:
-                last_index = indexes[indexes.index(index) + 1] - 1
-
-            # We avoid '=', that's why index + 1
-            for element in parameters[index + 1:last_index]:
-                param.append(element)
-
-            # Adding comments. line_comments & indexes should have same length
-            if indexes.index(index) + 1 <= len(line_comments):
-                comment = line_comments[indexes.index(index)]
-                if '#' in comment:
-                    param.append((comment[comment.index('#') + 1:]))
-                else:
-                    param.append(comment)
-            else:
-                param.append(None)
-            # Adding new parameter tuple
-            output.append(param)
-
-        return output
-
     def _read_header_line(self, line):
         if 'Ref_date:' in line:
             # Storing them in "raw" format
@@ -222,72 +331,52 @@ class ITL:
                 return parse_time("000_" + element.split('_')[1], date)
             return parse_time(element, self.ref_date)
 
-    # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-    # This method has to be adapted!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
-    # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+    def _to_datetimes(self, raw_times):
+        """
+        Bulk version of _to_datetime for the event times (see
+        parse_event_times). The raw times that can't be converted are kept
+        in self.time_errors and get NaT.
+        """
+        times = parse_event_times(raw_times.values, self.ref_date)
+        times.index = raw_times.index
+        failed = times.isnull()
+        if self.ref_date is None and failed.any():
+            # Only hh:mm:ss case, without a date these stay times of day
+            clock = failed & (raw_times.str.len() == 8) & \
+                raw_times.map(is_elapsed_time)
+            if clock.any():
+                times = times.astype(object)
+                times[clock] = [time(*[int(e) for e in t.split(':')])
+                                for t in raw_times[clock]]
+                failed &= ~clock
+        self.time_errors = raw_times[failed]
+        return times
+
     def to_file(self, fname):
+        """
+        Writes the timeline to fname so that loading it again gives back the
+        same header, events and includes. The INCLUDE events are written
+        after the rest, in their original order.
+        """
+        # Include_file lines of the header and INCLUDE events
+        header_includes = list()
+        event_includes = list()
+        for include in self.include_files:
+            if len(include) > 1 and is_elapsed_time(include[1]):
+                event_includes.append(' '.join(
+                    [include[1], 'INCLUDE', include[0]] + include[2:]) + '\n')
+            else:
+                header_includes.append(include)
+
         # Creating file if the file doesn't exist and truncating it if exists
-        with open(fname, 'w') as f:
-            # Copying the header
-            [f.write(line) for line in self.header]
-
-            # Copying the useful data in the header
-            # Reg_date
-            if self.ref_date is not None:
-                f.write("Ref_date: " + self.raw_ref_time + "\n#\n")
-
-            # Start and End time
-            f.write("Start_time: " + self.raw_start_time + "\n")
-            f.write("End_time: " + self.raw_end_time + "\n#\n")
-
-            # Propagation delay
-            if self.propagation_delay is not None:
-                output = ""
-                for element in self.propagation_delay:
-                    output += " " + element
-                f.write("Propagation_delay: " + output + "\n#\n")
-
-            # Init values
-            if len(self.init_values) > 0:
-                for value in self.init_values:
-                    output = ""
-                    for element in value:
-                        output += " " + element
-                    f.write("Init_value: " + output + "\n")
-                f.write("#\n")
-
-            # Include files
-            if len(self.include_files) > 0:
-                for include in self.include_files:
-                    output = ""
-                    for element in include:
-                        output += " " + element
-                    f.write("Include_file: " + output + "\n")
-                f.write("#\n")
-
-            # Copying events
-            f.write("# Events_in_list: " + str(len(self.events.index))
-                    + "\n#\n")
-            f.write("# Time                 Event\n#\n")
-            for index, row in self.events.iterrows():
-                output = row['raw_time'] + "   " + row['event']
-                if row['experiment'] is not None:
-                    output += "  (EXP = " + row['experiment'] + " "
-                    output += "ITEM = " + row['item'] + ")"
-                if row['count'] is not None:
-                    output += " (COUNT = " + row['count'] + ")"
-                if row['comment'] is not None:
-                    output += " # " + row['comment']
-                output += "\n"
-                f.write(output)
-
-            f.write("#\n")
-
-        f.close()
+        with open(fname, 'w', 1 << 20) as f:
+            f.writelines(format_timeline_header(self, header_includes))
+            f.writelines(format_itl_events(self.events))
+            f.writelines(event_includes)
 
     def order_colums_in_dataframe(self, df):
-        # Sorting by the time
-        df = df.sort(['time'])
+        # Sorting by the time, keeping the order of simultaneous events
+        df = df.sort(['time'], kind='mergesort')
         # Sorting the columns in the dataframe
         cols = ['raw_time', 'time', 'experiment', 'mode', 'action',
                 'parameters', 'comment']
@@ -327,28 +416,69 @@ class ITL:
 
         return files_exist
 
-    def merge_includes(self):
-        self.merged_events = self.events
+    def get_includes(self):
+        """
+        Returns the file path and reference date of every include of the
+        file, in order. An include with a time has its events relative to
+        that time, otherwise they keep their own reference date.
+        """
         # Getting the path to load correctly the files
         path = os.path.dirname(os.path.abspath(self.fname))
+        includes = list()
         for f in self.include_files:
-            print ("Reading " + f[0] + "...")
             fname = os.path.join(path, f[0].strip('"'))
             # There is an existing time
             if len(f) > 1 and is_elapsed_time(f[1]):
-                ref_date = self._to_datetime(f[1])
-                itl = ITL(fname, ref_date=ref_date)
+                includes.append((fname, self._to_datetime(f[1])))
             else:
-                itl = ITL(fname)
+                includes.append((fname, None))
+        return includes
+
+    def merge_includes(self, parallel=False, processes=None, check=True):
+        """
+        Merges the events of every file included (recursively) by this one
+        into self.merged_events. See load_include_tree. Once an EVF is set
+        by resolve_event_times, the event-relative times of the includes
+        are resolved too and self.time_errors holds the times of the merged
+        events that couldn't be resolved.
+        """
+        frames = load_include_tree(self, parallel, processes, check)
+        if self.evf is not None:
+            # The events of this file are resolved already
+            frames = [resolve_event_times(frame, self.evf)
+                      for frame in frames]
+        # Merging the dataframes just once
+        self.merged_events = self.order_colums_in_dataframe(
+            pd.concat([self.events] + frames, ignore_index=True))
+        if self.evf is not None:
+            self.time_errors = self.merged_events['raw_time'][
+                self.merged_events['time'].isnull()]
+
+    def resolve_event_times(self, evf):
+        """
+        Gives the events with times relative to EVF events their absolute
+        times, looked up in evf (see resolve_event_times). The evf is kept
+        to resolve the events of the includes too, when they are merged
+        again the next time they are needed.
+        """
+        self.evf = evf
+        self.events = self.order_colums_in_dataframe(
+            resolve_event_times(self.events, evf))
+        self.time_errors = self.events['raw_time'][
+            self.events['time'].isnull()]
+        self.merged_events = None
 
-            itl.check_consistency()
-            # Recursing over the itl files
-            itl.merge_includes()
-            # Merging the dataframes
-            self.merged_events = \
-                pd.concat([self.merged_events, itl.merged_events],
-                          ignore_index=True)
-        self.merged_events = self.order_colums_in_dataframe(self.merged_events)
+    def mode_intervals(self):
+        """
+        Returns the ModeIntervals of the merged events (merging the
+        includes first if needed), to query the modes active at given times.
+        """
+        if self.merged_events is None:
+            self.merge_includes()
+        end_time = self.end_time
+        if not isinstance(end_time, datetime):
+            end_time = None
+        return ModeIntervals(self.merged_events, end_time)
 
     def plot(self):
         # If the includes are still not merged, we merge them
@@ -366,40 +496,34 @@ class ITL:
         df = df[['time', 'experiment', attribute]]
         experiments_unique = df['experiment'].unique()
 
-        # Initializating the output table
+        # Entries with the same time as the next one are merged into it, the
+        # last known value of each experiment winning
+        times = pd.to_datetime(df['time'].values)
+        first = np.ones(len(times), dtype=bool)
+        first[1:] = times[1:] != times[:-1]
+        last = np.ones(len(times), dtype=bool)
+        last[:-1] = first[1:]
+        run = np.cumsum(first) - 1
+
+        # Value of each experiment at the end of each run, only None meaning
+        # that the entry doesn't set a value
+        values = np.asarray(df[attribute].values, dtype=object)
+        column = pd.Index(experiments_unique).get_indexer(
+            df['experiment'].values)
+        key = (run * len(experiments_unique) + column)
+        key = key[np.not_equal(values, None)]
+        values = values[np.not_equal(values, None)]
+        _, latest = np.unique(key[::-1], return_index=True)
+        latest = len(key) - 1 - latest
+        table = np.empty((last.sum(), len(experiments_unique)), dtype=object)
+        table.flat[key[latest]] = values[latest]
+
         # We create a new dictionary and convert it to a df because working
         # with the dataframe has a high computational cost
         output = dict()
-        for exp in experiments_unique:
-            output[exp] = list()
-
-        # Adding the times
-        output['time'] = pd.to_datetime(df['time'].values).tolist()
-        experiments = df['experiment'].values.tolist()
-        modes = df[attribute].values.tolist()
-        # Creating the new table
-        for experiment, mode in zip(experiments, modes):
-            for exp in experiments_unique:
-                if exp == experiment:
-                    output[exp].append(mode)
-                else:
-                    output[exp].append(None)
-
-        # Merging entries with the same time
-        pos_to_delete = list()
-        for pos in range(len(output['time']) - 1):
-            if output['time'][pos + 1] == output['time'][pos]:
-                for exp in experiments_unique:
-                    if output[exp][pos] is not None and \
-                       output[exp][pos + 1] is None:
-                        output[exp][pos + 1] = output[exp][pos]
-                pos_to_delete.append(pos)
-
-        # Starting from the end to avoid keys shifting
-        pos_to_delete.reverse()
-        for pos in pos_to_delete:
-            for key in output:
-                del output[key][pos]
+        for pos, exp in enumerate(experiments_unique):
+            output[exp] = table[:, pos].tolist()
+        output['time'] = times[last]
 
         out_df = pd.DataFrame(output)
         # Filling the NaN fields with the last not NaN value in the column
@@ -408,16 +532,402 @@ class ITL:
         return out_df
 
 
+def _load_itl(task):
+    # Module level so that it can run in a process pool
+    fname, ref_date = task
+    return ITL(fname, ref_date=ref_date)
+
+
+def _cache_entry(path):
+    # Cache entry of a file, forgetting every version parsed from it once
+    # its content changed
+    entry = _itl_cache.get(path)
+    if entry is None:
+        return None
+    if not os.path.isfile(path):
+        del _itl_cache[path]
+        return None
+    stat = os.stat(path)
+    stamp = (stat.st_size, stat.st_mtime)
+    if stamp != entry['stamp']:
+        if file_digest(path) != entry['digest']:
+            del _itl_cache[path]
+            return None
+        entry['stamp'] = stamp
+    return entry
+
+
+def cached_itl(fname, ref_date=None, parser=None):
+    """
+    Returns the file parsed with the given reference date and parser (ITL
+    by default) from the include cache, or None if it isn't there or the
+    file changed since. A file only touched on disk is compared by content.
+    """
+    entry = _cache_entry(os.path.abspath(fname))
+    if entry is None:
+        return None
+    return entry['files'].get((parser or ITL, ref_date))
+
+
+def cache_itl(fname, parsed, ref_date=None, parser=None):
+    """
+    Adds a file parsed with the given reference date and parser (ITL by
+    default) to the include cache, see cached_itl.
+    """
+    path = os.path.abspath(fname)
+    entry = _cache_entry(path)
+    if entry is None:
+        stat = os.stat(path)
+        entry = {'stamp': (stat.st_size, stat.st_mtime),
+                 'digest': file_digest(path), 'files': dict()}
+        _itl_cache[path] = entry
+    entry['files'][(parser or ITL, ref_date)] = parsed
+
+
+def clear_itl_cache():
+    """
+    Forgets every ITL file parsed by load_include_tree.
+    """
+    _itl_cache.clear()
+
+
+def load_include_tree(itl, parallel=False, processes=None, check=True):
+    """
+    Loads the files included by an ITL, and the files they include, and
+    returns their events dataframes in the order merge_includes used to
+    concatenate them (depth first, once per reference to a file).
+
+    Parsed files are kept in the include cache (see cached_itl) by path and
+    reference date, so a file included from several parents, or loaded
+    again later, is only parsed once, until it changes. The include tree is
+    discovered one level at a time and, with parallel, the files of a level
+    are parsed in a process pool.
+
+    :param itl: the root ITL object
+    :param parallel: Flag to parse the files of each level in a process pool
+    :param processes: size of the pool (default: number of CPUs)
+    :param check: Flag to run check_consistency on every newly parsed file
+    :returns: list of pandas dataframes
+    """
+    # Parsed file of every (path, reference date) node of the tree
+    loaded = dict()
+    visited = set()
+    level = itl.get_includes()
+    while len(level) > 0:
+        # Files of this level that aren't cached yet, without repetitions
+        tasks = list()
+        for node in level:
+            if node in loaded or node in tasks:
+                continue
+            included = cached_itl(*node)
+            if included is None:
+                tasks.append(node)
+            else:
+                loaded[node] = included
+        for fname, ref_date in tasks:
+            print ("Reading " + os.path.basename(fname) + "...")
+        if parallel and len(tasks) > 1:
+            pool = multiprocessing.Pool(processes)
+            try:
+                parsed = pool.map(_load_itl, tasks)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            parsed = [_load_itl(task) for task in tasks]
+        for (fname, ref_date), included in zip(tasks, parsed):
+            if check:
+                included.check_consistency()
+            cache_itl(fname, included, ref_date)
+            loaded[(fname, ref_date)] = included
+
+        # The next level, skipping what has been expanded already
+        next_level = list()
+        for node in level:
+            if node not in visited:
+                visited.add(node)
+                next_level += loaded[node].get_includes()
+        level = next_level
+
+    # Walking the tree depth first to keep the order of the events
+    frames = list()
+
+    def collect(node, ancestors):
+        for fname, ref_date in node.get_includes():
+            key = (os.path.abspath(fname), ref_date)
+            if key in ancestors:
+                print ("It seems as if " + os.path.basename(fname) +
+                       " includes itself")
+                raise NameError('Circular include')
+            included = loaded[(fname, ref_date)]
+            frames.append(included.events)
+            collect(included, ancestors + [key])
+
+    collect(itl, [(os.path.abspath(itl.fname), itl.ref_date)])
+    return frames
+
+
+def _shift_selection(df, rows, experiment, action, start, end):
+    # Boolean mask of the rows selected by all the given criteria
+    selected = np.ones(len(df), dtype=bool)
+    if rows is not None:
+        selected &= df.index.isin(rows)
+    if experiment is not None:
+        if isinstance(experiment, str):
+            experiment = [experiment]
+        selected &= df['experiment'].isin(experiment).values
+    if action is not None:
+        if isinstance(action, str):
+            action = [action]
+        selected &= df['action'].isin(action).values
+    if start is not None:
+        selected &= (df['time'] >= pd.Timestamp(start)).values
+    if end is not None:
+        selected &= (df['time'] <= pd.Timestamp(end)).values
+    return selected
+
+
 def shift_time(df, rows=None, days=0, seconds=0, microseconds=0,
-               milliseconds=0, minutes=0, hours=0, weeks=0):
-
-    delta = timedelta(days=days, seconds=seconds, minutes=minutes,
-                      microseconds=microseconds, milliseconds=milliseconds,
-                      hours=hours, weeks=weeks)
-    if rows is None:
-        for times in pd.to_datetime(df['time'].unique()).tolist():
-            df.loc[df['time'] == times, 'time'] = times + delta
+               milliseconds=0, minutes=0, hours=0, weeks=0, experiment=None,
+               action=None, start=None, end=None):
+    """
+    Shifts the time of the events of an ITL dataframe in place. With no
+    selection every event is shifted, otherwise only the events matching
+    all the given criteria.
+
+    :param df: ITL events dataframe
+    :param rows: index labels of the events to shift
+    :param experiment: experiment name or list of names
+    :param action: action name or list of names
+    :param start: shift only the events at or after this time
+    :param end: shift only the events at or before this time
+    :returns: the same dataframe
+    """
+    delta = pd.Timedelta(timedelta(
+        days=days, seconds=seconds, minutes=minutes,
+        microseconds=microseconds, milliseconds=milliseconds, hours=hours,
+        weeks=weeks))
+    selected = _shift_selection(df, rows, experiment, action, start, end)
+    if selected.all():
+        df['time'] = df['time'] + delta
     else:
-        for row in rows:
-            df.loc[row, 'time'] = pd.to_datetime(df.loc[row, 'time']) + delta
+        df.loc[selected, 'time'] = df.loc[selected, 'time'] + delta
     return df
+
+
+def shifted_time(df, *args, **kwargs):
+    """
+    Same as shift_time but the shifted events are returned in a new
+    dataframe, leaving df untouched.
+    """
+    return shift_time(df.copy(), *args, **kwargs)
+
+
+def resolve_event_times(events, evf):
+    """
+    Resolves the times of ITL events relative to EVF events, raw times like
+    'PERICENTRE ( COUNT = 3 ) +000_00:10:00', into absolute times. With a
+    count the time is relative to that occurrence of the event (the one
+    with that COUNT in the EVF, or the n-th one when the EVF doesn't count
+    it); without one the ITL event is repeated for every occurrence.
+
+    All the rows are resolved at once: the EVF occurrences are sorted by
+    (event, count) keys and looked up with searchsorted. Times that can't
+    be resolved stay NaT.
+
+    :param events: ITL events dataframe
+    :param evf: EVF object
+    :returns: events dataframe, relative events resolved and repeated
+    """
+    parts = events['raw_time'].astype(str).str.extract(
+        _RELATIVE_TIME, flags=re.IGNORECASE)
+    relative = parts[0].notnull().values
+    if not relative.any():
+        return events
+    parts = parts[relative]
+    epoch = datetime(2000, 1, 1)
+    offsets = (parse_event_times(parts[2].values, epoch) -
+               pd.Timestamp(epoch)).values
+
+    # Occurrences of the EVF events numbered by their count, or by their
+    # order when they have none, sorted by (event, number)
+    occurrences = evf.events[evf.events['time'].notnull()]
+    names = occurrences['event'].str.upper().values
+    numbers = occurrences['count'].astype(str).str.extract(
+        r'^([0-9]+)$')[0].astype(float)
+    order = occurrences.groupby(names).cumcount().values + 1
+    numbers = np.where(numbers.notnull(), numbers, order).astype(np.int64)
+    event_types = pd.Index(pd.unique(names))
+    keys = event_types.get_indexer(names) * (1 << 32) + numbers
+    sort = np.argsort(keys, kind='mergesort')
+    keys = keys[sort]
+    anchors = _nanoseconds(occurrences['time'].values)[sort]
+
+    codes = event_types.get_indexer(parts[0].str.upper().values)
+    counted = parts[1].notnull().values
+    rows = np.flatnonzero(relative)
+
+    # With a count: a single occurrence
+    wanted = codes[counted] * (1 << 32) + \
+        parts[1][counted].astype(np.int64).values
+    at = np.minimum(np.searchsorted(keys, wanted), max(len(keys) - 1, 0))
+    found = (codes[counted] >= 0) & (len(keys) > 0)
+    found[found] = keys[at[found]] == wanted[found]
+    counted_times = np.where(found, anchors[at] if len(keys) else 0,
+                             np.iinfo(np.int64).min)
+
+    # Without a count: every occurrence, or a single unresolved row
+    first = np.searchsorted(keys, codes[~counted] * (1 << 32))
+    last = np.searchsorted(keys, (codes[~counted] + 1) * (1 << 32))
+    last[codes[~counted] < 0] = first[codes[~counted] < 0]
+    repeats = np.maximum(last - first, 1)
+    occurrence = np.repeat(first, repeats) + np.arange(repeats.sum()) - \
+        np.repeat(np.cumsum(repeats) - repeats, repeats)
+    every_times = np.where(np.repeat(last > first, repeats),
+                           anchors[np.minimum(occurrence, len(keys) - 1)]
+                           if len(keys) else 0, np.iinfo(np.int64).min)
+
+    # Putting the rows back together, offsets added to the found anchors
+    take = np.concatenate([np.flatnonzero(~relative), rows[counted],
+                           np.repeat(rows[~counted], repeats)])
+    offsets = offsets.astype('timedelta64[ns]').view(np.int64)
+    anchored = np.concatenate([counted_times, every_times])
+    shifts = np.concatenate([offsets[counted],
+                             np.repeat(offsets[~counted], repeats)])
+    missing = (anchored == np.iinfo(np.int64).min) | \
+        (shifts == np.iinfo(np.int64).min)
+    resolved = np.where(missing, np.iinfo(np.int64).min, anchored + shifts)
+
+    output = events.iloc[take].copy()
+    fixed = events['time'].values[~relative]
+    if fixed.dtype.kind == 'M':
+        times = np.concatenate([_nanoseconds(fixed), resolved])
+        output['time'] = times.view('datetime64[ns]')
+    else:
+        # Times of day (no reference date) stay as they are
+        output['time'] = np.concatenate([fixed, pd.to_datetime(
+            resolved.view('datetime64[ns]')).astype(object)])
+    return output.sort(['time'], kind='mergesort')
+
+
+def _nanoseconds(times):
+    # Times as int64 nanoseconds, whatever resolution they come with
+    return np.asarray(pd.to_datetime(times),
+                      dtype='datetime64[ns]').view(np.int64)
+
+
+class ModeIntervals:
+    """
+    Modes of every experiment as time intervals, built from (merged) ITL
+    events: an experiment is in a mode from the event setting it until its
+    next mode change. Point, batch and window queries are searchsorted
+    lookups on the per-experiment start/end arrays.
+    """
+
+    def __init__(self, events, end_time=None):
+        """
+        This constructor method initialises the ModeIntervals object.
+
+        :param events: ITL events dataframe sorted by time
+        :type events: pandas dataframe
+        :param end_time: end of the last interval of every experiment (None
+                         for open ended intervals)
+        :type end_time: datetime
+        :returns: ModeIntervals object
+        """
+        events = events[events['mode'].notnull() & events['time'].notnull()]
+        end = np.iinfo(np.int64).max
+        if end_time is not None:
+            end = pd.Timestamp(end_time).value
+        self.starts = dict()
+        self.ends = dict()
+        self.modes = dict()
+        for experiment, group in events.groupby('experiment', sort=False):
+            times = _nanoseconds(group['time'].values)
+            modes = group['mode'].values
+            # The last event of several at the same time wins, and a mode
+            # set again just continues the interval
+            keep = np.ones(len(times), dtype=bool)
+            keep[:-1] = times[1:] != times[:-1]
+            times, modes = times[keep], modes[keep]
+            keep = np.ones(len(times), dtype=bool)
+            keep[1:] = modes[1:] != modes[:-1]
+            times, modes = times[keep], modes[keep]
+            self.starts[experiment] = times
+            self.ends[experiment] = np.append(times[1:], max(end, times[-1]))
+            self.modes[experiment] = modes
+
+    def experiments(self):
+        """
+        Returns the names of the experiments with modes.
+        """
+        return list(self.starts)
+
+    def mode_at(self, experiment, times):
+        """
+        Returns the mode of an experiment at the given time or times, None
+        outside of its intervals.
+
+        :param experiment: experiment name
+        :type experiment: str
+        :param times: time or array of times
+        :returns: mode or numpy array of modes
+        """
+        scalar = np.ndim(times) == 0
+        query = _nanoseconds(np.atleast_1d(times))
+        modes = np.empty(len(query), dtype=object)
+        if experiment in self.starts:
+            starts = self.starts[experiment]
+            pos = np.searchsorted(starts, query, side='right') - 1
+            inside = pos >= 0
+            inside[inside] = query[inside] < self.ends[experiment][pos[inside]]
+            modes[inside] = self.modes[experiment][pos[inside]]
+        return modes[0] if scalar else modes
+
+    def active(self, times):
+        """
+        Returns the mode of every experiment at each of the given times.
+
+        :param times: array of times
+        :returns: pandas dataframe indexed by time, a column per experiment
+        """
+        times = pd.to_datetime(np.atleast_1d(times))
+        return pd.DataFrame(dict((experiment, self.mode_at(experiment, times))
+                                 for experiment in self.starts),
+                            index=times, columns=self.experiments())
+
+    def overlapping(self, start, end, experiments=None):
+        """
+        Returns the intervals that overlap the window [start, end).
+
+        :param start: start of the window
+        :param end: end of the window
+        :param experiments: experiment names (default: all of them)
+        :type experiments: list
+        :returns: pandas dataframe with experiment, mode, start and end
+                  columns (end is NaT for open ended intervals)
+        """
+        start = pd.Timestamp(start).value
+        end = pd.Timestamp(end).value
+        if experiments is None:
+            experiments = self.experiments()
+        rows = list()
+        for experiment in experiments:
+            if experiment not in self.starts:
+                continue
+            # The intervals of an experiment don't overlap each other, so
+            # both their starts and their ends are sorted
+            first = np.searchsorted(self.ends[experiment], start, 'right')
+            last = np.searchsorted(self.starts[experiment], end, 'left')
+            for n in range(first, last):
+                rows.append((experiment, self.modes[experiment][n],
+                             self.starts[experiment][n],
+                             self.ends[experiment][n]))
+        table = pd.DataFrame(rows, columns=['experiment', 'mode', 'start',
+                                            'end'])
+        open_ended = (table['end'] == np.iinfo(np.int64).max).values
+        table['start'] = pd.to_datetime(table['start'].values.astype(np.int64))
+        ends = table['end'].values.astype(np.int64)
+        ends[open_ended] = np.iinfo(np.int64).min
+        table['end'] = pd.to_datetime(ends)
+        return table
@@ -5,14 +5,18 @@ form of a pandas dataframe.
 """
 
 import copy
+import io
 import re
 import os
 import pandas as pd
 import numpy as np
-import tempfile as tf
-from pyops.utils import plotly_prep, background_colors, getMonth, get_unique_from_list, is_elapsed_time, parse_time
+import mmap
+from pyops.utils import plotly_prep, background_colors, getMonth, \
+    get_unique_from_list, is_elapsed_time, parse_time, parse_elapsed_times
 from datetime import datetime
 import logging
+from pyops.cache import cached
+from pyops.timeindex import line_offset, read_window
 from plotly.graph_objs import Data, Layout, Figure, XAxis, YAxis
 import plotly.plotly as py
 from pyops.plots import brewer_plot, modes_schedule, create_plot, get_modes_schedule, data_plot, power_plot, get_power_plot, get_data_plot
@@ -25,7 +29,8 @@ class epstable:
     Pandas dataframe. The class has a number of methods for querying its
     characteristics, plotting its contents and merging other tables into it.
     """
-    def __init__(self, fname, csv, columns=False):
+    def __init__(self, fname, csv, columns=False, compaction='rle',
+                 cache=None, start=None, end=None, dtypes=None):
         """
         This constructor method initialises the epstable object.
 
@@ -33,13 +38,33 @@ class epstable:
         :type fname: str
         :param columns: user supplied list of column headings
         :type columns: list or tuple
+        :param compaction: 'rle' (default) to drop redundant rows, None to
+                           keep them all or a float tolerance for float noise
+        :type compaction: str, float or None
+        :param cache: on-disk cache of the parsed table: None (default) or
+                      False for none, True for the default directory, a
+                      directory name or a pyops.cache.TableCache
+        :type cache: bool, str or TableCache
+        :param start: only load the rows from this time on; output files
+                      are then read through a cached time index (see
+                      pyops.timeindex) so only the window gets parsed
+        :type start: datetime or str
+        :param end: only load the rows up to this time
+        :type end: datetime or str
+        :param dtypes: None (default) to keep the parsed dtypes or 'compact'
+                       for float32 power and data rates and categorical
+                       strings, see apply_dtypes
+        :type dtypes: str or None
         :returns: epstable object consisting of a header dictionary and Pandas dataframe
         """
         # read in the data
-        if csv:
-            self.data, self.header = read_csv(fname, meta=True, columns=columns)
-        else:
-            self.data, self.header = read(fname, meta=True, columns=columns)
+        self.data, self.header = cached(
+            cache, fname,
+            lambda: read_table(fname, csv, columns, compaction, start, end),
+            'epstable {} {} {} {} {}'.format(csv, columns, compaction, start,
+                                            end))
+        self.data = apply_dtypes(self.data, dtypes,
+                                 self.header.get('units'))
 
     # def __str__(self):
     #     pass
@@ -143,24 +168,29 @@ class epstable:
 
     def join(self, df_to_join, in_place=False):
         """
-        This method joins a second table object to this one
+        This method joins a second table object to this one. Several tables
+        (e.g. a power budget and a few instrument budgets) can be joined in
+        one go by passing a list.
 
-        :param df_to_join: table object to joint to this one
-        :type df_to_join: epstable
+        :param df_to_join: table object(s) to joint to this one
+        :type df_to_join: epstable or list of epstable
         :param in_place: flag to join in place or return new instance
         :type in_place: boolean
         :returns:
         """
+        if not isinstance(df_to_join, (list, tuple)):
+            df_to_join = [df_to_join]
+        from_dfs = [table.data for table in df_to_join]
         # try:
         if in_place:
-            self.data = merge_dataframes(self.data, df_to_join.data)
+            self.data = merge_dataframes(self.data, *from_dfs)
             try:
                 self.data = self.data.sortlevel(axis=1)
             except:
                 print('Warning: can only sort by level with a hierarchical index.')
         else:
             table_copy = copy.deepcopy(self)
-            table_copy.data = merge_dataframes(table_copy.data, df_to_join.data)
+            table_copy.data = merge_dataframes(table_copy.data, *from_dfs)
             return table_copy
         # except:
         #     print('Ooops: that didn\'t work! Make sure your column ' +
@@ -190,32 +220,70 @@ class epstable:
             table_copy.data = table_copy.data.sub(table_to_subtract.data)
             return table_copy
 
+    def memory_usage(self):
+        """
+        This method reports the memory footprint of the table's dataframe,
+        e.g. to compare dtype policies (see apply_dtypes).
+
+        :returns: pandas dataframe with the dtype and size in bytes of the
+                  index and of every column, plus their total ('All')
+        """
+        usage = self.data.memory_usage(index=True, deep=True)
+        labels = ['Index'] + [' '.join(c) if isinstance(c, tuple) else str(c)
+                              for c in self.data.columns]
+        dtypes = [str(self.data.index.dtype)] + \
+            [str(d) for d in self.data.dtypes]
+        report = pd.DataFrame({'dtype': dtypes + [''],
+                               'bytes': list(usage.values) + [usage.sum()]},
+                              index=labels + ['All'],
+                              columns=['dtype', 'bytes'])
+        return report
+
 
 class Modes(epstable):
 
-    def __init__(self, fname=None):
+    def __init__(self, fname=None, compaction='rle', cache=None, start=None,
+                 end=None, dtypes=None):
         if fname is not None:
-            self.load_file(fname)
+            self.load_file(fname, compaction, cache, start, end, dtypes)
 
-    def load_file(self, fname):
+    def load_file(self, fname, compaction='rle', cache=None, start=None,
+                  end=None, dtypes=None):
         """
         This constructor method initialises the Modes object.
 
         :param fname: input filename
         :type fname: str
+        :param compaction: redundant row removal, see compact_data
+        :type compaction: str, float or None
+        :param cache: on-disk cache of the parsed table, see epstable
+        :type cache: bool, str or TableCache
+        :param start: only load the rows from this time on, see epstable
+        :type start: datetime or str
+        :param end: only load the rows up to this time
+        :type end: datetime or str
+        :param dtypes: dtype policy, see apply_dtypes
+        :type dtypes: str or None
         :returns: Modes object
         """
         # read in the data
-        self.header, temporaryFile = read_csv_header(fname, meta=True)
+        self.data, self.header = cached(
+            cache, fname,
+            lambda: self._parse_file(fname, compaction, start, end),
+            'Modes {} {} {}'.format(compaction, start, end))
+        self.data = apply_dtypes(self.data, dtypes)
+
+    def _parse_file(self, fname, compaction, start=None, end=None):
+        header = read_csv_header(fname)
         if "module_states" in fname:
-            self.header["headings"] = \
-                ["Elapsed time"] + [self.header["headings"][i + 1] + " "
-                + self.header["units"][i + 1]
-                for i in range(len(self.header["units"][1:]))]
+            header["headings"] = \
+                ["Elapsed time"] + [header["headings"][i + 1] + " "
+                + header["units"][i + 1]
+                for i in range(len(header["units"][1:]))]
         else:
-            self.header["headings"] = \
-                ["Elapsed time"] + self.header["units"][1:]
-        self.data = read_csv(self.header, temporaryFile)
+            header["headings"] = \
+                ["Elapsed time"] + header["units"][1:]
+        return read_csv(header, fname, compaction, start, end), header
 
     def plot_schedule(self):
         """
@@ -278,21 +346,33 @@ class Modes(epstable):
 
 class powertable(epstable):
 
-    def __init__(self, fname, csv):
+    def __init__(self, fname, csv, compaction='rle', cache=None, start=None,
+                 end=None, dtypes=None):
         """
         This constructor method initialises the powertable object.
 
         :param fname: input filename
         :type fname: str
+        :param compaction: redundant row removal, see compact_data
+        :type compaction: str, float or None
+        :param cache: on-disk cache of the parsed table, see epstable
+        :type cache: bool, str or TableCache
+        :param start: only load the rows from this time on, see epstable
+        :type start: datetime or str
+        :param end: only load the rows up to this time
+        :type end: datetime or str
+        :param dtypes: dtype policy, see apply_dtypes
+        :type dtypes: str or None
         :returns: powertable object
         """
         # read in the data
-        if csv:
-            self.header, temporaryFile = read_csv_header(fname, meta=True)
-            self.data = read_csv(self.header, temporaryFile)
-        else:
-            self.data, self.header = read(fname, meta=True)
-        self.columns = zip(self.header['headings'], self.header['units'])
+        self.data, self.header = cached(
+            cache, fname,
+            lambda: read_table(fname, csv, False, compaction, start, end),
+            'powertable {} {} {} {}'.format(csv, compaction, start, end))
+        self.data = apply_dtypes(self.data, dtypes,
+                                 self.header.get('units'))
+        self.columns = list(zip(self.header['headings'], self.header['units']))
         self.instruments = self.header['experiments']
 
     def select(self, args, chop=False):
@@ -378,23 +458,33 @@ class powertable(epstable):
 
 class datatable(epstable):
 
-    def __init__(self, fname, csv):
+    def __init__(self, fname, csv, compaction='rle', cache=None, start=None,
+                 end=None, dtypes=None):
         """
         This constructor method initialises the datatable object.
 
         :param fname: input filename
         :type fname: str
+        :param compaction: redundant row removal, see compact_data
+        :type compaction: str, float or None
+        :param cache: on-disk cache of the parsed table, see epstable
+        :type cache: bool, str or TableCache
+        :param start: only load the rows from this time on, see epstable
+        :type start: datetime or str
+        :param end: only load the rows up to this time
+        :type end: datetime or str
+        :param dtypes: dtype policy, see apply_dtypes
+        :type dtypes: str or None
         :returns: datatable object
         """
         # read in the data
+        self.data, self.header = cached(
+            cache, fname,
+            lambda: self._parse_file(fname, csv, compaction, start, end),
+            'datatable {} {} {} {}'.format(csv, compaction, start, end))
         if csv:
-            self.header, temporaryFile = read_csv_header(fname, meta=True)
-            self.temp_header = copy.deepcopy(self.header)
-            self.temp_header["headings"] = self.temp_header["headings"][
-                len(self.temp_header["headings"]) / 2:]
-            self.data = read_csv(self.temp_header, temporaryFile)
+            self.temp_header = self._csv_temp_header(self.header)
         else:
-            self.data, self.header = read(fname, meta=True)
             self.temp_header = self.header
         # define experiments list
         self.instruments = self.header['experiments']
@@ -409,7 +499,8 @@ class datatable(epstable):
                         self.header['units'][u] = self.header['units'][u][1:]
                     if self.header['units'][u][-1] == ')':
                         self.header['units'][u] = self.header['units'][u][:-1]
-        self.columns = zip(self.temp_header['headings'], self.header['units'])
+        self.columns = list(zip(self.temp_header['headings'],
+                                self.header['units']))
         if not csv:
             cols = self.columns[1:]
             arrays = [[x[0].split()[0] for x in cols],
@@ -430,6 +521,24 @@ class datatable(epstable):
             except:
                 print('The conversion of \'Accum\' to \'Volume\' didn\'t work for \'{}\'.'.format(inst))
         self.data = self.data.sort_index(axis=1)
+        self.data = apply_dtypes(self.data, dtypes)
+
+    def _parse_file(self, fname, csv, compaction, start=None, end=None):
+        if not csv:
+            return read(fname, meta=True, compaction=compaction, start=start,
+                        end=end)
+        header = read_csv_header(fname)
+        data = read_csv(self._csv_temp_header(header), fname, compaction,
+                        start, end)
+        return data, header
+
+    def _csv_temp_header(self, header):
+        # The csv headings hold the experiment line followed by the headings
+        # line, only the latter names the columns
+        temp_header = copy.deepcopy(header)
+        temp_header["headings"] = temp_header["headings"][
+            len(temp_header["headings"]) // 2:]
+        return temp_header
 
     def select(self, level1, level2, level3, chop=False):
         """
@@ -598,40 +707,41 @@ def plot(data, limits=False, title=False, x_title=False, x_range=False,
             #Plot with <b>plotly</b>.
             py.iplot(fig, layout=layout)
 
-def merge_dataframes(into_df, from_df):
+
+def merge_dataframes(into_df, *from_dfs):
     """
-    This function merges two pandas data frames. The inital purpose was
+    This function merges pandas data frames. The inital purpose was
     to merge sparse power and data downlink budgets into non-sparse EPS/MAPPS
-    data_rate_avg.out and power_avg.out dataframes.
+    data_rate_avg.out and power_avg.out dataframes. Any number of budgets can
+    be merged in one call; each one is forward-filled onto the rows of
+    into_df (rows before a budget's first entry take that first entry).
 
     :param into_df: power or data rate dataframe.
     :type into_df: pandas dataframe
-    :param from_df: power or data downlink budget.
-    :type from_df: pandas dataframe
+    :param from_dfs: power or data downlink budgets.
+    :type from_dfs: pandas dataframes
     :returns: a merged dataframe with redundant NaN rows removed.
     """
 
-    into_df_cols = into_df.columns.tolist()
-    from_df_cols = from_df.columns.tolist()
-    merged = pd.merge(from_df, into_df, how='outer', left_index=True, right_index=True)
-    merged = merged[from_df_cols + into_df_cols]
-    from_df_new = merged[from_df_cols]
-    current_values = from_df.values[0]
-
-    for i in xrange(merged.shape[0]):
-        if np.isnan(from_df_new.values[i]).all():
-            from_df_new.values[i] = current_values
-        else:
-            current_values = from_df_new.values[i]
-
-    merged[from_df_cols] = from_df_new
-    merged = merged.truncate(before=into_df.index.values[0],
-                             after=into_df.index.values[-1])
+    # rows with no data at all are redundant ...
+    into_df = into_df[into_df.notnull().any(axis=1).values]
+    # ... and only the times of into_df survive the merge, so every budget
+    # only has to be looked up (as-of) at those times
+    parts = []
+    for from_df in from_dfs:
+        from_df = from_df[from_df.notnull().any(axis=1).values]
+        from_df = from_df.sort_index(kind='mergesort')
+        if from_df.empty:
+            parts.append(from_df.reindex(into_df.index))
+            continue
+        pos = from_df.index.searchsorted(into_df.index, side='right') - 1
+        pos[pos < 0] = 0
+        part = from_df.iloc[pos]
+        part.index = into_df.index
+        parts.append(part)
+
+    return pd.concat(parts + [into_df], axis=1)
 
-    # build index of NaN rows for removal in the return statement
-    inds = pd.isnull(merged[into_df_cols]).all(1).nonzero()[0]
-
-    return merged.drop(merged.index[inds])
 
 def parse_ref_date(line):
     """
@@ -647,6 +757,7 @@ def parse_ref_date(line):
         ref_date = datetime.strptime(keypair[1].strip(), "%d-%b-%Y")
         return ref_date
 
+
 def parse_header(fname):
     """
     This function takes as input an EPS/MAPPS input or output data file and
@@ -753,7 +864,9 @@ def parse_header(fname):
                 fh.close()
                 return header
 
-def read(fname, meta=False, columns=False):
+
+def read(fname, meta=False, columns=False, compaction='rle', fast=True,
+         start=None, end=None):
     """
     This function reads any one of a number of EPS input/output files and
     returns the data in a pandas dataframe. The file metadata can also be
@@ -763,18 +876,36 @@ def read(fname, meta=False, columns=False):
     :type fname: str.
     :param meta: Flag to return the header dictionary
     :type meta: bool.
+    :param compaction: redundant row removal, see compact_data
+    :type compaction: str, float or None
+    :param fast: Flag to parse EPS outputs with the C tokenizer (see
+                 read_table_fast) rather than the python one
+    :type fast: bool.
+    :param start: only load the rows from this time on (see
+                  pyops.timeindex)
+    :type start: datetime or str
+    :param end: only load the rows up to this time
+    :type end: datetime or str
     :returns: pandas dataframe -- the return code.
     """
     header = {}
     header = parse_header(fname)
     if 'Output Filename' in header:
+        if fast:
+            # Malformed lines raise here rather than being reported as an
+            # unrecognised file format below
+            data = read_table_fast(fname, header, start, end)
         try:
-            data = pd.read_table(fname, skiprows=header['len'], header=None,
-                                 names=header['headings'], sep=r"\s*", engine='python')
-            data['Elapsed time'] = [parse_time(x, header['Reference Date']) for x in data['Elapsed time']]
+            if not fast:
+                data = pd.read_table(fname, skiprows=header['len'],
+                                     header=None, names=header['headings'],
+                                     sep=r"\s*", engine='python')
+            data['Elapsed time'] = parse_elapsed_times(
+                data['Elapsed time'].values, header['Reference Date'])
             data = data.set_index(['Elapsed time'])
             data.index.names = ['Date']
-            data = remove_redundant_data(data)
+            data = select_window(data, start, end)
+            data = compact_data(data, compaction)
             if meta:
                 return data, header
             else:
@@ -791,6 +922,7 @@ def read(fname, meta=False, columns=False):
             budget.ix[:, 0] = [parse_time(x) for x in budget.ix[:, 0]]
             budget.rename(columns={0: 'date'}, inplace=True)
             budget = budget.set_index(['date'])
+            budget = select_window(budget, start, end)
             if columns:
                 if len(columns) != len(budget.columns):
                     print('Error: \'columns\' length not equal to number of columns')
@@ -804,44 +936,416 @@ def read(fname, meta=False, columns=False):
             print('Error: Didn\'t recognise file format...')
             return 1
 
-def remove_redundant_data(df):
+
+def read_table(fname, csv, columns=False, compaction='rle', start=None,
+               end=None):
+    """
+    This function reads either flavour (csv or whitespace delimited) of an
+    EPS/MAPPS output file into a dataframe and its header dictionary.
+
+    :param fname: The path to the power_avg.out or data_rate_avg.out
+    :type fname: str.
+    :param csv: Flag for the csv flavour of the output files
+    :type csv: bool.
+    :param columns: user supplied list of column headings (budgets only)
+    :type columns: list or tuple
+    :param compaction: redundant row removal, see compact_data
+    :type compaction: str, float or None
+    :param start: only load the rows from this time on (see
+                  pyops.timeindex)
+    :type start: datetime or str
+    :param end: only load the rows up to this time
+    :type end: datetime or str
+    :returns: pandas dataframe and header dictionary
+    """
+    if csv:
+        header = read_csv_header(fname)
+        return read_csv(header, fname, compaction, start, end), header
+    return read(fname, meta=True, columns=columns, compaction=compaction,
+                start=start, end=end)
+
+
+def select_window(data, start=None, end=None):
+    """
+    This function keeps the rows of a time-indexed dataframe that fall
+    between start and end (both included).
+
+    :param data: time-indexed pandas dataframe
+    :type data: pandas dataframe
+    :param start: start of the window (None for no lower bound)
+    :type start: datetime or str
+    :param end: end of the window (None for no upper bound)
+    :type end: datetime or str
+    :returns: pandas dataframe
+    """
+    keep = np.ones(len(data), dtype=bool)
+    if start is not None:
+        keep &= data.index >= pd.Timestamp(start)
+    if end is not None:
+        keep &= data.index <= pd.Timestamp(end)
+    if keep.all():
+        return data
+    return data[keep]
+
+
+def read_table_fast(fname, header, start=None, end=None):
+    """
+    This function reads the data block of a whitespace delimited EPS/MAPPS
+    output file with the pandas C tokenizer. The data offset and column
+    headings come from parse_header so every column gets an explicit dtype
+    and nothing has to be sniffed. Malformed lines raise an error instead of
+    being handed over to the python tokenizer.
+
+    When start or end are given only the lines around that window are
+    parsed, found through the time index of the file (see pyops.timeindex);
+    the caller trims the table to the exact window with select_window.
+
+    :param fname: The path to the power_avg.out or data_rate_avg.out
+    :type fname: str.
+    :param header: header dictionary as returned by parse_header
+    :type header: dict
+    :param start: only load the rows from this time on (see
+                  pyops.timeindex)
+    :type start: datetime or str
+    :param end: only load the rows up to this time
+    :type end: datetime or str
+    :returns: pandas dataframe with the raw 'Elapsed time' strings
+    """
+    names = header['headings']
+    dtypes = dict((name, np.float64) for name in names[1:])
+    dtypes[names[0]] = object
+    source, skiprows, first_line = fname, header['len'], header['len'] + 1
+    if start is not None or end is not None:
+        window, first_line = read_window(
+            fname, line_offset(fname, header['len']),
+            header['Reference Date'], False, start, end)
+        if not window.strip():
+            return pd.DataFrame(dict((name, pd.Series(dtype=dtypes[name]))
+                                     for name in names), columns=names)
+        source, skiprows = io.BytesIO(window), 0
+    try:
+        data = pd.read_csv(source, skiprows=skiprows, header=None,
+                           names=names, sep=r"\s+", engine='c', dtype=dtypes)
+    except Exception as err:
+        raise ValueError('Malformed data in {}: {}'.format(fname, err))
+    check_complete_rows(data, fname, first_line)
+    return data
+
+
+def check_complete_rows(data, fname, first_line):
+    """
+    This function raises an error when the C tokenizer padded a short line
+    of an EPS/MAPPS output file with NaN.
+
+    :param data: raw data as read by the C tokenizer
+    :type data: pandas dataframe
+    :param fname: file name, for the error message
+    :type fname: str
+    :param first_line: line number (1-based) of the first row of data
+    :type first_line: int
+    """
+    short = data.isnull().values.any(axis=1)
+    if short.any():
+        raise ValueError('Malformed data in {}: line {} has fewer than {} '
+                         'columns'.format(fname, first_line +
+                                          short.nonzero()[0][0],
+                                          data.shape[1]))
+
+
+def iter_chunks(fname, rows=100000, csv=False, compaction='rle'):
+    """
+    This generator reads an EPS/MAPPS output file (power_avg.out,
+    data_rate_avg.out or their csv flavours) in blocks of rows so that files
+    larger than memory can be processed one time-indexed chunk at a time.
+    Every chunk is parsed and compacted the same way read/read_csv do it:
+    the redundant rows dropped are exactly those dropped when the whole
+    file is loaded, because the last two rows of each block are carried
+    over to decide on the rows at the boundary. The rows are expected in
+    time order, as EPS writes them.
+
+    :param fname: The path to the power_avg.out or data_rate_avg.out
+    :type fname: str.
+    :param rows: number of lines read per chunk
+    :type rows: int
+    :param csv: Flag for the csv flavour of the output files
+    :type csv: bool.
+    :param compaction: redundant row removal, see compact_data
+    :type compaction: str, float or None
+    :returns: iterator of (pandas dataframe, header dictionary) tuples
+    """
+    tolerance = compaction_tolerance(compaction)
+    if csv:
+        header = read_csv_header(fname)
+        chunks = _iter_csv_chunks(fname, header, rows)
+    else:
+        header = parse_header(fname)
+        if header is None or 'Output Filename' not in header:
+            raise ValueError(
+                '{} is not an EPS/MAPPS output file'.format(fname))
+        chunks = _iter_table_chunks(fname, header, rows)
+    carry = None
+    removed = 0
+    for chunk in chunks:
+        if carry is not None:
+            # The carried rows are the neighbours the first rows of this
+            # chunk need, and the last carried row still awaits its verdict
+            start = len(carry) - 1
+            chunk = pd.concat([carry, chunk])
+        else:
+            start = 0
+        if tolerance is False:
+            deletes = np.zeros(len(chunk), dtype=bool)
+        else:
+            deletes = redundant_rows(chunk, tolerance)
+        # The last row's verdict depends on the next chunk, hold it back
+        keep = ~deletes[start:-1]
+        removed += len(keep) - keep.sum()
+        carry = chunk.iloc[-2:]
+        if keep.any():
+            yield chunk.iloc[start:-1][keep], header
+    if carry is not None:
+        yield carry.iloc[-1:], header
+    if removed:
+        print('{} redundant lines removed'.format(removed))
+
+
+def _iter_table_chunks(fname, header, rows):
+    # Time-indexed raw chunks of a whitespace delimited output file
+    names = header['headings']
+    dtypes = dict((name, np.float64) for name in names[1:])
+    dtypes[names[0]] = object
+    try:
+        reader = pd.read_csv(fname, skiprows=header['len'], header=None,
+                             names=names, sep=r"\s+", engine='c',
+                             dtype=dtypes, chunksize=rows)
+        line = header['len'] + 1
+        for data in reader:
+            check_complete_rows(data, fname, line)
+            line += len(data)
+            data['Elapsed time'] = parse_elapsed_times(
+                data['Elapsed time'].values, header['Reference Date'])
+            data = data.set_index(['Elapsed time'])
+            data.index.names = ['Date']
+            yield data
+    except ValueError:
+        raise
+    except Exception as err:
+        raise ValueError('Malformed data in {}: {}'.format(fname, err))
+
+
+def _iter_csv_chunks(fname, header, rows):
+    # Time-indexed raw chunks of a csv output file
+    ref_date = parse_csv_ref_date(header)
+    headings = header["headings"]
+    with open(fname, 'rb') as f:
+        if header["offset"] >= os.fstat(f.fileno()).st_size:
+            return
+        f.seek(header["offset"])
+        for data in pd.read_csv(f, header=None, sep=",", decimal='.',
+                                chunksize=rows):
+            # data rate files carry the experiment line before the headings
+            # line, only the latter names the columns
+            if len(headings) == 2 * data.shape[1]:
+                data.columns = headings[len(headings) // 2:]
+            else:
+                data.columns = headings
+            data["Elapsed time"] = \
+                parse_elapsed_times(data["Elapsed time"].values, ref_date)
+            data = data.set_index("Elapsed time")
+            data.index.names = ['Date & Time']
+            yield data
+
+
+def redundant_rows(df, tolerance=None):
+    """
+    This function flags the rows remove_redundant_data drops: those in the
+    middle of a block of sequential identical data lines. The comparison is
+    done on the whole 2-D array at once: a row is flagged when it equals
+    both its predecessor and its successor.
+
+    With a tolerance a block is every row within the tolerance of the first
+    row of the block, so a slow drift still starts new blocks and the
+    dropped rows never differ from the kept ones by more than the tolerance.
+
+    :param df: pandas dataframe
+    :type df: pandas dataframe
+    :param tolerance: if given, numeric values closer than this are treated
+                      as identical (absorbs float noise); non-numeric columns
+                      are always compared exactly
+    :type tolerance: float
+    :returns: boolean numpy array, True for the redundant rows
+    """
+    deletes = np.zeros(df.shape[0], dtype=bool)
+    if df.shape[0] < 3:
+        return deletes
+    numeric = df.select_dtypes(include=[np.number]).values
+    other = df.select_dtypes(exclude=[np.number]).values
+    # starts[i] is True when row i starts a new block
+    starts = np.ones(df.shape[0], dtype=bool)
+    if tolerance is None:
+        starts[1:] = ~((numeric[1:] == numeric[:-1]).all(axis=1) &
+                       (other[1:] == other[:-1]).all(axis=1))
+    else:
+        starts[1:] = _block_starts(numeric, other, tolerance)[1:]
+    # we wanna keep the first and the last row and every row that isn't in
+    # the middle of an identical run
+    deletes[1:-1] = ~starts[1:-1] & ~starts[2:]
+    return deletes
+
+
+def _block_starts(numeric, other, tolerance):
+    # Rows starting a block of rows within tolerance of its first row. Each
+    # block is compared with its first row in slices of doubling length, so
+    # a long block costs a few numpy calls rather than one per row.
+    size = len(numeric)
+    starts = np.zeros(size, dtype=bool)
+    first = 0
+    while first < size:
+        starts[first] = True
+        end, step = first + 1, 16
+        while end < size:
+            stop = min(end + step, size)
+            same = (np.abs(numeric[end:stop] - numeric[first]) <=
+                    tolerance).all(axis=1)
+            same &= (other[end:stop] == other[first]).all(axis=1)
+            if not same.all():
+                end += np.argmin(same)
+                break
+            end, step = stop, step * 2
+        first = end
+    return starts
+
+
+def remove_redundant_data(df, tolerance=None):
     """
     This function reduces the size of a dataframe by reducing blocks of
     sequential identical data lines greater than 2 to only the earliest
-    and latest.
+    and latest (see redundant_rows).
 
     :param df: pandas dataframe
     :type df: pandas dataframe
+    :param tolerance: if given, numeric values closer than this are treated
+                      as identical (absorbs float noise)
+    :type tolerance: float
     :returns: a smaller pandas dataframe
     """
-    deletes = [False]  # we wanna keep the first row ...
-    for i in range(df.shape[0] - 2):
-        deletes.append(df.irow(i).tolist() == df.irow(i + 1).tolist()
-                    == df.irow(i + 2).tolist())
-    deletes.append(False)  # ... and the last row.
-    keeps = [not i for i in deletes]  # flip the list
-    if keeps.count(False) != 0:
-        print('{} redundant lines removed'.format(keeps.count(False)))
-    return df[keeps]
+    deletes = redundant_rows(df, tolerance)
+    if deletes.any():
+        print('{} redundant lines removed'.format(deletes.sum()))
+    return df[~deletes]
+
+
+def compact_data(df, compaction='rle'):
+    """
+    This function applies the requested run-length compaction to a freshly
+    loaded table.
+
+    :param df: pandas dataframe
+    :type df: pandas dataframe
+    :param compaction: 'rle' to losslessly drop the inner rows of identical
+                       runs (default), None to keep every row, or a number to
+                       use as the tolerance for float noise
+    :type compaction: str, float or None
+    :returns: a (possibly) smaller pandas dataframe
+    """
+    tolerance = compaction_tolerance(compaction)
+    if tolerance is False:
+        return df
+    return remove_redundant_data(df, tolerance=tolerance)
+
+
+def apply_dtypes(df, dtypes=None, units=None):
+    """
+    This function applies a dtype policy to a loaded table. The 'compact'
+    policy stores power and data rate values as float32 (about 7 significant
+    digits, plenty for the 3 decimals EPS writes) and string columns such as
+    modes and module states as categoricals, which hold every distinct
+    string once plus an integer code per row. Power and data rate columns
+    are told by their units (Watts, .../s or .../sec); accumulated volumes,
+    memory and any other numeric column keep their precision.
+
+    :param df: pandas dataframe
+    :type df: pandas dataframe
+    :param dtypes: None to keep the parsed dtypes or 'compact'
+    :type dtypes: str or None
+    :param units: unit of every column, e.g. the header 'units' (with or
+                  without the elapsed time one first); by default the last
+                  level of MultiIndex columns
+    :type units: list
+    :returns: pandas dataframe
+    """
+    if dtypes is None:
+        return df
+    if dtypes != 'compact':
+        raise ValueError('dtypes should be None or \'compact\', '
+                         'not {!r}'.format(dtypes))
+    if units is None and isinstance(df.columns, pd.MultiIndex):
+        units = df.columns.get_level_values(-1)
+    if units is None or len(units) not in (df.shape[1], df.shape[1] + 1):
+        units = [''] * df.shape[1]
+    units = list(units)[len(units) - df.shape[1]:]
+    columns = []
+    for i in range(df.shape[1]):
+        column = df.iloc[:, i]
+        # dtype.kind is 'O' for object, string and categorical columns
+        kind = getattr(column.dtype, 'kind', 'O')
+        if kind == 'f' and column.dtype.itemsize > 4 and \
+                _is_rate_unit(units[i]):
+            column = column.astype(np.float32)
+        elif kind in 'OSU' and str(column.dtype) != 'category':
+            column = column.astype('category')
+        columns.append(column)
+    # Rebuilt by position as the column names aren't always unique
+    compact = pd.concat(columns, axis=1) if columns else df.copy()
+    compact.columns = df.columns
+    return compact
+
+
+def _is_rate_unit(unit):
+    # Power (Watts) or data rate (kbit/s, Kbits/sec...) units
+    unit = str(unit).strip().strip('()').lower()
+    return unit in ('w', 'watt', 'watts') or unit.endswith('/s') or \
+        unit.endswith('/sec')
+
+
+def compaction_tolerance(compaction):
+    """
+    This function validates a compaction argument (see compact_data) and
+    turns it into the tolerance for redundant_rows.
 
-def read_csv_header(fname, meta=False, columns=False):
+    :param compaction: 'rle', None/False or a tolerance
+    :type compaction: str, float or None
+    :returns: False if no compaction is wanted, else the tolerance (None for
+              exact comparison)
+    """
+    if compaction is None or compaction is False:
+        return False
+    if compaction == 'rle':
+        return None
+    if isinstance(compaction, (int, float)) and \
+            not isinstance(compaction, bool):
+        return compaction
+    raise ValueError('compaction should be \'rle\', None or a tolerance, '
+                     'not {!r}'.format(compaction))
+
+
+def read_csv_header(fname):
     """
-    This function reads from a filename and processes the header. The rest of
-    the file is copied in a temporary file which will be processed later and
-    removed at the end.
+    This function reads from a filename and processes the header. It stops
+    at the first data line and stores that line's byte offset in the header
+    ('offset') so that read_csv can hand the rest of the file straight to
+    pandas without copying it anywhere.
 
     :param fname: The path to the power_avg.out or data_rate_avg.out
     :type fname: str.
-    :param meta: Flag to return the header dictionary
-    :type meta: bool.
-    :returns: pandas dataframe -- the return code.
+    :returns: header dictionary
     """
 
-    # Creating a temporary file where we will have only useful data
-    temporaryFile = tf.NamedTemporaryFile(delete=False)
     header = {}
-    with open(fname) as f:
-        for line in f:
+    offset = 0
+    with open(fname, 'rb') as f:
+        for raw in f:
+            line = raw.decode('utf-8', 'replace')
             # Filtering new lines characters
             if line.endswith("\n"):
                 line = line[:-1]
@@ -853,55 +1357,95 @@ def read_csv_header(fname, meta=False, columns=False):
                     header[aux[0][1:].strip()] = aux[1].strip()
             # Filtering blanklines
             elif len(line.split(',')) > 1:
-                # Filtering headers of the data
-                if not is_elapsed_time(line.split(',')[0].strip()):
-                    # Filtering units, not a very scalabe filter
-                    # but it works for now...
-                    if "hh:mm:ss" in line.split(',')[0]:
-                        header["units"] = [x.strip() for x in line.split(',')]
-                    # Filtering the rest of the headers
-                    elif not header.has_key("headings"):
-                        header["headings"] = \
-                            [x.strip() for x in line.split(',')]
-                    else:
-                        header["headings"] += \
-                            [x.strip() for x in line.split(',')]
+                # The first data line marks the end of the header
+                if is_elapsed_time(line.split(',')[0].strip()):
+                    break
+                # Filtering units, not a very scalabe filter
+                # but it works for now...
+                if "hh:mm:ss" in line.split(',')[0]:
+                    header["units"] = [x.strip() for x in line.split(',')]
+                # Filtering the rest of the headers
+                elif "headings" not in header:
+                    header["headings"] = \
+                        [x.strip() for x in line.split(',')]
                 else:
-                    # Storing useful data in the temporary file
-                    temporaryFile.write(line + "\n")
+                    header["headings"] += \
+                        [x.strip() for x in line.split(',')]
+            offset += len(raw)
+    header["offset"] = offset
     # Filtering the experiments from the header, not a very scalable filter
     # but it works for now...
     if "headings" in header:
         header["experiments"] = [x for x in header["headings"] if x.upper() == x and len(x)>0]
-    # Closing source file and setting temp. file's cursor at the beginning
-    f.close()
-    temporaryFile.seek(0, 0)
-    return header, temporaryFile
+    return header
+
 
-def read_csv(header, temporaryFile):
+def read_csv(header, fname, compaction='rle', start=None, end=None):
     """
-    This function reads a temporary file and dumps all the data in csv format
-    into a pandas dataframe.
+    This function dumps all the csv data of an EPS/MAPPS output file into a
+    pandas dataframe. pandas reads from a memory-mapped view of the file
+    that starts at the data offset found by read_csv_header, or only from
+    the lines around the requested time window (see pyops.timeindex).
 
-    :param header: data frame cotaining information of the header of the file
-    :type header: pandas dataframe
-    :param temporaryFile: path to the temporaryFile which contains the data
-    :type temporaryFile: string
+    :param header: header dictionary as returned by read_csv_header
+    :type header: dict
+    :param fname: The path to the power_avg.out or data_rate_avg.out
+    :type fname: string
+    :param compaction: redundant row removal, see compact_data
+    :type compaction: str, float or None
+    :param start: only load the rows from this time on (see
+                  pyops.timeindex)
+    :type start: datetime or str
+    :param end: only load the rows up to this time
+    :type end: datetime or str
     :returns: pandas dataframe
     """
 
-    # Inserting useful data into pandas
-    data = pd.read_csv(temporaryFile, header=None, sep=",", decimal='.')
+    window = None
+    if start is not None or end is not None:
+        window, first_line = read_window(fname, header["offset"],
+                                         parse_csv_ref_date(header), True,
+                                         start, end)
+    with open(fname, 'rb') as f:
+        if window is not None:
+            if window.strip():
+                data = pd.read_csv(io.BytesIO(window), header=None, sep=",",
+                                   decimal='.')
+            else:
+                data = pd.DataFrame(columns=header["headings"])
+        elif header["offset"] >= os.fstat(f.fileno()).st_size:
+            data = pd.DataFrame(columns=header["headings"])
+        else:
+            view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                view.seek(header["offset"])
+                # Inserting useful data into pandas
+                data = pd.read_csv(view, header=None, sep=",", decimal='.')
+            finally:
+                view.close()
     data.columns = header["headings"]
-    # Closing and deleting temporary file
-    temporaryFile.close()
-    os.unlink(temporaryFile.name)
     # Preparing data to behave as the main Jonathan's script does
-    data = prepare_table(data, header)
+    data = prepare_table(data, header, compaction, start, end)
 
     return data
 
-def prepare_table(data, header):
+
+def parse_csv_ref_date(header):
+    """
+    This function turns the Ref_date entry of a csv output file header into
+    a datetime.
+
+    :param header: header dictionary as returned by read_csv_header
+    :type header: dict
+    :returns: reference date in date time format.
+    """
+    ref_date = header["Ref_date"].split('-')[0] + "-" +\
+        str(getMonth(header["Ref_date"].split('-')[1])) + "-" + \
+        header["Ref_date"].split('-')[2]
+    return datetime.strptime(ref_date, "%d-%m-%Y")
+
+
+def prepare_table(data, header, compaction='rle', start=None, end=None):
     """
     This function prepares de input data to be handled for the rest of the
     functions in this library.
@@ -910,24 +1454,28 @@ def prepare_table(data, header):
     :type data: pandas dataframe
     :param header: data frame cotaining information of the header of the file
     :type header: pandas dataframe
+    :param compaction: redundant row removal, see compact_data
+    :type compaction: str, float or None
+    :param start: drop the rows before this time
+    :type start: datetime or str
+    :param end: drop the rows after this time
+    :type end: datetime or str
     :returns: pandas dataframe
     """
 
     # Getting the reference date from the header and transforming it into
     # datetime format
-    ref_date = header["Ref_date"].split('-')[0] + "-" +\
-        str(getMonth(header["Ref_date"].split('-')[1])) + "-" + \
-        header["Ref_date"].split('-')[2]
-    ref_date = datetime.strptime(ref_date, "%d-%m-%Y")
+    ref_date = parse_csv_ref_date(header)
 
     # Converting the Elapsed time column into datetime format and we set it
     # as the new index of the table
     data["Elapsed time"] = \
-        [parse_time(x, ref_date) for x in data["Elapsed time"]]
+        parse_elapsed_times(data["Elapsed time"].values, ref_date)
     data = data.sort_index(by=['Elapsed time'], ascending=[True])
     data = data.set_index("Elapsed time")
     data.index.names = ['Date & Time']
+    data = select_window(data, start, end)
 
     # Removing redundant data from the dataframe
-    data = remove_redundant_data(data)
+    data = compact_data(data, compaction)
     return data
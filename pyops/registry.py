@@ -0,0 +1,312 @@
+"""
+This module loads the EDFs of a whole mission at once: every EDF of a
+directory and, recursively, the files they include. The files are parsed
+in a process pool and every parsed EDF is kept in an on-disk cache, so
+that loading the registry again only parses the files edited since.
+
+The sections of all the EDFs can then be queried as single tables, with
+the experiment of every row as a column.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import pickle
+import tempfile
+
+import pandas as pd
+
+from pyops import __version__
+from pyops.cache import DEFAULT_CACHE_DIR
+from pyops.edf import EDF
+from pyops.utils import file_digest
+
+
+# Layout of the cache entries and of the EDF objects pickled in them, to be
+# bumped whenever either changes; entries of another format (or written by
+# another pyops version) are parsed again
+CACHE_FORMAT = 'edf-registry-1'
+
+
+def _load_edf(fname):
+    # Module level so that it can run in a process pool
+    return EDF(fname)
+
+
+class EDFRegistry:
+    """
+    This class loads every EDF of a directory, and the files they include,
+    and merges their sections into cross-instrument tables.
+    """
+
+    def __init__(self, directory, cache=True, parallel=True, processes=None):
+        """
+        This constructor method initialises the EDFRegistry object.
+
+        :param directory: directory with the EDF files
+        :type directory: str
+        :param cache: on-disk cache of the parsed EDFs: True (default, in
+                      $PYOPS_CACHE_DIR/edf or ~/.cache/pyops/edf), False or
+                      None (off) or a directory name
+        :type cache: bool or str
+        :param parallel: Flag to parse the EDFs in a process pool
+        :type parallel: bool
+        :param processes: size of the pool (default: one per file, up to
+                          the number of CPUs)
+        :type processes: int
+        :returns: EDFRegistry object
+        """
+        if not os.path.isdir(directory):
+            print ("It seems as if " + directory + " is not a directory")
+            raise NameError('Directory not found')
+        if cache is True:
+            cache = os.path.join(
+                os.environ.get('PYOPS_CACHE_DIR', DEFAULT_CACHE_DIR), 'edf')
+        if cache and not os.path.isdir(cache):
+            os.makedirs(cache)
+        self.directory = os.path.abspath(directory)
+        self.cache = cache or None
+        self.parallel = parallel
+        self.processes = processes
+        # Parsed EDF, included files and experiments of every file, and the
+        # (file, experiment) pairs in the order their rows appear in the
+        # merged tables
+        self.edfs = dict()
+        self.includes = dict()
+        self.experiments = dict()
+        self.files = list()
+        # (size, modification time) and content digest of every file
+        self.stamps = dict()
+        self.digests = dict()
+        self.refresh()
+
+    def scan(self):
+        """
+        This method lists the EDF files of the directory.
+
+        :returns: sorted list of file paths
+        """
+        return sorted(os.path.join(self.directory, f)
+                      for f in os.listdir(self.directory)
+                      if f.lower().endswith('.edf') and
+                      os.path.isfile(os.path.join(self.directory, f)))
+
+    def refresh(self):
+        """
+        This method loads the EDFs of the directory, and the files they
+        include, that aren't loaded yet or changed since. Files unchanged
+        since they were cached are read from the cache instead of parsed.
+
+        :returns: list of the files parsed
+        """
+        parsed = list()
+        known = set()
+        level = self.scan()
+        while len(level) > 0:
+            tasks = list()
+            for fname in level:
+                known.add(fname)
+                if not self._is_current(fname) and not self._from_cache(fname):
+                    tasks.append(fname)
+            for fname in tasks:
+                print ("Reading " + os.path.basename(fname) + "...")
+            processes = self.processes
+            if processes is None:
+                processes = min(len(tasks), multiprocessing.cpu_count())
+            if self.parallel and len(tasks) > 1 and processes > 1:
+                pool = multiprocessing.Pool(processes)
+                try:
+                    edfs = pool.map(_load_edf, tasks)
+                finally:
+                    pool.close()
+                    pool.join()
+            else:
+                edfs = [_load_edf(fname) for fname in tasks]
+            for fname, edf in zip(tasks, edfs):
+                self._store(fname, edf)
+                parsed.append(fname)
+
+            # The next level, skipping the files already loaded
+            next_level = list()
+            for fname in level:
+                for included in self.includes[fname]:
+                    if included not in known and included not in next_level:
+                        next_level.append(included)
+            level = next_level
+
+        # Forgetting the files that are gone, and their cache entries
+        for fname in list(self.edfs):
+            if fname not in known:
+                del self.edfs[fname], self.includes[fname]
+                del self.stamps[fname], self.digests[fname]
+                if self.cache is not None and \
+                        os.path.isfile(self._entry(fname)):
+                    os.remove(self._entry(fname))
+        self._order()
+        return parsed
+
+    def table(self, section, table='Table'):
+        """
+        This method merges a section of every EDF into a single table, with
+        the experiment of every row in its first column. The rows of a file
+        included by the EDFs of several experiments appear once for each.
+
+        :param section: EDF section attribute, e.g. 'MODES' or 'ACTIONS'
+        :type section: str
+        :param table: table of the section, e.g. 'Module_states_Table'
+        :type table: str
+        :returns: pandas dataframe
+        """
+        frames = list()
+        for fname, experiment in self.files:
+            frame = getattr(getattr(self.edfs[fname], section), table).copy()
+            frame.insert(0, 'experiment', experiment)
+            frames.append(frame)
+        if len(frames) == 0:
+            return pd.DataFrame(columns=['experiment'])
+        return pd.concat(frames, ignore_index=True)
+
+    @property
+    def modes(self):
+        """
+        Modes of every experiment.
+        """
+        return self.table('MODES')
+
+    @property
+    def modules(self):
+        """
+        Modules of every experiment.
+        """
+        return self.table('MODULES')
+
+    @property
+    def module_states(self):
+        """
+        Module states of every experiment.
+        """
+        return self.table('MODULES', 'Module_states_Table')
+
+    @property
+    def actions(self):
+        """
+        Actions of every experiment.
+        """
+        return self.table('ACTIONS')
+
+    @property
+    def data_stores(self):
+        """
+        Data stores of every experiment.
+        """
+        return self.table('DATA_STORES')
+
+    def _is_current(self, fname):
+        # Whether the file is loaded and unchanged on disk
+        if fname not in self.edfs or not os.path.isfile(fname):
+            return False
+        stat = os.stat(fname)
+        if (stat.st_size, stat.st_mtime) == self.stamps[fname]:
+            return True
+        if file_digest(fname) == self.digests[fname]:
+            self.stamps[fname] = (stat.st_size, stat.st_mtime)
+            return True
+        return False
+
+    def _entry(self, fname):
+        key = hashlib.sha1(fname.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache, key + '.pickle')
+
+    def _from_cache(self, fname):
+        # Loads the file from the cache if it didn't change since cached
+        if self.cache is None or not os.path.isfile(fname):
+            return False
+        entry = self._entry(fname)
+        if not os.path.isfile(entry):
+            return False
+        try:
+            with open(entry, 'rb') as f:
+                cached = pickle.load(f)
+        except Exception:
+            # Unreadable entry (e.g. written by another pyops version)
+            return False
+        if not isinstance(cached, dict) or \
+                cached.get('format') != (CACHE_FORMAT, __version__) or \
+                cached.get('path') != fname:
+            return False
+        stat = os.stat(fname)
+        stamp = (stat.st_size, stat.st_mtime)
+        if cached['stamp'] != stamp:
+            if cached['digest'] != file_digest(fname):
+                return False
+            cached['stamp'] = stamp
+        self._set(fname, cached['edf'], cached['stamp'], cached['digest'])
+        return True
+
+    def _store(self, fname, edf):
+        stat = os.stat(fname)
+        stamp = (stat.st_size, stat.st_mtime)
+        digest = file_digest(fname)
+        self._set(fname, edf, stamp, digest)
+        if self.cache is None:
+            return
+        # Written to a temporary file first so that a concurrent reader
+        # never sees a half written entry
+        fd, tmp = tempfile.mkstemp(prefix='.', dir=self.cache)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump({'format': (CACHE_FORMAT, __version__),
+                             'path': fname, 'stamp': stamp,
+                             'digest': digest, 'edf': edf},
+                            f, pickle.HIGHEST_PROTOCOL)
+            if os.path.isfile(self._entry(fname)):
+                os.remove(self._entry(fname))
+            os.rename(tmp, self._entry(fname))
+        except Exception:
+            if os.path.isfile(tmp):
+                os.remove(tmp)
+            raise
+
+    def _set(self, fname, edf, stamp, digest):
+        path = os.path.dirname(fname)
+        includes = list()
+        for f in edf.include_files:
+            included = os.path.join(path, f[0].strip('"'))
+            if os.path.isfile(included):
+                includes.append(os.path.abspath(included))
+            else:
+                print ("***[WARNING]***: It seems as if " + f[0] +
+                       " included by " + os.path.basename(fname) +
+                       " doesn't exist")
+        self.edfs[fname] = edf
+        self.includes[fname] = includes
+        self.stamps[fname] = stamp
+        self.digests[fname] = digest
+
+    def _order(self):
+        # Every EDF nothing includes followed by the files it includes,
+        # which belong to its experiment unless they name their own. A file
+        # included for several experiments belongs to each of them.
+        self.files = list()
+        self.experiments = dict()
+        unnamed = EDF().experiment
+        included = set(f for fname in self.edfs for f in self.includes[fname])
+
+        def visit(fname, experiment):
+            edf = self.edfs[fname]
+            if edf.experiment != unnamed:
+                experiment = edf.experiment.split()[0]
+            elif experiment is None:
+                experiment = os.path.splitext(os.path.basename(fname))[0]
+            if experiment in self.experiments.get(fname, []):
+                return
+            self.experiments.setdefault(fname, []).append(experiment)
+            self.files.append((fname, experiment))
+            for f in self.includes[fname]:
+                visit(f, experiment)
+
+        roots = self.scan()
+        # Files including each other only are visited last
+        for fname in [f for f in roots if f not in included] + roots:
+            if fname not in self.experiments:
+                visit(fname, None)
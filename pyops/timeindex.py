@@ -0,0 +1,194 @@
+"""
+This module maintains sidecar time indexes of EPS/MAPPS output files. An
+index maps the elapsed time of every n-th data line to the byte offset and
+line number of that line, so that a time window of a long run can be read
+by seeking straight to it instead of parsing the whole file.
+
+The index is built once per file and stored in the pyops cache directory
+($PYOPS_CACHE_DIR/index or ~/.cache/pyops/index). Setting $PYOPS_INDEX_SIDECAR
+stores it next to the file instead (<fname>.pyops-index.npy), falling back on
+the cache directory when that one isn't writable. It is rebuilt whenever the
+size or the modification time of the file change.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from pyops.cache import DEFAULT_CACHE_DIR
+from pyops.utils import parse_elapsed_times
+
+INDEX_SUFFIX = '.pyops-index.npy'
+DEFAULT_EVERY = 1000
+
+
+def index_paths(fname):
+    """
+    This function lists the places the index of a file may be stored in,
+    in order of preference: the cache directory, preceded by the directory
+    of the file itself when $PYOPS_INDEX_SIDECAR is set.
+
+    :param fname: EPS/MAPPS output file name
+    :type fname: str
+    :returns: list of file names
+    """
+    directory = os.path.join(
+        os.environ.get('PYOPS_CACHE_DIR', DEFAULT_CACHE_DIR), 'index')
+    digest = hashlib.sha1(os.path.abspath(fname).encode('utf-8')).hexdigest()
+    paths = [os.path.join(directory, digest + '.npy')]
+    if os.environ.get('PYOPS_INDEX_SIDECAR'):
+        paths.insert(0, fname + INDEX_SUFFIX)
+    return paths
+
+
+def line_offset(fname, lines):
+    """
+    This function returns the byte offset of a line of a file.
+
+    :param fname: file name
+    :type fname: str
+    :param lines: number of lines to skip
+    :type lines: int
+    :returns: byte offset of the line
+    """
+    offset = 0
+    with open(fname, 'rb') as f:
+        for n, raw in enumerate(f):
+            if n == lines:
+                break
+            offset += len(raw)
+    return offset
+
+
+def build_time_index(fname, data_offset, ref_date, csv, every=DEFAULT_EVERY):
+    """
+    This function scans the data block of an EPS/MAPPS output file and
+    samples the elapsed time of every n-th data line.
+
+    :param fname: EPS/MAPPS output file name
+    :type fname: str
+    :param data_offset: byte offset of the first data line
+    :type data_offset: int
+    :param ref_date: reference date of the elapsed times
+    :type ref_date: datetime
+    :param csv: Flag for the csv flavour of the output files
+    :type csv: bool
+    :param every: sampling interval in data lines
+    :type every: int
+    :returns: int64 array of (time [ns], byte offset, line number) rows
+    """
+    texts, offsets, lines = [], [], []
+    with open(fname, 'rb') as f:
+        line = f.read(data_offset).count(b'\n')
+        offset = data_offset
+        count = 0
+        for raw in f:
+            line += 1
+            stripped = raw.strip()
+            if stripped:
+                if count % every == 0:
+                    if csv:
+                        field = stripped.split(b',', 1)[0].strip()
+                    else:
+                        field = stripped.split(None, 1)[0]
+                    texts.append(field.decode('ascii', 'replace'))
+                    offsets.append(offset)
+                    lines.append(line)
+                count += 1
+            offset += len(raw)
+    times = parse_elapsed_times(np.array(texts, dtype=object), ref_date)
+    if pd.isnull(times).any():
+        raise ValueError('Unrecognised elapsed time in {}'.format(fname))
+    index = np.empty((len(texts), 3), dtype=np.int64)
+    index[:, 0] = np.asarray(times, dtype='datetime64[ns]').view(np.int64)
+    index[:, 1] = offsets
+    index[:, 2] = lines
+    return index
+
+
+def load_time_index(fname, data_offset, ref_date, csv, every=DEFAULT_EVERY):
+    """
+    This function returns the time index of a file, building (and storing)
+    it if there's no up to date one.
+
+    :param fname: EPS/MAPPS output file name
+    :type fname: str
+    :param data_offset: byte offset of the first data line
+    :type data_offset: int
+    :param ref_date: reference date of the elapsed times
+    :type ref_date: datetime
+    :param csv: Flag for the csv flavour of the output files
+    :type csv: bool
+    :param every: sampling interval in data lines for a new index
+    :type every: int
+    :returns: int64 array of (time [ns], byte offset, line number) rows
+    """
+    stat = os.stat(fname)
+    # The first row identifies the version of the file the index belongs to
+    stamp = [stat.st_size, int(stat.st_mtime * 1e9), data_offset]
+    paths = index_paths(fname)
+    for path in paths:
+        try:
+            stored = np.load(path)
+        except (IOError, OSError, ValueError):
+            continue
+        if stored.ndim == 2 and len(stored) and list(stored[0]) == stamp:
+            return stored[1:]
+    index = build_time_index(fname, data_offset, ref_date, csv, every)
+    stored = np.vstack([np.array([stamp], dtype=np.int64), index])
+    for path in paths:
+        try:
+            if not os.path.isdir(os.path.dirname(os.path.abspath(path))):
+                os.makedirs(os.path.dirname(os.path.abspath(path)))
+            with open(path, 'wb') as f:
+                np.save(f, stored)
+            break
+        except (IOError, OSError):
+            continue
+    return index
+
+
+def read_window(fname, data_offset, ref_date, csv, start=None, end=None):
+    """
+    This function returns the raw lines of an EPS/MAPPS output file that
+    may fall between start and end. The lines are cut at sampled lines of
+    the time index, so a few lines either side of the window are included
+    and the caller still has to trim the parsed table.
+
+    :param fname: EPS/MAPPS output file name
+    :type fname: str
+    :param data_offset: byte offset of the first data line
+    :type data_offset: int
+    :param ref_date: reference date of the elapsed times
+    :type ref_date: datetime
+    :param csv: Flag for the csv flavour of the output files
+    :type csv: bool
+    :param start: start of the window (None for the start of the file)
+    :type start: datetime or str
+    :param end: end of the window (None for the end of the file)
+    :type end: datetime or str
+    :returns: bytes of the lines and line number of the first one
+    """
+    if start is not None and end is not None and \
+            pd.Timestamp(start) > pd.Timestamp(end):
+        return b'', 0
+    index = load_time_index(fname, data_offset, ref_date, csv)
+    size = os.path.getsize(fname)
+    if not len(index):
+        return b'', 0
+    times = index[:, 0]
+    first = 0
+    if start is not None:
+        # last sampled line strictly before start: equal times may repeat
+        first = max(np.searchsorted(
+            times, pd.Timestamp(start).value, side='left') - 1, 0)
+    last = len(index)
+    if end is not None:
+        last = np.searchsorted(times, pd.Timestamp(end).value, side='right')
+    lo = index[first, 1]
+    hi = index[last, 1] if last < len(index) else size
+    with open(fname, 'rb') as f:
+        f.seek(lo)
+        return f.read(hi - lo), index[first, 2]
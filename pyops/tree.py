@@ -0,0 +1,174 @@
+"""
+This module keeps an ITL or EVF file loaded together with every file it
+includes, so that during planning iterations only the files edited since
+the last load are parsed again.
+
+Every (file, reference date) of the include tree is a node holding the
+parsed file, the nodes it includes and the merged events of its subtree.
+When a file changes, only its node is parsed again and only the merged
+events of the nodes above it are rebuilt, by a k-way merge of the already
+sorted events of the node and of its includes.
+
+The files are loaded through the include cache of pyops.itl (see
+cached_itl), which ITL.merge_includes uses too, so a file parsed by either
+is parsed once and an edit is detected the same way by both.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from pyops.itl import ITL, cached_itl, cache_itl
+from pyops.evf import EVF
+
+
+def _merge_runs(times, one, other):
+    # Positions of the rows of other once merged after the rows of one
+    # with the same time
+    at = np.searchsorted(times[one], times[other], side='right') + \
+        np.arange(len(other))
+    merged = np.empty(len(one) + len(other), dtype=np.int64)
+    from_other = np.zeros(len(merged), dtype=bool)
+    from_other[at] = True
+    merged[at] = other
+    merged[~from_other] = one
+    return merged
+
+
+def merge_sorted_events(frames):
+    """
+    This function merges events dataframes already sorted by time into a
+    single sorted dataframe, merging them pairwise with searchsorted (a
+    k-way merge in log2(k) rounds). Simultaneous events keep the order of
+    the frames, as with a stable sort of their concatenation.
+
+    :param frames: events dataframes sorted by their 'time' column
+    :type frames: list
+    :returns: pandas dataframe
+    """
+    events = pd.concat(frames, ignore_index=True)
+    times = events['time'].values
+    if len(frames) < 2:
+        return events
+    if times.dtype.kind != 'M':
+        # Times of day and the like, there's nothing to searchsorted on
+        return events.sort(['time'], kind='mergesort')
+
+    runs = list()
+    start = 0
+    for frame in frames:
+        runs.append(np.arange(start, start + len(frame)))
+        start += len(frame)
+    while len(runs) > 1:
+        merged = [_merge_runs(times, one, other)
+                  for one, other in zip(runs[::2], runs[1::2])]
+        if len(runs) % 2 == 1:
+            merged.append(runs[-1])
+        runs = merged
+    return events.take(runs[0])
+
+
+class IncludeTree:
+    """
+    This class loads an ITL or EVF file and, recursively, the files it
+    includes. refresh() loads again the files changed on disk and rebuilds
+    the merged events of the nodes that include them.
+    """
+
+    def __init__(self, fname, ref_date=None, parser=None, check=False):
+        """
+        This constructor method initialises the IncludeTree object.
+
+        :param fname: root ITL or EVF file name
+        :type fname: str
+        :param ref_date: reference date of the root file
+        :type ref_date: datetime
+        :param parser: class the files are loaded with (default: EVF for
+                       .evf files, ITL otherwise)
+        :type parser: class
+        :param check: Flag to run check_consistency on every parsed file
+        :type check: bool
+        :returns: IncludeTree object
+        """
+        if parser is None:
+            parser = EVF if fname.lower().endswith('.evf') else ITL
+        self.root = (os.path.abspath(fname), ref_date)
+        self.parser = parser
+        self.check = check
+        # Parsed file, included nodes and merged events of every node
+        self.files = dict()
+        self.includes = dict()
+        self.merged = dict()
+        self.refresh()
+
+    @property
+    def events(self):
+        """
+        Merged events of the whole tree, sorted by time.
+        """
+        return self.merged[self.root]
+
+    def refresh(self):
+        """
+        This method loads the files changed on disk (and the files they
+        now include) again and rebuilds the merged events of their nodes
+        and of every node above them. A file whose size or modification
+        time changed but whose content is the same is not loaded again.
+
+        :returns: list of the (file, reference date) nodes loaded
+        """
+        loaded = list()
+        # Whether the merged events of a node were rebuilt in this refresh
+        rebuilt = dict()
+
+        def visit(node, ancestors):
+            if node in ancestors:
+                print ("It seems as if " + os.path.basename(node[0]) +
+                       " includes itself")
+                raise NameError('Circular include')
+            if node in rebuilt:
+                return rebuilt[node]
+            stale = False
+            parsed = self._load(node)
+            if parsed is not self.files.get(node):
+                self.files[node] = parsed
+                self.includes[node] = parsed.get_includes()
+                loaded.append(node)
+                stale = True
+            for child in self.includes[node]:
+                # Every child is visited, even once the node is known stale
+                stale = visit(child, ancestors + [node]) or stale
+            if stale or node not in self.merged:
+                self.merged[node] = merge_sorted_events(
+                    [self.files[node].events] +
+                    [self.merged[child] for child in self.includes[node]])
+                stale = True
+            rebuilt[node] = stale
+            return stale
+
+        visit(self.root, [])
+
+        # Forgetting the files nothing includes anymore
+        for node in list(self.files):
+            if node not in rebuilt:
+                del self.files[node], self.includes[node], self.merged[node]
+        return loaded
+
+    def _load(self, node):
+        # The file from the include cache, parsed again if it changed
+        path, ref_date = node
+        parsed = cached_itl(path, ref_date, self.parser)
+        if parsed is not None:
+            return parsed
+        if not os.path.isfile(path):
+            print ("It seems as if " + path + " doesn't exist")
+            raise NameError('Missing include')
+        if ref_date is None:
+            parsed = self.parser(path)
+        else:
+            parsed = self.parser(path, ref_date=ref_date)
+        if self.check:
+            parsed.check_consistency()
+        cache_itl(path, parsed, ref_date, self.parser)
+        return parsed
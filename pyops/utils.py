@@ -3,10 +3,13 @@
 This module is very useful...
 """
 from bisect import bisect_left
+import hashlib
 import os
 import sys
 import re
 from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
 # import spice
 from plotly.graph_objs import Scatter
 
@@ -195,6 +198,21 @@ def zipdir(path, zip):
             zip.write(os.path.join(root, file))
 
 
+def file_digest(fname):
+    """
+    This function returns the sha1 hex digest of the content of a file.
+
+    :param fname: file name
+    :type fname: str
+    :returns: hex digest
+    """
+    content = hashlib.sha1()
+    with open(fname, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            content.update(chunk)
+    return content.hexdigest()
+
+
 def inifix(stem, no_levels):
     """
     This function _add_summary_here_
@@ -359,6 +377,12 @@ def get_unique_from_list(seq, idfun=None):
     return result
 
 
+# Both rules of is_elapsed_time in a single compiled pattern, for the
+# parsers testing every line of a file
+EVENT_TIME_PATTERN = re.compile(r'[0-2][0-9]:[0-5][0-9]:[0-5][0-9]|'
+                                r'[0-3][0-9]-*-[0-9][0-9][0-9][0-9]')
+
+
 def is_elapsed_time(element):
     """
     1.[[sign][ddd_]hh:mm:ss]
@@ -369,10 +393,7 @@ def is_elapsed_time(element):
     4 always will contain dd-month-yyyy --> [0-3][0-9]-*-[0-9][0-9][0-9][0-9]
 
     """
-    firstRule = "[0-2][0-9]:[0-5][0-9]:[0-5][0-9]"
-    secondRule = "[0-3][0-9]-*-[0-9][0-9][0-9][0-9]"
-    return bool(re.search(firstRule, element)) or \
-        bool(re.search(secondRule, element))
+    return bool(EVENT_TIME_PATTERN.search(element))
 
 
 def parse_time(*arg):
@@ -412,4 +433,200 @@ def parse_time(*arg):
             return 1
     else:
         print('Error: Can\'t handle {} arguments.'.format(len(arg)))
-        return 1
\ No newline at end of file
+        return 1
+
+
+def parse_elapsed_times(elapsed, ref_date):
+    """
+    This function is the bulk counterpart of parse_time for EPS/MAPPS output
+    files. Rather than running a regex and building a timedelta per row it
+    converts a whole column of ddd_hh:mm:ss strings in one vectorised pass
+    and adds the result to the reference date.
+
+    :param elapsed: elapsed time strings in the format ddd_hh:mm:ss
+    :type elapsed: list, numpy array or pandas series
+    :param ref_date: reference date the elapsed times are relative to
+    :type ref_date: datetime
+    :returns: pandas DatetimeIndex (NaT where a string can't be parsed)
+    """
+    text = np.asarray(elapsed).astype(np.str_)
+    seconds = _elapsed_fixed_width_seconds(text)
+    if seconds is None:
+        # Slower, but still column-wise, for anything that isn't strictly
+        # ddd_hh:mm:ss (signs, longer day counts, fractional seconds...)
+        parts = pd.Series(text).str.extract(
+            r'^\s*([+-]?)([0-9]+)_([0-9]{1,2}):([0-9]{2}):'
+            r'([0-9]{2}(?:\.[0-9]*)?)')
+        seconds = parts[1].astype(float) * 86400 + \
+            parts[2].astype(float) * 3600 + \
+            parts[3].astype(float) * 60 + parts[4].astype(float)
+        seconds = np.where(parts[0] == '-', -seconds, seconds)
+    return pd.Timestamp(ref_date) + pd.to_timedelta(seconds, unit='s')
+
+
+def parse_event_times(raw, ref_date=None):
+    """
+    This function is the bulk counterpart of the _to_datetime methods of the
+    ITL and EVF classes. It converts a whole column of event times written in
+    any of the EPS time formats listed in is_elapsed_time:
+
+    1. [sign][ddd_]hh:mm:ss[.mmm] (or ddd.hh:mm:ss) relative to ref_date
+    2. hh:mm:ss, the same without days
+    3. yy-dddThh:mm:ss[.mmm]Z, counting the days like parse_time does
+    4. dd-month-yyyy_hh:mm:ss
+
+    :param raw: event time strings
+    :type raw: list, numpy array or pandas series
+    :param ref_date: reference date of the relative formats (1 and 2)
+    :type ref_date: datetime
+    :returns: pandas Series of datetimes, NaT where a string can't be parsed
+              (or is relative and there's no ref_date)
+    """
+    text = np.char.strip(np.asarray(raw).astype(np.str_))
+    if ref_date is not None:
+        # Timelines are usually all ddd_hh:mm:ss, see parse_elapsed_times
+        seconds = _elapsed_fixed_width_seconds(text)
+        if seconds is not None:
+            return pd.Series(pd.Timestamp(ref_date) +
+                             pd.to_timedelta(seconds, unit='s'))
+    text = pd.Series(text)
+    times = pd.Series(pd.NaT, index=text.index, dtype='datetime64[ns]')
+    if len(text) == 0:
+        return times
+
+    # 1 and 2: [sign][ddd_]hh:mm:ss
+    parts = text.str.extract(
+        r'^([+-]?)(?:([0-9]+)[_.])?([0-9]{1,2}):([0-9]{2}):'
+        r'([0-9]{2}(?:\.[0-9]*)?)$')
+    found = parts[2].notnull()
+    # Each of the other formats only looks at what is still unparsed
+    text = text[~found]
+    if ref_date is not None and found.any():
+        parts = parts[found]
+        seconds = parts[1].fillna('0').astype(float) * 86400 + \
+            parts[2].astype(float) * 3600 + \
+            parts[3].astype(float) * 60 + parts[4].astype(float)
+        seconds = np.where(parts[0] == '-', -seconds, seconds)
+        times[found] = pd.Timestamp(ref_date) + \
+            pd.to_timedelta(seconds, unit='s')
+
+    # 3: yy-dddThh:mm:ss[.mmm]Z
+    parts = text.str.extract(
+        r'^([0-9]{2})-([0-9]{3})T([0-9]{2}):([0-9]{2}):'
+        r'([0-9]{2}(?:\.[0-9]*)?)Z$')
+    found = parts[0].notnull()
+    if found.any():
+        parts = parts[found]
+        years = parts[0].astype(int) + 2000
+        days = parts[1].astype(int)
+        # Same day counting (and leap year correction) as parse_time
+        days = days - ((days > 60) & (years % 4 == 0)).astype(int)
+        seconds = days * 86400 + parts[2].astype(int) * 3600 + \
+            parts[3].astype(int) * 60 + parts[4].astype(float).round()
+        times[parts.index] = pd.to_datetime(
+            years.astype(str) + '-01-01', format='%Y-%m-%d') + \
+            pd.to_timedelta(seconds.values, unit='s')
+        text = text[~found]
+
+    # 4: dd-month-yyyy_hh:mm:ss
+    parts = text.str.extract(
+        r'^([0-9]{1,2})-([A-Za-z]{3})[A-Za-z]*-([0-9]{4})_'
+        r'([0-9]{1,2}):([0-9]{2}):([0-9]{2}(?:\.[0-9]*)?)$')
+    found = parts[0].notnull()
+    if found.any():
+        parts = parts[found]
+        dates = pd.to_datetime(parts[0] + '-' + parts[1].str.capitalize() +
+                               '-' + parts[2], format='%d-%b-%Y',
+                               errors='coerce')
+        seconds = parts[3].astype(float) * 3600 + \
+            parts[4].astype(float) * 60 + parts[5].astype(float)
+        times[parts.index] = \
+            dates + pd.to_timedelta(seconds.values, unit='s')
+
+    return times
+
+
+def _elapsed_fixed_width_seconds(text):
+    """
+    Fast path of parse_elapsed_times: if every element is exactly
+    ddd_hh:mm:ss the characters are decoded straight from the unicode buffer.
+
+    :param text: numpy unicode array of elapsed time strings
+    :type text: numpy array
+    :returns: int64 array of elapsed seconds or None if the fast path can't
+              be used
+    """
+    if text.size == 0 or text.dtype.itemsize != 12 * 4 or \
+            not (np.char.str_len(text) == 12).all():
+        return None
+    codes = np.ascontiguousarray(text).view(np.uint32).reshape(-1, 12)
+    codes = codes.astype(np.int64) - ord('0')
+    separators = {3: '_', 6: ':', 9: ':'}
+    for col, char in separators.items():
+        if not (codes[:, col] == ord(char) - ord('0')).all():
+            return None
+    digits = codes[:, [0, 1, 2, 4, 5, 7, 8, 10, 11]]
+    if ((digits < 0) | (digits > 9)).any():
+        return None
+    days = digits[:, 0] * 100 + digits[:, 1] * 10 + digits[:, 2]
+    hours = digits[:, 3] * 10 + digits[:, 4]
+    minutes = digits[:, 5] * 10 + digits[:, 6]
+    seconds = digits[:, 7] * 10 + digits[:, 8]
+    return days * 86400 + hours * 3600 + minutes * 60 + seconds
+
+
+def format_timeline_header(timeline, include_files):
+    """
+    This function rebuilds the header of an ITL or EVF file, i.e. the
+    comments before the first header line, the Ref_date, Start_time,
+    End_time, Propagation_delay, Init_value and Include_file lines and the
+    comments found after them, in the order they are read back.
+
+    :param timeline: ITL or EVF object
+    :param include_files: Include_file lines, as lists of tokens
+    :type include_files: list
+    :returns: list of lines
+    """
+    lines = list(timeline.header)
+    for key, attribute in [('Ref_date:', 'raw_ref_time'),
+                           ('Start_time:', 'raw_start_time'),
+                           ('End_time:', 'raw_end_time')]:
+        if hasattr(timeline, attribute):
+            lines.append('{} {}\n'.format(key, getattr(timeline, attribute)))
+    if timeline.propagation_delay is not None:
+        lines.append(' '.join(['Propagation_delay:'] +
+                              list(timeline.propagation_delay)) + '\n')
+    for value in timeline.init_values:
+        lines.append(' '.join(['Init_value:'] + list(value)) + '\n')
+    for include in include_files:
+        lines.append(' '.join(['Include_file:'] + list(include)) + '\n')
+    return lines + list(timeline.WTF)
+
+
+def same_timeline(one, other):
+    """
+    This function compares two ITL or EVF objects the way a file written
+    with to_file and loaded again should match the original: same header,
+    header lines, includes and events.
+
+    :param one: ITL or EVF object
+    :param other: ITL or EVF object
+    :returns: list of the attributes that differ (empty if they match)
+    """
+    def plain(values):
+        # NaN and None both mean a missing value
+        return [[None if v is None or v is pd.NaT or
+                 (isinstance(v, float) and v != v) else v for v in row]
+                for row in values]
+
+    differ = list()
+    for attribute in ['header', 'meta', 'WTF', 'init_values',
+                      'include_files', 'propagation_delay', 'ref_date',
+                      'raw_start_time', 'raw_end_time']:
+        if getattr(one, attribute, None) != getattr(other, attribute, None):
+            differ.append(attribute)
+    if list(one.events.columns) != list(other.events.columns) or \
+            plain(one.events.values.tolist()) != \
+            plain(other.events.values.tolist()):
+        differ.append('events')
+    return differ
@@ -0,0 +1,41 @@
+import pytest
+
+
+_master = """# Comment: master timeline
+#
+Ref_date: 01-Jan-2024
+Start_time: 01-Jan-2024_00:00:00
+End_time: 10-Jan-2024_00:00:00
+#
+000_01:00:00 MERTIS MODE_A ACTION_A
+000_02:00:00 INCLUDE "a.itl"
+001_02:00:00 INCLUDE "a.itl"
+000_03:00:00 INCLUDE "b.itl" # second include
+"""
+
+_includes = {
+    'a.itl': '000_00:10:00 ISA MODE_C ACTION_C\n'
+             '000_00:20:00 INCLUDE "c.itl"\n',
+    'b.itl': '000_00:30:00 MGNS MODE_D ACTION_D # b event\n',
+    'c.itl': '000_00:05:00 PHEBUS MODE_E ACTION_E\n'}
+
+
+@pytest.fixture
+def itl_header():
+    """
+    Header of the master ITL, to write other timelines after.
+    """
+    return _master.split('000_01')[0]
+
+
+@pytest.fixture
+def master_itl(tmpdir):
+    """
+    Writes a master ITL and the files it includes, one of them twice and
+    one of them from another include, and returns the master path.
+    """
+    for name, content in _includes.items():
+        tmpdir.join(name).write('# Comment: ' + name + '\n' + content)
+    master = tmpdir.join('master.itl')
+    master.write(_master)
+    return str(master)
@@ -0,0 +1,35 @@
+import os
+import shutil
+
+from pyops.dashboard import Dashboard
+
+
+this_dir, this_filename = os.path.split(__file__)
+_data = os.path.join(this_dir, 'data')
+_outputs = {'power_avg.out': 'power_avg_csv.out',
+            'data_rate_avg.out': 'data_rate_avg_csv.out',
+            'modes.out': 'modes_csv.out',
+            'module_states.out': 'module_states_csv.out'}
+
+
+def test_load_directory(tmpdir):
+    for name, source in _outputs.items():
+        shutil.copy(os.path.join(_data, source), str(tmpdir.join(name)))
+    # Files that only contain the name of an output are left alone
+    tmpdir.join('power_avg.out.pyops-index.npy').write('decoy')
+    tmpdir.join('modes.out.bak').write('decoy')
+
+    loaded = []
+    for parallel in (False, True):
+        dashboard = Dashboard.__new__(Dashboard)
+        dashboard.load_directory(str(tmpdir), parallel=parallel)
+        assert sorted(dashboard.load_times) == \
+            sorted(str(tmpdir.join(name)) for name in _outputs)
+        assert dashboard.power_avg_file == str(tmpdir.join('power_avg.out'))
+        assert dashboard.module_states_file == \
+            str(tmpdir.join('module_states.out'))
+        loaded.append(dashboard)
+    serial, pooled = loaded
+    for attribute in ('powertable', 'data_rate', 'modes', 'module_states'):
+        assert getattr(pooled, attribute).data.equals(
+            getattr(serial, attribute).data)
@@ -1,21 +1,27 @@
 from pyops import EDF
+from pyops.edf import _Records, to_si
+import numpy as np
 import os
 
 
-def test_add_none_to_empty_fields():
-    edf_test = EDF()
-
-    test_dict = {'a': ['a'], 'b': [1, 3], 'c': [1]}
-    output = edf_test._add_none_to_empty_fields(test_dict)
-    assert output == {'a': ['a', None], 'b': [1, 3], 'c': [1, None]}
+def test_records():
+    records = _Records(['a', 'b', 'c'])
+    assert 'b' in records and 'd' not in records
 
-    test_dict = {'a': [], 'b': [], 'c': []}
-    output = edf_test._add_none_to_empty_fields(test_dict)
-    assert output == {'a': [], 'b': [], 'c': []}
+    records.add('b', 1)
+    records.new()
+    records.add('a', 'x')
+    records.add('c', 2)
+    records.new()
+    records.add('a', 'y')
+    assert len(records) == 3
+    assert records.last('a') == 'y' and records.last('b') is None
 
-    test_dict = {'a': [1, 2], 'b': [1, 3], 'c': [1, 'a']}
-    output = edf_test._add_none_to_empty_fields(test_dict)
-    assert output == {'a': [1, 2], 'b': [1, 3], 'c': [1, 'a']}
+    table = records.to_dataframe()
+    assert list(table.columns) == ['a', 'b', 'c']
+    assert table['a'].tolist()[1:] == ['x', 'y']
+    assert table['b'].notnull().tolist() == [True, False, False]
+    assert table['c'].notnull().tolist() == [False, True, False]
 
 
 def test_how_many_brackets_following():
@@ -126,3 +132,44 @@ def test_load_edf_file():
 
     assert len(edf.ACTIONS.Table) == 3
     assert edf.ACTIONS.Table.loc[1]['Duration'] is None
+
+
+def test_lazy_load_edf_file():
+    this_dir, this_filename = os.path.split(__file__)
+    test_file = os.path.join(this_dir, "data", "test.edf")
+
+    edf = EDF(test_file, lazy=True)
+    assert edf.experiment == 'SSMM "MassMemory"'
+    assert sorted(edf._pending) == sorted(edf.keywords.values())
+
+    assert len(edf.MODES.Table) == 5
+    assert len(edf.MODULES.Module_states_Table) == 10
+    assert 'MODES' not in edf._pending and 'ACTIONS' in edf._pending
+
+    eager = EDF(test_file)
+    for section in edf.keywords.values():
+        assert getattr(edf, section).Table.fillna('').values.tolist() == \
+            getattr(eager, section).Table.fillna('').values.tolist()
+    assert edf._pending == {} and edf._content is None
+
+
+def test_typed_tables():
+    assert to_si(['2 [Kbits/sec]', '3', '1.5e1 [ W ]']).tolist()[::2] == \
+        [2048., 15.]
+    values = to_si(['3', 'POWER_PARAMETER', '1 [parsecs]', None], 'Watts')
+    assert values[0] == 3. and np.isnan(values[1:]).all()
+
+    this_dir, this_filename = os.path.split(__file__)
+    edf = EDF(os.path.join(this_dir, "data", "test.edf"), lazy=True)
+
+    stores = edf.DATA_STORES.typed_table()
+    assert stores is edf.DATA_STORES.typed_table()
+    assert stores.loc[2, 'Memory size'] == 1024 ** 3
+    assert stores.loc[2, 'Packet size'] == 4112 * 8
+
+    states = edf.MODULES.typed_table()
+    assert states['Module_state'].tolist()[5] == \
+        'VIHI_PE "VIHI Proximity Electronics" - ON'
+    assert states['MS_power'].tolist()[5] == 8.5
+    assert states['MS_data_rate'].dtype == float
+    assert edf.MODES.typed_table()['Nominal_power'].sum() == 0
@@ -0,0 +1,28 @@
+from pyops.evf import _read_events, _read_event_tokens, EVENT_COLUMNS
+
+
+_lines = ['000_00:30:00   AOS_MLG  (COUNT = 1)\n',
+          '000_00:45:00   PERIHELION # closest (to the Sun)\n',
+          '000_01:00:00   MERTIS_START  (exp = mertis item = obs_1) # c\n',
+          '000_01:00:00   BELA_START  EXP = BELA ITEM = RNG COUNT = 2\n',
+          '000_01:30:00   MGNS_START  (EXP = MGNS ITEM = A)(COUNT = 3)\n']
+
+
+def _plain(events):
+    # NaN and None both mean a missing value
+    return [[None if v is None or v != v else v for v in row]
+            for row in events.values.tolist()]
+
+
+def test_read_events():
+    expected = [list(_read_event_tokens(line)) for line in _lines]
+    assert expected[2] == ['000_01:00:00', 'MERTIS_START', 'MERTIS',
+                           'OBS_1', None, '# c']
+
+    # All the lines follow the grammar and are read in one go
+    events = _read_events(_lines[:4])
+    assert list(events.columns) == EVENT_COLUMNS
+    assert _plain(events) == expected[:4]
+
+    # The last one doesn't, every line is read one by one
+    assert _plain(_read_events(_lines)) == expected
@@ -0,0 +1,180 @@
+from pyops import ITL, EVF
+from pyops.itl import clear_itl_cache, tokenize_itl, _itl_cache, \
+    shift_time, shifted_time
+from datetime import datetime, timedelta
+import pandas as pd
+
+
+def test_merge_includes(tmpdir, master_itl):
+    clear_itl_cache()
+    itl = ITL(master_itl)
+    itl.merge_includes()
+
+    assert itl.merged_events['experiment'].tolist() == \
+        ['MERTIS', 'ISA', 'PHEBUS', 'MGNS', 'ISA', 'PHEBUS']
+    assert itl.merged_events['time'].tolist()[:3] == \
+        [datetime(2024, 1, 1, 1), datetime(2024, 1, 1, 2, 10),
+         datetime(2024, 1, 1, 2, 25)]
+
+    # a.itl and c.itl under both of their reference dates, and b.itl
+    assert sorted(len(entry['files']) for entry in _itl_cache.values()) == \
+        [1, 2, 2]
+    again = ITL(str(tmpdir.join('master.itl')))
+    again.merge_includes()
+    assert sum(len(entry['files']) for entry in _itl_cache.values()) == 5
+    assert again.merged_events.values.tolist() == \
+        itl.merged_events.values.tolist()
+
+    # An edited file replaces every version parsed from it
+    c = str(tmpdir.join('c.itl'))
+    tmpdir.join('c.itl').write('000_00:05:00 PHEBUS MODE_F ACTION_F\n'
+                               '000_00:06:00 PHEBUS MODE_G ACTION_G\n')
+    again.merge_includes()
+    assert again.merged_events['mode'].tolist().count('MODE_G') == 2
+    assert sum(len(entry['files']) for entry in _itl_cache.values()) == 5
+    assert all(parsed.events['mode'].tolist() == ['MODE_F', 'MODE_G']
+               for parsed in _itl_cache[c]['files'].values())
+
+
+def test_event_time_forms(tmpdir, itl_header):
+    itl = tmpdir.join('forms.itl')
+    itl.write(itl_header +
+              '000_01:00:00 MERTIS MODE_A ACTION_A\n'
+              '02:00:00 MERTIS MODE_B ACTION_B\n'
+              '03-Jan-2024_01:00:00 ISA MODE_C ACTION_C\n'
+              '24-005T00:00:00.000Z ISA MODE_D ACTION_D\n'
+              '05-Foo-2024_00:00:00 BELA MODE_E ACTION_E\n')
+    itl = ITL(str(itl))
+
+    assert itl.events['time'].tolist()[:4] == \
+        [datetime(2024, 1, 1, 1), datetime(2024, 1, 1, 2),
+         datetime(2024, 1, 3, 1), datetime(2024, 1, 6)]
+    assert itl.time_errors.tolist() == ['05-Foo-2024_00:00:00']
+
+
+def test_tokenize_itl():
+    lines = ['# Comment: not metadata\n',
+             '# Version: 1\n',
+             'Ref_date: 01-Jan-2024\n',
+             '000_01:00:00 MERTIS MODE_A ACTION_A (P1 = 1 [W] \\\n',
+             '    P2 = ON) # two parameters\n',
+             '000_02:00:00 SOC XX ACTION_B # no mode\n',
+             '000_03:00:00 INCLUDE "a.itl"\n']
+    assert list(tokenize_itl(lines)) == [
+        ('comment', '# Version: 1\n'),
+        ('line', ['Ref_date:', '01-Jan-2024']),
+        ('event', ('000_01:00:00', 'MERTIS', 'MODE_A', 'ACTION_A',
+                   [['P1', '1', '[W]', ' two parameters\n'],
+                    ['P2', 'ON', None]], None)),
+        ('event', ('000_02:00:00', 'SOC', None, 'ACTION_B', None,
+                   ' no mode')),
+        ('include', ['"a.itl"', '000_03:00:00'])]
+
+
+def test_mode_plot_table(master_itl):
+    itl = ITL(master_itl)
+    t1, t2, t3 = [datetime(2024, 1, 1, h) for h in (1, 2, 3)]
+    events = pd.DataFrame({'time': [t1, t1, t1, t2, t2, t3, t3],
+                           'experiment': ['A', 'B', 'A', 'A', 'B', 'A', 'A'],
+                           'mode': ['M0', 'M2', 'M1', None, 'M3', 'M4',
+                                    'M5']})
+    table = itl._convert_df_to_mode_plot_table_format(events, 'mode')
+
+    assert table['time'].tolist() == [t1, t2, t3]
+    assert table['A'].tolist() == ['M1', 'M1', 'M5']
+    assert table['B'].tolist() == ['M2', 'M3', 'M3']
+
+
+def test_shift_time(master_itl):
+    itl = ITL(master_itl)
+    itl.merge_includes()
+    events = itl.merged_events.reset_index(drop=True)
+    times = events['time'].tolist()
+
+    shifted = shifted_time(events, hours=1, experiment='ISA')
+    assert events['time'].tolist() == times
+    assert shifted['time'].tolist() == \
+        [t + timedelta(hours=1) if exp == 'ISA' else t
+         for t, exp in zip(times, events['experiment'])]
+
+    shifted = shifted_time(events, minutes=5, action=['ACTION_D'],
+                           start=datetime(2024, 1, 1, 3))
+    assert shifted['time'].tolist() == times[:3] + \
+        [times[3] + timedelta(minutes=5)] + times[4:]
+
+    shift_time(events, [0, 1], days=1)
+    assert events['time'].tolist() == \
+        [t + timedelta(days=1) for t in times[:2]] + times[2:]
+
+
+def test_mode_intervals(master_itl):
+    clear_itl_cache()
+    itl = ITL(master_itl)
+    intervals = itl.mode_intervals()
+    t = [datetime(2024, 1, 1, 2, 10), datetime(2024, 1, 2, 3, 10),
+         datetime(2024, 1, 10, 1)]
+
+    assert intervals.mode_at('ISA', datetime(2024, 1, 1, 2, 9)) is None
+    assert intervals.mode_at('ISA', t).tolist() == ['MODE_C'] * 2 + [None]
+    active = intervals.active(t)
+    assert list(active.columns) == ['MERTIS', 'ISA', 'PHEBUS', 'MGNS']
+    assert active['MERTIS'].tolist()[:2] == ['MODE_A'] * 2
+    assert active['MERTIS'].isnull().tolist() == [False, False, True]
+
+    window = intervals.overlapping(datetime(2024, 1, 1, 2),
+                                   datetime(2024, 1, 1, 2, 30))
+    assert window['experiment'].tolist() == ['MERTIS', 'ISA', 'PHEBUS']
+    assert window['end'].tolist()[0] == datetime(2024, 1, 10)
+
+
+def test_resolve_event_times(tmpdir, itl_header):
+    evf = tmpdir.join('orbit.evf')
+    evf.write('Ref_date: 01-Jan-2024\n'
+              'Start_time: 01-Jan-2024_00:00:00\n'
+              'End_time: 10-Jan-2024_00:00:00\n'
+              '000_10:00:00   PERICENTRE  (COUNT = 1)\n'
+              '001_10:00:00   PERICENTRE  (COUNT = 2)\n'
+              '000_12:00:00   ECLIPSE_START\n'
+              '001_12:00:00   ECLIPSE_START\n')
+    itl = tmpdir.join('relative.itl')
+    itl.write(itl_header +
+              '000_01:00:00 MERTIS MODE_A ACTION_A\n'
+              'PERICENTRE (COUNT = 2) -00:10:00 MERTIS MODE_B ACTION_B\n'
+              'ECLIPSE_START +000_00:05:00 BELA MODE_C ACTION_C # each\n'
+              'APOCENTRE (COUNT = 1) 00:00:00 BELA MODE_D ACTION_D\n')
+    itl = ITL(str(itl))
+    assert itl.events['raw_time'].tolist()[1:] == [
+        'PERICENTRE ( COUNT = 2 ) -00:10:00',
+        'ECLIPSE_START +000_00:05:00', 'APOCENTRE ( COUNT = 1 ) 00:00:00']
+    assert len(itl.time_errors) == 3
+
+    itl.resolve_event_times(EVF(str(evf)))
+    assert itl.events['mode'].tolist() == \
+        ['MODE_A', 'MODE_C', 'MODE_B', 'MODE_C', 'MODE_D']
+    assert itl.events['time'].tolist()[:4] == \
+        [datetime(2024, 1, 1, 1), datetime(2024, 1, 1, 12, 5),
+         datetime(2024, 1, 2, 9, 50), datetime(2024, 1, 2, 12, 5)]
+    assert itl.time_errors.tolist() == ['APOCENTRE ( COUNT = 1 ) 00:00:00']
+
+
+def test_resolve_event_times_in_includes(tmpdir, itl_header):
+    clear_itl_cache()
+    evf = tmpdir.join('orbit.evf')
+    evf.write('Ref_date: 01-Jan-2024\n'
+              '000_02:00:00   PERICENTRE  (COUNT = 1)\n')
+    tmpdir.join('relative.itl').write(
+        'PERICENTRE (COUNT = 1) +00:20:00 BELA MODE_B ACTION_B\n'
+        'APOCENTRE (COUNT = 1) +00:20:00 BELA MODE_C ACTION_C\n')
+    itl = tmpdir.join('root.itl')
+    itl.write(itl_header +
+              'PERICENTRE (COUNT = 1) +00:10:00 MERTIS MODE_A ACTION_A\n'
+              '000_01:00:00 INCLUDE "relative.itl"\n')
+    itl = ITL(str(itl))
+
+    itl.resolve_event_times(EVF(str(evf)))
+    itl.merge_includes()
+    events = itl.merged_events
+    assert events['time'].tolist()[:2] == \
+        [datetime(2024, 1, 1, 2, 10), datetime(2024, 1, 1, 2, 20)]
+    assert events['mode'].tolist()[:2] == ['MODE_A', 'MODE_B']
+    assert itl.time_errors.tolist() == ['APOCENTRE ( COUNT = 1 ) +00:20:00']
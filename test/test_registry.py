@@ -0,0 +1,88 @@
+from pyops.registry import EDFRegistry, CACHE_FORMAT
+import os
+import pickle
+
+
+_edfs = {
+    'mertis.edf': 'Experiment: MERTIS "MErcury Radiometer"\n'
+                  'Include_file: "mertis_actions.edf"\n'
+                  'Mode: OFF\n'
+                  '    Nominal_power: 0 [Watts]\n'
+                  'Mode: SCIENCE\n'
+                  '    Nominal_power: 20 [Watts]\n',
+    'bela.edf': 'Experiment: BELA "BepiColombo Laser Altimeter"\n'
+                'Mode: STANDBY\n'
+                '    Nominal_power: 5 [Watts]\n'}
+
+_actions = 'Action: MERTIS_ON\n' \
+           '    Duration: 00:05:00\n'
+
+
+def test_registry(tmpdir):
+    for name, content in _edfs.items():
+        tmpdir.join(name).write(content)
+    # Includes are followed even from outside the directory
+    tmpdir.mkdir('edf')
+    for name in _edfs:
+        tmpdir.join(name).move(tmpdir.join('edf', name))
+    tmpdir.join('mertis_actions.edf').write(_actions)
+    tmpdir.join('edf', 'mertis.edf').write(
+        _edfs['mertis.edf'].replace('"mertis', '"../mertis'))
+    directory = str(tmpdir.join('edf'))
+    cache = str(tmpdir.join('cache'))
+
+    registry = EDFRegistry(directory, cache=cache)
+    assert len(registry.edfs) == 3
+    modes = registry.modes
+    assert modes['experiment'].tolist() == ['BELA', 'MERTIS', 'MERTIS']
+    assert modes['Mode'].tolist() == ['STANDBY', 'OFF', 'SCIENCE']
+    assert registry.actions['experiment'].tolist() == ['MERTIS']
+
+    # A warm start reads everything from the cache
+    again = EDFRegistry(directory, cache=cache)
+    assert again.refresh() == []
+    assert again.modes.values.tolist() == modes.values.tolist()
+
+    # Only the edited file is parsed again
+    tmpdir.join('edf', 'bela.edf').write(
+        _edfs['bela.edf'] + 'Mode: SCIENCE\n')
+    assert again.refresh() == [str(tmpdir.join('edf', 'bela.edf'))]
+    assert again.modes['Mode'].tolist()[:2] == ['STANDBY', 'SCIENCE']
+    assert len(os.listdir(cache)) == 3
+
+    # Entries of another cache format are parsed again
+    mertis = str(tmpdir.join('edf', 'mertis.edf'))
+    with open(again._entry(mertis), 'rb') as f:
+        entry = pickle.load(f)
+    entry['format'] = ('edf-registry-0', entry['format'][1])
+    with open(again._entry(mertis), 'wb') as f:
+        pickle.dump(entry, f)
+    EDFRegistry(directory, cache=cache)
+    with open(again._entry(mertis), 'rb') as f:
+        assert pickle.load(f)['format'][0] == CACHE_FORMAT
+
+    # Files that are gone lose their cache entries
+    tmpdir.join('edf', 'bela.edf').remove()
+    again.refresh()
+    assert again.modes['experiment'].tolist() == ['MERTIS', 'MERTIS']
+    assert sorted(os.listdir(cache)) == \
+        sorted(os.path.basename(again._entry(f)) for f in again.edfs)
+
+
+def test_registry_shared_includes(tmpdir):
+    empty = EDFRegistry(str(tmpdir), cache=False)
+    assert len(empty.modes) == 0
+    assert empty.actions.columns.tolist() == ['experiment']
+
+    # The actions are included by both experiments, from the same directory
+    for name, content in _edfs.items():
+        tmpdir.join(name).write(content)
+    tmpdir.join('bela.edf').write(
+        'Include_file: "mertis_actions.edf"\n' + _edfs['bela.edf'])
+    tmpdir.join('mertis_actions.edf').write(_actions)
+    registry = EDFRegistry(str(tmpdir), cache=False)
+    assert registry.actions['experiment'].tolist() == ['BELA', 'MERTIS']
+    assert registry.modes['experiment'].tolist() == \
+        ['BELA', 'MERTIS', 'MERTIS']
+    assert registry.experiments[str(tmpdir.join('mertis_actions.edf'))] == \
+        ['BELA', 'MERTIS']
@@ -0,0 +1,57 @@
+"""
+Round trip tests of the ITL and EVF writers: every file is loaded, written
+with to_file, loaded again and compared with the original.
+"""
+import os
+
+from pyops import ITL, EVF
+from pyops.utils import same_timeline
+
+this_dir, this_filename = os.path.split(__file__)
+data_dir = os.path.join(this_dir, 'data')
+
+
+def _roundtrip(cls, fname, tmpdir):
+    original = cls(fname)
+    written = str(tmpdir.join('written' + os.path.splitext(fname)[1]))
+    original.to_file(written)
+    assert same_timeline(original, cls(written)) == []
+    return original
+
+
+def _scaled(fname, tmpdir, copies=500):
+    # The event block of a test file repeated on consecutive days
+    with open(fname) as f:
+        lines = f.readlines()
+    first = [n for n, l in enumerate(lines) if l.startswith('000_')][0]
+    events = list()
+    for l in lines[first:]:
+        # Continuation lines go with the line they continue
+        if not l.startswith(' '):
+            keep = l.startswith('000_')
+        if keep:
+            events.append(l)
+    scaled = tmpdir.join('scaled' + os.path.splitext(fname)[1])
+    scaled.write(''.join(lines[:first]) + ''.join(
+        '{:03d}'.format(day) + l[3:] if l.startswith('000_') else l
+        for day in range(copies) for l in events))
+    return str(scaled)
+
+
+def test_itl_roundtrip(tmpdir):
+    itl = _roundtrip(ITL, os.path.join(data_dir, 'timeline.itl'), tmpdir)
+    assert len(itl.events) == 10
+    assert itl.include_files[1:] == [
+        ['"orbit_2.itl"', '000_03:00:00', '# second orbit'],
+        ['"orbit_3.itl"', '001_00:00:00']]
+
+    scaled = _scaled(os.path.join(data_dir, 'timeline.itl'), tmpdir)
+    assert len(_roundtrip(ITL, scaled, tmpdir).events) == 500 * 6
+
+
+def test_evf_roundtrip(tmpdir):
+    evf = _roundtrip(EVF, os.path.join(data_dir, 'events.evf'), tmpdir)
+    assert evf.events['count'].dropna().tolist() == ['1', '2', '1']
+
+    scaled = _scaled(os.path.join(data_dir, 'events.evf'), tmpdir)
+    assert len(_roundtrip(EVF, scaled, tmpdir).events) == 500 * 5
@@ -0,0 +1,49 @@
+import os
+
+from pyops import ITL, IncludeTree
+from pyops.itl import clear_itl_cache, cached_itl
+from pyops.tree import merge_sorted_events
+
+
+def _values(events):
+    # NaN and None both mean a missing value
+    return [[None if v is None or v != v else v for v in row]
+            for row in events.values.tolist()]
+
+
+def test_merge_sorted_events(master_itl):
+    itl = ITL(master_itl)
+    frames = [itl.events.iloc[::2], itl.events.iloc[1::2],
+              itl.events.iloc[:0], itl.events]
+    merged = merge_sorted_events(frames)
+    expected = merged.sort(['time'], kind='mergesort')
+    assert _values(merged) == _values(expected)
+
+
+def test_include_tree(tmpdir, master_itl):
+    master = master_itl
+    clear_itl_cache()
+    itl = ITL(master)
+    itl.merge_includes()
+    tree = IncludeTree(master)
+    assert _values(tree.events) == _values(itl.merged_events)
+    assert len(tree.files) == 6
+    assert tree.refresh() == []
+
+    # Same content, only the modification time changes
+    b = tmpdir.join('b.itl')
+    os.utime(str(b), (0, 0))
+    assert tree.refresh() == []
+
+    # c.itl is included by a.itl, itself included twice by the master
+    tmpdir.join('c.itl').write('000_00:05:00 PHEBUS MODE_F ACTION_F\n'
+                               '000_00:06:00 PHEBUS MODE_G ACTION_G\n')
+    parsed = tree.refresh()
+    assert sorted(os.path.basename(p) for p, ref_date in parsed) == \
+        ['c.itl', 'c.itl']
+    assert tree.events['mode'].tolist().count('MODE_G') == 2
+    # The tree and merge_includes share the parsed files
+    assert all(cached_itl(*node) is parsed
+               for node, parsed in tree.files.items())
+    itl.merge_includes()
+    assert _values(tree.events) == _values(itl.merged_events)